@@ -1,61 +1,254 @@
 
 
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
-import time
-
-class BookScraper:
-    def __init__(self, url):
-        # Setup Chrome options
-        options = webdriver.ChromeOptions()
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--headless")  # Optional: run in background
-
-        # Initialize WebDriver
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
-
-        self.url = url
+import argparse
+import re
+from dataclasses import dataclass, replace
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from checkpoint import Checkpoint
+from columns import interned
+from extract import Field, RowSpec, extract
+from fetch import HostRateLimiter, fetch_tree
+from metrics import timed
+from numeric import Typed, open_typed_sink
+from sitespec import SiteScraper, SiteSpec
+from sinks import open_sink
+from waits import Wait, count_stopped_growing
+
+URL = "https://books.toscrape.com/"
+
+BOOK_XPATH = "//article[contains(@class, 'product_pod')]"
+
+BOOK_SPEC = RowSpec(
+    rows=BOOK_XPATH,
+    fields={
+        "Title": Field(".//h3/a", attr="title"),
+        "Price": Field(".//p[contains(@class,'price_color')]"),
+        "Rating": Field(".//p[contains(@class,'star-rating')]", attr="class"),
+        "Link": Field(".//h3/a", attr="href"),
+    },
+)
+
+# Detail page fields, fetched only in crawl(details=True)
+DETAIL_SPEC = RowSpec(
+    rows="//article[contains(@class,'product_page')]",
+    fields={
+        "UPC": Field(".//table//tr[th='UPC']/td"),
+        "Stock": Field(".//table//tr[th='Availability']/td"),
+        "Description": Field("./div[@id='product_description']/following-sibling::p[1]"),
+    },
+)
+
+# Column types for typed output: "£51.77" -> Decimal("51.77"), Currency "GBP"
+TYPES = {"Price": Typed("price", currency="Currency")}
+
+DETAIL_FIELDS = list(DETAIL_SPEC.fields)
+
+
+@dataclass(slots=True, frozen=True)
+class BookRow:
+    Title: str
+    Price: str
+    Rating: str
+    Link: str
+    # detail page, only in crawl(details=True)
+    UPC: str = ""
+    Stock: str = ""
+    Description: str = ""
+
+
+PAGER_XPATH = "//ul[contains(@class,'pager')]"
+
+
+def _page_urls(tree, url):
+    """All catalogue page URLs, from the "Page 1 of 50" pager on the first page."""
+    current = tree.xpath(f"string({PAGER_XPATH}/li[contains(@class,'current')])")
+    next_href = tree.xpath(f"string({PAGER_XPATH}/li[contains(@class,'next')]/a/@href)")
+    m = re.search(r"Page\s+(\d+)\s+of\s+(\d+)", current)
+    if not m or not re.search(r"page-\d+", next_href):
+        return [url]
+    template = re.sub(r"page-\d+", "page-{}", next_href)
+    return [url] + [template.format(n) for n in range(int(m.group(1)) + 1, int(m.group(2)) + 1)]
+
+
+SITE = SiteSpec(
+    name="books",
+    url=URL,
+    rows=BOOK_SPEC,
+    normalize={"Price": "strip", "Rating": lambda v: interned((v or "").replace("star-rating ", ""))},
+    record=lambda book: BookRow(book["Title"], book["Price"], book["Rating"], book["Link"]),
+    # Wait until the book list has rendered and stopped growing
+    wait=Wait(count_stopped_growing(BOOK_XPATH, quiet=0.2), timeout=10),
+    pages=_page_urls,
+    types=TYPES,
+    output="books.csv",
+)
+
+
+class BookScraper(SiteScraper):
+    def __init__(self, url=URL, pool=None, backend="auto"):
+        # A warm browser is leased from the shared pool only if the page
+        # can't be read over plain HTTP
+        super().__init__(SITE, url, pool, backend)
         self.master_list = []
 
+    @timed("books.open_page")
     def open_page(self):
-        self.driver.get(self.url)
-        time.sleep(2)  # Wait for page to load
+        self.open()
 
+    @timed("books.extract")
     def scrape_books(self):
-        # Locate all book elements using XPath
-        books = self.driver.find_elements(By.XPATH, "//article[contains(@class, 'product_pod')]")
+        # One pass over the lxml tree, or one execute_script in the browser
+        self.master_list = self.scrape(all_pages=False)
+
+    def _book_rows(self, source):
+        return SITE.records(source)
 
-        # Extract data using dict comprehension
-        self.master_list = [
-            {
-                "Title": book.find_element(By.XPATH, ".//h3/a").get_attribute("title"),
-                "Price": book.find_element(By.XPATH, ".//p[contains(@class,'price_color')]").text,
-                "Rating": book.find_element(By.XPATH, ".//p[contains(@class,'star-rating')]").get_attribute("class").replace("star-rating ", ""),
-                "Link": book.find_element(By.XPATH, ".//h3/a").get_attribute("href")
-            }
-            for book in books
-        ]
+    def crawl(self, max_workers=8, rate=None, details=False, keep=True, checkpoint=None):
+        """
+        Yield books from every catalogue page over HTTP as pages complete.
+        `max_workers` bounds concurrent requests and `rate` caps requests per
+        second per host. With details=True each book's page is fetched too,
+        adding UPC, Stock and Description. Rows are also kept in master_list
+        unless keep=False. With a Checkpoint, finished pages and books are
+        recorded as they complete; a resumed one yields its rows first and
+        only fetches what's left.
+        """
+        ck = checkpoint
+        limiter = HostRateLimiter(rate)
+        self.master_list = []
 
-    def save_to_csv(self, filename="books.csv"):
-        df = pd.DataFrame(self.master_list)
-        df.to_csv(filename, index=False)
-        print(df.head())
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="books") as pool:
+            pending = {}
 
-    def close(self):
-        self.driver.quit()
+            def fetch(url, row=None, unit=None):
+                pending[pool.submit(fetch_tree, url, limiter)] = (unit or url, row)
 
+            def on_page(url, tree):
+                rows = self._book_rows(tree)
+                if not details:
+                    if ck is not None:
+                        ck.complete(url, rows)
+                    return rows
+                # a book listed on several pages is a row (and a unit) per listing
+                units = {f"{url}#{row.Link}": row for row in rows}
+                if ck is not None:
+                    ck.complete(url, follow=units)
+                for unit, row in units.items():
+                    fetch(row.Link, row, unit)
+                return []
 
-if __name__ == "__main__":
-    url = "https://books.toscrape.com/"
+            def on_detail(unit, row, tree):
+                info = (extract(tree, DETAIL_SPEC) or [{}])[0]
+                row = replace(row, **{k: (info.get(k) or "").strip() for k in DETAIL_FIELDS})
+                if ck is not None:
+                    ck.complete(unit, [row])
+                return row
+
+            ready = []
+            first = None
+            pages = ck.get("pages") if ck is not None else None
+            if ck is not None:
+                ready = ck.rows(BookRow)
+                for unit, row in ck.queued(BookRow).items():
+                    fetch(row.Link, row, unit)
+            if pages is None:
+                first = fetch_tree(self.url, limiter)
+                pages = _page_urls(first, self.url)
+                if ck is not None:
+                    ck.set("pages", pages)
+            for url in pages:
+                if ck is not None and ck.is_done(url):
+                    continue
+                if url == self.url and first is not None:
+                    ready.extend(on_page(url, first))
+                else:
+                    fetch(url)
+
+            while True:
+                for row in ready:
+                    if keep:
+                        self.master_list.append(row)
+                    yield row
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                ready = []
+                for fut in done:
+                    unit, row = pending.pop(fut)
+                    try:
+                        tree = fut.result()
+                    except Exception as e:
+                        print(f"[warn] fetch failed: {e}")
+                        if ck is not None:
+                            ck.failed += 1
+                        if row is not None:
+                            ready.append(row)
+                        continue
+                    if row is None:
+                        ready.extend(on_page(unit, tree))
+                    else:
+                        ready.append(on_detail(unit, row, tree))
+
+    def _sink(self, filename, fields, typed, **kwargs):
+        return open_typed_sink(filename, fields, TYPES, **kwargs) if typed else open_sink(filename, fields, **kwargs)
+
+    @timed("books.crawl")
+    def crawl_to_csv(self, filename="books.csv", batch=100, typed=False, **kwargs):
+        """
+        Stream crawl() into `filename` (CSV, JSONL or Parquet by extension),
+        flushing every `batch` rows. Rows aren't kept in memory; returns the
+        count. typed=True writes prices as numbers plus a Currency column.
+        """
+        fields = list(BOOK_SPEC.fields) + (DETAIL_FIELDS if kwargs.get("details") else [])
+        with self._sink(filename, fields, typed, batch=batch) as sink:
+            sink.write_many(self.crawl(keep=False, **kwargs))
+        print(f"Saved {sink.count} books to {filename}")
+        return sink.count
+
+    @timed("books.save")
+    def save_to_csv(self, filename="books.csv", typed=False):
+        self.save(filename, typed)
+
+
+def run(url=URL, crawl=False, workers=8, rate=None, details=False, path="books.csv", typed=False,
+        resume=False):
+    """
+    Scrape into `path`; returns the number of books. A crawl keeps a
+    checkpoint as it goes; resume=True continues the last unfinished one.
+    """
     scraper = BookScraper(url)
-    scraper.open_page()
-    scraper.scrape_books()
-    scraper.save_to_csv()
-    scraper.close()
+    try:
+        if crawl:
+            ck = Checkpoint("books", job={"url": url, "details": details}, resume=resume)
+            completed = False
+            try:
+                n = scraper.crawl_to_csv(path, typed=typed, max_workers=workers, rate=rate, details=details,
+                                         checkpoint=ck)
+                completed = True
+            finally:
+                ck.close(completed)
+            return n
+        scraper.open_page()
+        scraper.scrape_books()
+        scraper.save_to_csv(path, typed=typed)
+    finally:
+        scraper.close()
+    return len(scraper.master_list)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape books.toscrape.com")
+    parser.add_argument("--all", action="store_true", help="crawl every catalogue page")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent requests in --all mode")
+    parser.add_argument("--rate", type=float, default=None, help="max requests/sec per host")
+    parser.add_argument("--details", action="store_true", help="also fetch each book's detail page")
+    parser.add_argument("--out", default="books.csv", help="output file (.csv, .jsonl or .parquet)")
+    parser.add_argument("--typed", action="store_true", help="write prices as numbers plus a Currency column")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted --all crawl")
+    args = parser.parse_args()
+
+    run(crawl=args.all, workers=args.workers, rate=args.rate, details=args.details, path=args.out,
+        typed=args.typed, resume=args.resume)
@@ -1,169 +1,190 @@
 # palo_alto_hardware_eol_scraper.py
 # Outputs: palo_alto_hardware_eol.csv with normalized EOL_Date (yyyy-mm-dd)
-
-import re
-import time
-import csv
-from dataclasses import dataclass, asdict
+# --details also fetches every resource link (pages and datasheet PDFs) and
+# adds resourceTitle, resourceSpecs and documents columns. Each run is also
+# upserted into the EOL store (eol_store.py; eol.sqlite next to this script)
+# unless --no-store. --incremental skips an unchanged page and writes the rows
+# that changed since the last run to palo_alto_hardware_eol.changes.csv.
+
+import argparse
+import os
+from dataclasses import dataclass, replace
 from urllib.parse import urljoin
-from datetime import datetime
-
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-try:
-    # optional: auto-manage chromedriver
-    from webdriver_manager.chrome import ChromeDriverManager
-    CHROMEDRIVER = ChromeDriverManager().install()
-except Exception:
-    CHROMEDRIVER = None
-
-try:
-    from dateutil import parser as dateparser
-except ImportError:
-    raise ImportError("Please install python-dateutil: pip install python-dateutil")
+
+from changes import read_snapshot, write_changes
+from columns import as_dict
+from enrich import enrich
+from eol_store import DEFAULT_STORE, STORE_PATH, EolStore
+from extract import Field, RowSpec, has_class
+from http_cache import HttpCache
+from metrics import span, timed
+from sinks import open_sink
+from sitespec import SiteScraper, SiteSpec
 
 BASE_URL = "https://www.paloaltonetworks.com"
 TARGET_URL = "https://www.paloaltonetworks.com/services/support/end-of-life-announcements/hardware-end-of-life-dates"
 
+# XPath form of "table.table.table-striped.table-hover tbody > tr"
+TABLE_XPATH = f"//table[{has_class('table')} and {has_class('table-striped')} and {has_class('table-hover')}]"
+ROW_XPATH = TABLE_XPATH + "/tbody/tr"
+
+ROW_SPEC = RowSpec(
+    rows=ROW_XPATH + "[count(td) >= 6]",
+    fields={
+        "product": Field("./td[1]"),
+        "eol": Field("./td[3]"),
+        "links": Field("./td[4]//a", attr="href", many=True),
+        "recommended": Field("./td[6]"),
+    },
+)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Row:
     vendor: str
     productName: str
     EOL_Date: str
     resource: str
     Recommended_replacement: str
-
-
-def _collapse(text: str) -> str:
-    if not text:
-        return ""
-    return re.sub(r"\s+", " ", text).strip()
-
-
-def _cell_text_lines(cell_el) -> str:
-    inner = cell_el.get_attribute("innerText") or ""
-    lines = [ln.strip() for ln in re.split(r"[\r\n]+", inner) if ln.strip()]
-    return " | ".join(lines)
-
-
-def _normalize_date(date_str: str) -> str:
+    # from the resource links, only with details
+    resourceTitle: str = ""
+    resourceSpecs: str = ""
+    documents: str = ""
+
+
+FIELDNAMES = ["vendor", "productName", "EOL_Date", "resource", "Recommended_replacement"]
+DETAIL_FIELDS = ["resourceTitle", "resourceSpecs", "documents"]
+
+
+def _resources(hrefs) -> str:
+    return " | ".join(urljoin(BASE_URL, h) for h in hrefs if h)
+
+
+def _record(r) -> Row:
+    return Row(
+        vendor="Palo Alto",
+        productName=r["product"],
+        EOL_Date=r["eol"],
+        resource=r["links"],
+        Recommended_replacement=r["recommended"],
+    )
+
+
+SITE = SiteSpec(
+    name="eol-hw",
+    url=TARGET_URL,
+    rows=ROW_SPEC,
+    fieldnames=FIELDNAMES,
+    normalize={
+        "product": ("lines", "collapse"),
+        "eol": ("collapse", "fuzzy_date"),
+        "links": _resources,
+        "recommended": ("lines", "collapse"),
+    },
+    record=_record,
+    # the EOL table is server-rendered; only start Chrome if the raw HTML lacks it
+    ready=ROW_XPATH,
+    # accept cookie banner if present
+    consent=True,
+    output="palo_alto_hardware_eol.csv",
+)
+
+
+@timed("eol_hw.parse")
+def _parse(source) -> list[Row]:
+    # source is an lxml tree or a live driver; either way one extraction pass
+    return SITE.records(source)
+
+
+def add_details(rows: list[Row], workers: int = 16, rate: float | None = None, timeout: int = 20) -> list[Row]:
+    """Fetch every distinct resource link once; the rows with what they hold merged in."""
+    links = [[u for u in row.resource.split(" | ") if u] for row in rows]
+    details = enrich((u for urls in links for u in urls), workers, rate, timeout)
+    out = []
+    for row, urls in zip(rows, links):
+        found = [d for d in (details.get(u) for u in urls) if d and d.kind != "error"]
+        out.append(replace(
+            row,
+            resourceTitle=" | ".join(d.title for d in found),
+            resourceSpecs=" | ".join(d.specs_text() for d in found),
+            documents=" | ".join(dict.fromkeys(doc for d in found for doc in d.documents)),
+        ))
+    return out
+
+
+def scrape(
+    headless: bool = True,
+    out_csv: str = "palo_alto_hardware_eol.csv",
+    pool=None,
+    timeout: int = 20,
+    url: str = TARGET_URL,
+    backend: str = "auto",
+    incremental: bool = False,
+    details: bool = False,
+    store: str | None = STORE_PATH,
+):
     """
-    Convert to yyyy-mm-dd if possible, otherwise return original (like 'TBD').
+    Scrape the hardware EOL table into `out_csv`. With incremental=True the
+    page goes through the on-disk HTTP cache: if it hasn't changed since the
+    last run nothing is parsed or written (returns None); otherwise the rows
+    that differ from the previous CSV are also written to *.changes.csv.
+    details=True fetches the resource links and adds their columns. The
+    rows also go into the EOL store at `store` (None to skip it).
     """
-    date_str = date_str.strip()
-    if not date_str or date_str.lower() in {"tbd", "n/a", "-"}:
-        return date_str
-
+    html = page = None
+    if incremental and backend != "browser":
+        import requests
+
+        cache = HttpCache()
+        try:
+            with span("eol_hw.conditional_fetch"):
+                page = cache.fetch(url, timeout)
+        except requests.RequestException as e:
+            print(f"[warn] conditional fetch failed: {e}")
+        else:
+            if not page.changed and os.path.exists(out_csv):
+                print(f"Unchanged since last run, keeping {out_csv}")
+                return None
+            html = page.text
+
+    scraper = SiteScraper(SITE, url, pool, backend, timeout, headless)
     try:
-        dt = dateparser.parse(date_str, dayfirst=False, fuzzy=True)
-        return dt.strftime("%Y-%m-%d")
-    except Exception:
-        return date_str
-
-
-def make_driver(headless: bool = True, timeout: int = 20):
-    opts = Options()
-    if headless:
-        opts.add_argument("--headless=new")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--window-size=1400,900")
-    opts.add_argument("--log-level=3")
-
-    if CHROMEDRIVER:
-        driver = webdriver.Chrome(service=Service(CHROMEDRIVER), options=opts)
-    else:
-        driver = webdriver.Chrome(options=opts)
-
-    wait = WebDriverWait(driver, timeout)
-    return driver, wait
+        with span("eol_hw.load"):
+            scraper.open(html)
+        rows = _parse(scraper.source)
+    finally:
+        scraper.close()
 
+    if details:
+        rows = add_details(rows, timeout=timeout)
+    fieldnames = FIELDNAMES + (DETAIL_FIELDS if details else [])
+    if incremental:
+        n = write_changes(out_csv, read_snapshot(out_csv), [as_dict(r) for r in rows],
+                          key=lambda r: r["productName"], fieldnames=fieldnames)
+        print(f"{n} rows added/removed/modified since last run")
 
-def scrape(headless: bool = True, out_csv: str = "palo_alto_hardware_eol.csv"):
-    driver, wait = make_driver(headless=headless)
-    rows: list[Row] = []
+    with span("eol_hw.save"), open_sink(out_csv, fieldnames) as sink:
+        sink.write_many(rows)
 
-    try:
-        driver.get(TARGET_URL)
-
-        # accept cookie banner if present
-        for by, sel in [
-            (By.CSS_SELECTOR, "button#onetrust-accept-btn-handler"),
-            (By.XPATH, "//button[contains(., 'Accept')]"),
-            (By.XPATH, "//button[contains(., 'I Agree')]"),
-        ]:
-            try:
-                btn = WebDriverWait(driver, 4).until(
-                    EC.element_to_be_clickable((by, sel))
-                )
-                btn.click()
-                time.sleep(0.3)
-                break
-            except Exception:
-                pass
-
-        table = wait.until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "table.table.table-striped.table-hover")
-            )
-        )
-
-        tr_list = table.find_elements(By.CSS_SELECTOR, "tbody > tr")
-
-        for tr in tr_list:
-            tds = tr.find_elements(By.TAG_NAME, "td")
-            if len(tds) < 6:
-                continue
-
-            product_name = _collapse(_cell_text_lines(tds[0]))
-            eol_date_raw = _collapse(tds[2].text)
-            eol_date = _normalize_date(eol_date_raw)
-
-            links = tds[3].find_elements(By.TAG_NAME, "a")
-            abs_links = []
-            for a in links:
-                href = a.get_attribute("href")
-                if href:
-                    abs_links.append(urljoin(BASE_URL, href))
-            resource = " | ".join(abs_links)
-
-            recommended = _collapse(_cell_text_lines(tds[5]))
-
-            rows.append(
-                Row(
-                    vendor="Palo Alto",
-                    productName=product_name,
-                    EOL_Date=eol_date,
-                    resource=resource,
-                    Recommended_replacement=recommended,
-                )
-            )
-
-        fieldnames = [
-            "vendor",
-            "productName",
-            "EOL_Date",
-            "resource",
-            "Recommended_replacement",
-        ]
-        with open(out_csv, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for r in rows:
-                writer.writerow(asdict(r))
-
-        print(f"✅ Saved {len(rows)} rows to {out_csv}")
+    print(f"✅ Saved {len(rows)} rows to {out_csv}")
 
-    finally:
-        driver.quit()
+    if store:
+        with span("eol_hw.store"), EolStore(store) as db:
+            added, modified, removed = db.upsert_hardware(rows, source=url)
+        print(f"Stored in {store}: {added} added, {modified} modified, {removed} removed")
+    if page is not None:
+        # only now, so a failed run isn't mistaken for "unchanged" next time
+        cache.commit(page)
+    return rows
 
 
 if __name__ == "__main__":
-    scrape(headless=True)
+    parser = argparse.ArgumentParser(description="Scrape Palo Alto hardware EOL dates")
+    parser.add_argument("--details", action="store_true", help="also fetch every resource link")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip an unchanged page and write the rows that changed to *.changes.csv")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="EOL store to upsert the rows into")
+    parser.add_argument("--no-store", dest="store", action="store_const", const=None)
+    args = parser.parse_args()
+
+    scrape(headless=True, incremental=args.incremental, details=args.details, store=args.store)
@@ -1,29 +1,47 @@
 # Palo Alto Software EOL scraper (Selenium + Python)
 # Extracts: Software Name, Version, Release Date, EOL Date
-# Output: paloalto_software_eol.csv
-
-import time
-import pandas as pd
-from dataclasses import dataclass, asdict
-from datetime import datetime
-
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    CHROMEDRIVER = ChromeDriverManager().install()
-except Exception:
-    CHROMEDRIVER = None
+# Output: paloalto_software_eol.csv, and the rows upserted into the EOL store
+# (eol_store.py)
+
+import argparse
+import os
+import sys
+from dataclasses import dataclass
+
+from lxml import etree
+
+from changes import read_snapshot, write_changes
+from columns import as_dict
+from dates import normalize_column
+from eol_store import DEFAULT_STORE, STORE_PATH, EolStore
+from extract import Field, RowSpec, has_class
+from fetch import inner_text, parse_html
+from http_cache import HttpCache
+from metrics import timed
+from sitespec import SiteScraper, SiteSpec
+from waits import Wait, dom_stable
 
 URL = "https://www.paloaltonetworks.com/services/support/end-of-life-announcements/end-of-life-summary"
 
+TABLES_XPATH = f"//div[{has_class('oneColumnPlain')}]//table"
+
+# One row per product table: its heading (first format that matches, in
+# order) and every body row's cell texts
+TABLE_SPEC = RowSpec(
+    rows=TABLES_XPATH,
+    fields={
+        "heading": Field((
+            ".//th[@colspan]//p//b",
+            ".//td[@colspan]//p//b",
+            "./preceding::p[1]/b",
+            "./preceding::h2[1] | ./preceding::h3[1]",
+        )),
+        "rows": Field(".//tbody//tr", many=True, each=Field("./td", many=True)),
+    },
+)
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SoftwareRow:
     softwareName: str
     version: str
@@ -31,104 +49,246 @@ class SoftwareRow:
     eolDate: str
 
 
-def normalize_date(date_str: str) -> str:
-    """Convert date to yyyy-mm-dd if possible, else return original"""
-    if not date_str:
-        return ""
-    try:
-        return datetime.strptime(date_str.strip(), "%B %d, %Y").strftime("%Y-%m-%d")
-    except Exception:
-        try:
-            return datetime.strptime(date_str.strip(), "%b %d, %Y").strftime("%Y-%m-%d")
-        except Exception:
-            return date_str.strip()
-
-
-class PaloAltoSoftwareScraper:
-    def __init__(self, headless: bool = True, timeout: int = 20):
-        chrome_opts = Options()
-        if headless:
-            chrome_opts.add_argument("--headless=new")
-        chrome_opts.add_argument("--disable-gpu")
-        chrome_opts.add_argument("--no-sandbox")
-        chrome_opts.add_argument("--window-size=1400,900")
-        chrome_opts.add_argument("--disable-dev-shm-usage")
-        chrome_opts.add_argument("--start-maximized")
-        chrome_opts.add_argument("--log-level=3")
-
-        if CHROMEDRIVER:
-            self.driver = webdriver.Chrome(service=Service(CHROMEDRIVER), options=chrome_opts)
-        else:
-            self.driver = webdriver.Chrome(options=chrome_opts)
-
-        self.wait = WebDriverWait(self.driver, timeout)
-        self.rows: list[SoftwareRow] = []
+FIELDS = list(SoftwareRow.__dataclass_fields__)
 
-    def open_page(self):
-        self.driver.get(URL)
-        #  Wait for tables
-        self.wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.oneColumnPlain table")))
-        time.sleep(1.5)
 
-    def parse_tables(self):
-        tables = self.driver.find_elements(By.CSS_SELECTOR, "div.oneColumnPlain table")
+def _table_rows(table) -> list[SoftwareRow]:
+    # one string object per product, however many versions it has
+    software_name = sys.intern((table["heading"] or "").strip() or "Unknown Software")
+    # skip header rows
+    rows = [cols for cols in ([c.strip() for c in cols] for cols in table["rows"])
+            if len(cols) >= 3 and cols[0] != "Version"]
+    # both date columns of the table in one batch
+    release_dates = normalize_column([cols[1] for cols in rows])
+    eol_dates = normalize_column([cols[2] for cols in rows])
+    return [
+        SoftwareRow(softwareName=software_name, version=cols[0], releaseDate=release_date, eolDate=eol_date)
+        for cols, release_date, eol_date in zip(rows, release_dates, eol_dates)
+    ]
+
+
+# One record per product table, each expanding to its rows
+SITE = SiteSpec(
+    name="eol-sw",
+    url=URL,
+    rows=TABLE_SPEC,
+    fieldnames=FIELDS,
+    record=_table_rows,
+    # the tables are there; wait until they stop changing instead of a fixed 1.5 s
+    wait=Wait(dom_stable(quiet=0.3), timeout=5, required=False),
+    output="paloalto_software_eol.csv",
+)
+
+
+# --- one-pass parsing ---------------------------------------------------------
+#
+# TABLE_SPEC's fallback headings are ./preceding:: lookups, each a walk back
+# through the document, tried per table. parse_source() resolves every
+# heading from one document-order walk instead, then parses the tables: in
+# process, or, for pages with enough tables to pay for a process pool, cut
+# out as HTML fragments and parsed across worker processes. Same rows, in
+# the same order, as SITE.records().
+
+_TABLES = etree.XPath(TABLES_XPATH)
+_OWN_HEADING = [etree.XPath(".//th[@colspan]//p//b"), etree.XPath(".//td[@colspan]//p//b")]
+_BODY_ROWS = etree.XPath(".//tbody//tr")
+_CELLS = etree.XPath("./td")
+# plain lxml elements: fragments don't need lxml.html's element classes
+_FRAGMENT_PARSER = etree.HTMLParser()
+
+# below this many tables a process pool costs more than it saves
+PARALLEL_MIN_TABLES = 200
+
+
+def _own_heading(table) -> str | None:
+    # the th[@colspan] form wins over the td one, as in TABLE_SPEC
+    for xp in _OWN_HEADING:
+        found = xp(table)
+        if found:
+            return inner_text(found[0])
+    return None
+
+
+def _headings(root, tables) -> list[str | None]:
+    """
+    Each table's heading as TABLE_SPEC picks it. Tables without a heading
+    cell get theirs from one document-order walk over <p>, <h2>, <h3> and
+    <table> only: the <b> of the nearest preceding <p>, else whichever of
+    the nearest preceding <h2> and <h3> comes first.
+    """
+    out = [_own_heading(t) for t in tables]
+    todo = {t: i for i, t in enumerate(tables) if out[i] is None}
+    if not todo:
+        return out
+    ps: list = []             # every <p> so far, in document order
+    last = {"h2": None, "h3": None}
+    order: dict = {}          # heading -> document position
+    for pos, el in enumerate(root.iter("p", "h2", "h3", "table")):
+        tag = el.tag
+        if tag == "p":
+            ps.append(el)
+        elif tag != "table":
+            last[tag] = el
+            order[el] = pos
+        elif el in todo:
+            # a <p> seen before the table precedes it unless it contains it
+            ancestors = set(el.iterancestors("p"))
+            p = next((p for p in reversed(ps) if p not in ancestors), None)
+            b = p.find("b") if p is not None else None
+            if b is not None:
+                out[todo[el]] = inner_text(b)
+                continue
+            found = [h for h in last.values() if h is not None]
+            if found:
+                out[todo[el]] = inner_text(min(found, key=order.__getitem__))
+    return out
+
+
+def _parse_table(table, heading: str | None) -> list[SoftwareRow]:
+    return _table_rows({
+        "heading": heading,
+        "rows": [[inner_text(td) for td in _CELLS(tr)] for tr in _BODY_ROWS(table)],
+    })
+
+
+def _parse_fragment(item: tuple[str, str | None]) -> list[SoftwareRow]:
+    fragment, heading = item
+    return _parse_table(etree.fromstring(fragment, _FRAGMENT_PARSER).find("body/table"), heading)
+
+
+def parse_source(source, workers: int | None = None) -> list[SoftwareRow]:
+    """
+    Every SoftwareRow on the page; `source` is page HTML or an lxml tree.
+    workers=None uses a process pool (one worker per CPU) only for pages
+    with PARALLEL_MIN_TABLES tables or more; workers=1 parses in-process.
+    """
+    root = parse_html(source, URL) if isinstance(source, str) else source
+    tables = _TABLES(root)
+    headings = _headings(root, tables)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(tables) >= PARALLEL_MIN_TABLES else 1
+    if workers > 1 and len(tables) > 1:
+        import multiprocessing as mp
+
+        # job processes (webscraper.py) are daemonic and can't start a pool
+        if not mp.current_process().daemon:
+            return _parse_in_pool(tables, headings, workers)
+    return [row for t, heading in zip(tables, headings) for row in _parse_table(t, heading)]
+
+
+def _parse_in_pool(tables, headings, workers: int) -> list[SoftwareRow]:
+    from concurrent.futures import ProcessPoolExecutor
+
+    items = [
+        (etree.tostring(t, method="html", encoding="unicode", with_tail=False), heading)
+        for t, heading in zip(tables, headings)
+    ]
+    workers = min(workers, len(items))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        parsed = ex.map(_parse_fragment, items, chunksize=-(-len(items) // (workers * 4)))
+        return [row for rows in parsed for row in rows]
+
+
+class PaloAltoSoftwareScraper(SiteScraper):
+    def __init__(
+        self,
+        headless: bool = True,
+        timeout: int = 20,
+        pool=None,
+        url: str = URL,
+        backend: str = "auto",
+        incremental: bool = False,
+    ):
+        super().__init__(SITE, url, pool, backend, timeout, headless)
+        # incremental: conditional fetch through the HTTP cache, and a
+        # *.changes.csv diff against the previous output on save
+        self.incremental = incremental
+        self.unchanged = False
+        self.page = None  # committed to the HTTP cache once saved
+
+    @timed("eol_sw.open_page")
+    def open_page(self):
+        html = None
+        if self.incremental and self.backend != "browser":
+            import requests
 
-        for table in tables:
             try:
-                software_name = "Unknown Software"
-
-                # 🔹 Try different possible heading formats in order
-                try:
-                    heading = table.find_element(By.CSS_SELECTOR, "th[colspan] p b")
-                    software_name = heading.text.strip()
-                except Exception:
-                    try:
-                        heading = table.find_element(By.CSS_SELECTOR, "td[colspan] p b")
-                        software_name = heading.text.strip()
-                    except Exception:
-                        try:
-                            heading = table.find_element(By.XPATH, "./preceding::p[1]/b")
-                            software_name = heading.text.strip()
-                        except Exception:
-                            try:
-                                heading = table.find_element(By.XPATH, "./preceding::h2[1] | ./preceding::h3[1]")
-                                software_name = heading.text.strip()
-                            except Exception:
-                                pass
-
-                # Extract table rows
-                rows = table.find_elements(By.CSS_SELECTOR, "tbody tr")
-                for row in rows:
-                    cols = [td.text.strip() for td in row.find_elements(By.TAG_NAME, "td")]
-                    # skip header rows
-                    if len(cols) >= 3 and cols[0] != "Version":
-                        version = cols[0]
-                        release_date = normalize_date(cols[1])
-                        eol_date = normalize_date(cols[2])
-                        self.rows.append(SoftwareRow(
-                            softwareName=software_name,
-                            version=version,
-                            releaseDate=release_date,
-                            eolDate=eol_date
-                        ))
-            except Exception as e:
-                print(f"[warn] failed to parse table: {e}")
-
-        print(f"Parsed {len(self.rows)} rows from {len(tables)} tables.")
+                self.page = HttpCache().fetch(self.url, self.timeout)
+            except requests.RequestException as e:
+                print(f"[warn] conditional fetch failed: {e}")
+            else:
+                self.unchanged = not self.page.changed
+                if self.unchanged:
+                    # nothing to parse; run() keeps the previous CSV
+                    return
+                html = self.page.text
+
+        self.open(html)
+
+    @timed("eol_sw.parse_tables")
+    def parse_tables(self, workers: int | None = None):
+        # The page source once (one round-trip in the browser), split into
+        # per-table fragments and parsed off the driver
+        if self.source is None:
+            self.open(self.page.text if self.page is not None else None)
+        source = self.source
+        if hasattr(source, "execute_script"):
+            source = parse_html(source.page_source, self.url)
+        self.rows = parse_source(source, workers)
+        print(f"Parsed {len(self.rows)} rows.")
 
+    @timed("eol_sw.save")
     def save_csv(self, path: str = "paloalto_software_eol.csv"):
-        df = pd.DataFrame([asdict(r) for r in self.rows])
-        df.to_csv(path, index=False, encoding="utf-8")
-        print(df.head())
-        print(f" Saved {len(df)} rows to {path}")
+        if self.incremental:
+            n = write_changes(
+                path, read_snapshot(path), [as_dict(r) for r in self.rows],
+                key=lambda r: (r["softwareName"], r["version"]),
+                fieldnames=FIELDS,
+            )
+            print(f"{n} rows added/removed/modified since last run")
+
+        self.save(path)
+
+    @timed("eol_sw.store")
+    def store(self, path: str = STORE_PATH):
+        with EolStore(path) as db:
+            added, modified, removed = db.upsert_software(self.rows, source=self.url)
+        print(f"Stored in {path}: {added} added, {modified} modified, {removed} removed")
+
+
+def run(url: str = URL, path: str = "paloalto_software_eol.csv", store: str | None = STORE_PATH,
+        incremental: bool = True) -> int | None:
+    """
+    Scrape into `path`, and the EOL store at `store` unless None; returns
+    the row count, or None if an incremental run found the page unchanged.
+    """
+    scraper = PaloAltoSoftwareScraper(headless=True, url=url, incremental=incremental)
+    try:
+        scraper.open_page()
+        if scraper.unchanged and os.path.exists(path):
+            print(f"Unchanged since last run, keeping {path}")
+            return None
+        scraper.parse_tables()
+        scraper.save_csv(path)
+        if store:
+            scraper.store(store)
+        if scraper.page is not None:
+            # only now, so a failed run isn't mistaken for "unchanged" next time
+            HttpCache().commit(scraper.page)
+    finally:
+        scraper.close()
+    return len(scraper.rows)
 
 
 def main():
-    scraper = PaloAltoSoftwareScraper(headless=True)
-    scraper.open_page()
-    scraper.parse_tables()
-    scraper.save_csv()
-    scraper.driver.quit()
+    parser = argparse.ArgumentParser(description="Scrape Palo Alto software EOL dates")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip an unchanged page and write the rows that changed to *.changes.csv")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="EOL store to upsert the rows into")
+    parser.add_argument("--no-store", dest="store", action="store_const", const=None)
+    args = parser.parse_args()
+
+    run(store=args.store, incremental=args.incremental)
 
 
 if __name__ == "__main__":
@@ -1,32 +1,59 @@
 # Troemner OIML Weight Sets scraper (Selenium + Python)
 # Outputs: troemner_oiml_weight_sets.csv with columns:
 # vendor, productName, model, description, productURL, cost
+# (plus specs, documents from each product page with --details)
 
-import time
+import argparse
 import re
-import pandas as pd
-from dataclasses import dataclass, asdict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from urllib.parse import urljoin
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    CHROMEDRIVER = ChromeDriverManager().install()
-except Exception:
-    CHROMEDRIVER = None
+from checkpoint import Checkpoint
+from enrich import enrich
+from extract import Field, RowSpec, extract_tree, has_class
+from fetch import get, inner_text, parse_html
+from metrics import timed
+from numeric import Typed
+from sitespec import SiteScraper, SiteSpec
+from waits import Wait, dom_stable
 
 BASE_URL = "https://www.troemner.com"
 CATEGORY_URL = "https://www.troemner.com/Calibration-Weights/Balance-Calibration-Weights/OIML-Calibration-Weight-Sets/c/3944"
 EXPECTED_MODELS = 162
 
+# Column types for typed output: "$3,150.00" -> Decimal("3150.00"), currency "USD"
+TYPES = {"cost": Typed("price", currency="currency")}
+
+# XPath form of "ul#resultsList > li.product-item" and the per-tile fields
+CARD_XPATH = f"//ul[@id='resultsList']/li[{has_class('product-item')}]"
+CARD_SPEC = RowSpec(
+    rows=CARD_XPATH,
+    fields={
+        "model": Field(".", attr="data-code"),
+        "code": Field(f".//span[{has_class('code')}]"),
+        "name": Field(f".//h3[{has_class('title')}]//a"),
+        "href": Field(f".//h3[{has_class('title')}]//a", attr="href"),
+        "description": Field(f".//div[{has_class('description')} and {has_class('product-description')}]"),
+        "cost": Field(f".//div[{has_class('price')}]//span[{has_class('priceValue')}]"),
+    },
+)
+# the results endpoint may answer with bare <li> tiles instead of JSON
+FRAGMENT_SPEC = RowSpec(rows=f"//li[{has_class('product-item')}]", fields=CARD_SPEC.fields)
+
+# Paginated result endpoint behind the category's infinite scroll
+RESULTS_PATH = "/results"
+RESULTS_PARAMS = {"q": ":relevance", "sort": "relevance"}
+RESULTS_HEADERS = {
+    "Accept": "application/json, text/html;q=0.9",
+    "X-Requested-With": "XMLHttpRequest",
+}
+# in case the endpoint ignores or clamps the page number
+MAX_RESULT_PAGES = 100
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class ProductRow:
     vendor: str
     productName: str
@@ -34,130 +61,285 @@ class ProductRow:
     description: str
     productURL: str
     cost: str
+    # from the product page, only with details
+    specs: str = ""
+    documents: str = ""
+
+
+FIELDS = ["vendor", "productName", "model", "description", "productURL", "cost"]
+DETAIL_FIELDS = ["specs", "documents"]
+
+
+def _card_row(card: dict) -> ProductRow | None:
+    model = card["model"] or ""
+    if not model:
+        code_text = (card["code"] or "").strip()
+        if code_text:
+            m = re.search(r"\(([^)]+)\)", code_text)
+            model = m.group(1) if m else code_text
+
+    if card["name"] is None:
+        print("[warn] could not parse product card: no h3.title link")
+        return None
+
+    return ProductRow(
+        vendor="troemner",
+        productName=card["name"].strip(),
+        model=model,
+        description=(card["description"] or "").strip(),
+        productURL=urljoin(BASE_URL, card["href"] or ""),
+        cost=card["cost"].strip() if card["cost"] is not None else "N/A",
+    )
+
+
+def _json_row(product: dict) -> ProductRow:
+    description = product.get("description") or product.get("summary") or ""
+    if "<" in description:
+        description = inner_text(parse_html(f"<div>{description}</div>", BASE_URL))
+    price = product.get("price") or {}
+    return ProductRow(
+        vendor="troemner",
+        productName=(product.get("name") or "").strip(),
+        model=product.get("code") or "",
+        description=" ".join(description.split()),
+        productURL=urljoin(BASE_URL, product.get("url") or ""),
+        cost=price.get("formattedValue") or "N/A",
+    )
+
+
+def fetch_results_page(url: str, page: int, timeout: int = 20) -> tuple[list[ProductRow], int | None]:
+    """
+    One page of the category's result endpoint over pooled keep-alive HTTP.
+    Returns the page's rows and the total page count (None when the
+    endpoint answered with an HTML fragment that doesn't say).
+    """
+    resp = get(url + RESULTS_PATH, params={**RESULTS_PARAMS, "page": page},
+               timeout=timeout, headers=RESULTS_HEADERS)
+    if "json" in resp.headers.get("Content-Type", ""):
+        data = resp.json()
+        pages = (data.get("pagination") or {}).get("numberOfPages")
+        return [_json_row(p) for p in data.get("results") or []], pages
+
+    tree = parse_html(resp.text, resp.url)
+    rows = [_card_row(card) for card in extract_tree(tree, FRAGMENT_SPEC)]
+    return [r for r in rows if r is not None], None
+
 
+# The category page's listing tiles. The tiles come from infinite scroll,
+# so the page itself is always read in the browser (API mode aside).
+SITE = SiteSpec(
+    name="troemner",
+    url=CATEGORY_URL,
+    rows=CARD_SPEC,
+    fieldnames=FIELDS,
+    record=_card_row,
+    ready="//ul[@id='resultsList']",
+    wait=Wait(dom_stable(quiet=0.3), timeout=5, required=False),
+    consent=True,
+    scroll={"container": "ul#resultsList", "item": ":scope > li.product-item", "expected": EXPECTED_MODELS,
+            "quiet": 1.0, "timeout": 60},
+    http=False,
+    types=TYPES,
+    output="troemner_oiml_weight_sets.csv",
+)
 
-class TroemnerOIMLScraper:
-    def __init__(self, headless: bool = True, timeout: int = 20):
-        chrome_opts = Options()
-        if headless:
-            chrome_opts.add_argument("--headless=new")
-        chrome_opts.add_argument("--disable-gpu")
-        chrome_opts.add_argument("--no-sandbox")
-        chrome_opts.add_argument("--window-size=1400,900")
-        chrome_opts.add_argument("--disable-dev-shm-usage")
-        chrome_opts.add_argument("--start-maximized")
-        chrome_opts.add_argument("--log-level=3")
-
-        if CHROMEDRIVER:
-            self.driver = webdriver.Chrome(service=Service(CHROMEDRIVER), options=chrome_opts)
+
+class TroemnerOIMLScraper(SiteScraper):
+    def __init__(self, headless: bool = True, timeout: int = 20, pool=None, url: str = CATEGORY_URL):
+        super().__init__(SITE, url, pool, "browser", timeout, headless)
+        self.detailed = False
+
+    @timed("troemner.fetch_listing")
+    def fetch_listing(self, max_workers: int = 4, checkpoint=None) -> bool:
+        """
+        API mode: read every listing page straight from the result endpoint,
+        pages 1..N in parallel once page 0 reports N. Returns False (leaving
+        self.rows empty) when the endpoint is unusable, so the caller can
+        fall back to the browser. Result pages already in `checkpoint` aren't
+        fetched again.
+        """
+        import requests
+
+        ck = checkpoint
+        by_page = {}
+        if ck is not None:
+            for unit, rows in ck.rows_by_unit(ProductRow).items():
+                if unit.startswith("page:"):
+                    by_page[int(unit[5:])] = rows
+
+        def done(n, rows):
+            by_page[n] = rows
+            if ck is not None:
+                ck.complete(f"page:{n}", rows)
+
+        def is_done(n):
+            return ck is not None and ck.is_done(f"page:{n}")
+
+        if is_done(0):
+            pages = ck.get("pages")
         else:
-            self.driver = webdriver.Chrome(options=chrome_opts)
-
-        self.wait = WebDriverWait(self.driver, timeout)
-        self.rows: list[ProductRow] = []
-
-    def _dismiss_overlays(self):
-        candidates = [
-            (By.XPATH, "//button[contains(., 'Accept') or contains(., 'I Agree')]"),
-            (By.CSS_SELECTOR, "button#onetrust-accept-btn-handler"),
-            (By.CSS_SELECTOR, "button[aria-label='Accept cookies']"),
-        ]
-        for by, sel in candidates:
             try:
-                el = self.wait.until(EC.element_to_be_clickable((by, sel)))
-                el.click()
-                time.sleep(0.5)
-                break
-            except Exception:
-                pass
-
-    def open_category(self):
-        self.driver.get(CATEGORY_URL)
-        self._dismiss_overlays()
-        self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "ul#resultsList")))
-        time.sleep(1.5)
-
-    def _scroll_to_bottom(self):
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-
-    def load_all_products(self):
-        seen, stagnant_rounds = 0, 0
-        while True:
-            self._scroll_to_bottom()
-            time.sleep(0.8)
-
-            items = self.driver.find_elements(By.CSS_SELECTOR, "ul#resultsList > li.product-item")
-            count = len(items)
-
-            if count == seen:
-                stagnant_rounds += 1
-                if stagnant_rounds >= 2:
+                first, pages = fetch_results_page(self.url, 0, self.timeout)
+            except (requests.RequestException, ValueError) as e:
+                print(f"[warn] result endpoint unavailable: {e}")
+                return False
+            if not first:
+                return False
+            if ck is not None:
+                ck.set("pages", pages)
+            done(0, first)
+
+        if pages is not None:
+            if pages > MAX_RESULT_PAGES:
+                print(f"[warn] endpoint reports {pages} result pages, reading the first {MAX_RESULT_PAGES}")
+                pages = MAX_RESULT_PAGES
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="troemner") as ex:
+                futures = {n: ex.submit(fetch_results_page, self.url, n, self.timeout)
+                           for n in range(1, pages) if not is_done(n)}
+                failed = 0
+                for n, fut in futures.items():
+                    try:
+                        done(n, fut.result()[0])
+                    except (requests.RequestException, ValueError) as e:
+                        print(f"[warn] result page {n} failed: {e}")
+                        failed += 1
+                # the pages that did arrive stay in the checkpoint
+                if failed:
+                    return False
+        else:
+            # HTML fragments don't report a page count; walk until a page is
+            # empty or repeats the one before it
+            n = 1
+            previous = [r.model for r in by_page.get(0, [])]
+            while n < MAX_RESULT_PAGES:
+                if is_done(n):
+                    rows = by_page.get(n, [])
+                else:
+                    try:
+                        rows, _ = fetch_results_page(self.url, n, self.timeout)
+                    except (requests.RequestException, ValueError) as e:
+                        print(f"[warn] result page {n} failed: {e}")
+                        return False
+                    done(n, rows)
+                models = [r.model for r in rows]
+                if not rows or models == previous:
+                    by_page.pop(n, None)
                     break
+                previous = models
+                n += 1
             else:
-                seen, stagnant_rounds = count, 0
+                print(f"[warn] stopped after {MAX_RESULT_PAGES} result pages")
 
-        print(f"Discovered {seen} product tiles on listing pages.")
+        seen = set()
+        for n in sorted(by_page):
+            for row in by_page[n]:
+                if row.model and row.model in seen:
+                    continue
+                seen.add(row.model)
+                self.rows.append(row)
 
-    def _text_or_none(self, root, by, sel):
-        try:
-            return root.find_element(by, sel).text.strip()
-        except Exception:
-            return None
+        print(f"Fetched {len(self.rows)} rows from {len(by_page)} result pages.")
+        return True
 
-    def parse_products(self):
-        cards = self.driver.find_elements(By.CSS_SELECTOR, "ul#resultsList > li.product-item")
-        for li in cards:
-            try:
-                vendor = "troemner"
-
-                model = li.get_attribute("data-code") or ""
-                if not model:
-                    code_text = self._text_or_none(li, By.CSS_SELECTOR, "span.code")
-                    if code_text:
-                        m = re.search(r"\(([^)]+)\)", code_text)
-                        model = m.group(1) if m else code_text.strip()
-
-                name_el = li.find_element(By.CSS_SELECTOR, "h3.title a")
-                product_name = name_el.text.strip()
-                href = name_el.get_attribute("href")
-                product_url = urljoin(BASE_URL, href)
-
-                description = self._text_or_none(li, By.CSS_SELECTOR, "div.description.product-description") or ""
-
-                try:
-                    cost = li.find_element(By.CSS_SELECTOR, "div.price span.priceValue").text.strip()
-                except:
-                    cost = "N/A"
-
-                self.rows.append(ProductRow(
-                    vendor=vendor,
-                    productName=product_name,
-                    model=model,
-                    description=description,
-                    productURL=product_url,
-                    cost=cost
-                ))
-            except Exception as e:
-                print(f"[warn] could not parse product card: {e}")
+    @timed("troemner.open_category")
+    def open_category(self, checkpoint=None):
+        # consent is one combined probe, a no-op check once it's on record;
+        # the engine then scrolls until every tile is in (SITE.scroll). With a
+        # checkpoint the tiles loaded so far are saved every 15 s of scrolling.
+        def save_tiles(count):
+            self._checkpoint_tiles(checkpoint, SITE.records(self.driver))
+            checkpoint.set("scroll", {"count": count, "complete": False})
+
+        self.open(on_scroll=save_tiles if checkpoint is not None else None)
+
+    @timed("troemner.parse_products")
+    def parse_products(self, checkpoint=None):
+        # All tiles in a single execute_script instead of ~6 round-trips each
+        rows = SITE.records(self.driver)
+        if checkpoint is not None:
+            rows = self._checkpoint_tiles(checkpoint, rows)
+            checkpoint.set("scroll", {"count": len(rows), "complete": True})
+        self.rows.extend(rows)
 
         print(f"Parsed {len(self.rows)} rows.")
 
-    def save_csv(self, path: str = "troemner_oiml_weight_sets.csv"):
-        df = pd.DataFrame([asdict(r) for r in self.rows])
-        df.to_csv(path, index=False, encoding="utf-8")
-        print(df.head())
-        print(f" Saved {len(df)} rows to {path}")
+    @staticmethod
+    def _checkpoint_tiles(ck, rows: list) -> list:
+        # records tiles not yet in the checkpoint; returns `rows` plus tiles
+        # an earlier attempt saved that aren't on the page this time
+        units = {f"tile:{r.model or r.productURL}": r for r in rows}
+        for unit, row in units.items():
+            if not ck.is_done(unit):
+                ck.complete(unit, [row])
+        earlier = [r for unit, saved in ck.rows_by_unit(ProductRow).items()
+                   if unit.startswith("tile:") and unit not in units for r in saved]
+        return rows + earlier
+
+    def add_details(self, workers: int = 16, rate: float | None = None):
+        """Fetch every product page concurrently and fill in specs and documents."""
+        details = enrich([r.productURL for r in self.rows], workers, rate, self.timeout)
+        rows = []
+        for row in self.rows:
+            detail = details.get(row.productURL)
+            if detail is not None and detail.kind != "error":
+                row = replace(row, specs=detail.specs_text(), documents=" | ".join(detail.documents))
+            rows.append(row)
+        self.rows = rows
+        self.detailed = True
+
+    @timed("troemner.save")
+    def save_csv(self, path: str = "troemner_oiml_weight_sets.csv", typed: bool = False):
+        self.save(path, typed, FIELDS + (DETAIL_FIELDS if self.detailed else []))
+
+
+def run(mode: str = "auto", workers: int = 4, url: str = CATEGORY_URL,
+        path: str = "troemner_oiml_weight_sets.csv", typed: bool = False, details: bool = False,
+        detail_workers: int = 16, resume: bool = False) -> int:
+    """
+    Scrape into troemner_oiml_weight_sets.csv; returns the number of rows.
+    Progress is checkpointed as it goes; resume=True continues the last
+    unfinished run instead of starting over.
+    """
+    scraper = TroemnerOIMLScraper(headless=True, url=url)
+    ck = Checkpoint("troemner", job={"url": url, "mode": mode}, resume=resume)
+    completed = False
+    try:
+        if mode == "browser" or not scraper.fetch_listing(workers, ck):
+            if mode == "api":
+                raise RuntimeError("result endpoint unavailable")
+            if (ck.get("scroll") or {}).get("complete"):
+                scraper.rows = scraper._checkpoint_tiles(ck, [])
+                print(f"[info] {len(scraper.rows)} product tiles from the checkpoint, skipping the browser")
+            else:
+                scraper.open_category(checkpoint=ck)
+                scraper.parse_products(checkpoint=ck)
+        if len(scraper.rows) != EXPECTED_MODELS:
+            print(f"[note] Expected {EXPECTED_MODELS} models, got {len(scraper.rows)}.")
+        if details:
+            # finished product pages are in the detail cache, so a resumed run skips them
+            scraper.add_details(detail_workers)
+        scraper.save_csv(path, typed=typed)
+        completed = True
+    finally:
+        scraper.close()
+        ck.close(completed)
+    return len(scraper.rows)
 
 
 def main():
-    scraper = TroemnerOIMLScraper(headless=True)
-    scraper.open_category()
-    scraper.load_all_products()
-    scraper.parse_products()
-    if len(scraper.rows) != EXPECTED_MODELS:
-        print(f"[note] Expected {EXPECTED_MODELS} models, got {len(scraper.rows)}.")
-    scraper.save_csv()
-    scraper.driver.quit()
+    parser = argparse.ArgumentParser(description="Scrape Troemner OIML weight sets")
+    parser.add_argument("--mode", choices=["auto", "api", "browser"], default="auto",
+                        help="api: result endpoint over HTTP; auto: api, falling back to the browser")
+    parser.add_argument("--workers", type=int, default=4, help="parallel result-page requests")
+    parser.add_argument("--out", default="troemner_oiml_weight_sets.csv", help="output file (.csv, .jsonl or .parquet)")
+    parser.add_argument("--typed", action="store_true", help="write cost as a number plus a currency column")
+    parser.add_argument("--details", action="store_true", help="also fetch each product page's specs")
+    parser.add_argument("--detail-workers", type=int, default=16, help="concurrent product-page requests")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run from its checkpoint")
+    args = parser.parse_args()
+
+    run(mode=args.mode, workers=args.workers, path=args.out, typed=args.typed, details=args.details,
+        detail_workers=args.detail_workers, resume=args.resume)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,794 @@
+"""Benchmarks for the Webscraper jobs against local fixture pages.
+
+  python bench.py fetch [--repeat N] [--rounds R] [--browser]
+  python bench.py crawl [--pages N] [--delay S] [--workers 1 4 16]
+  python bench.py enrich [--delay S] [--workers 1 4 16]
+  python bench.py waits                  (needs Chrome)
+  python bench.py scroll                 (needs Chrome)
+  python bench.py dates [--n 100000] [--distinct 2000]
+  python bench.py rows [--n 200000]
+  python bench.py tables [--repeat 20] [--workers 1 4]
+  python bench.py imports [--rounds 5]
+  python bench.py suite [--browser] [--save-baseline]
+  python bench.py profile                (needs Chrome)
+  python bench.py tabs [--tabs 1 2 4]    (needs Chrome)
+  python bench.py throttle [--rate 40] [--pages 10]
+  python bench.py store [--n 100000]
+
+"fetch" times each scraper on the HTTP+lxml backend and, with --browser,
+on the Selenium backend too, and prints the speedup.
+"crawl" times a full books catalogue crawl at several concurrency levels
+against a server that adds per-request latency.
+"enrich" fetches the Troemner product pages (162) and the hardware EOL
+resource links (33, some of them PDFs) at several concurrency levels against
+the same latency, cold and then through the detail cache.
+"waits" loads fixture pages in Chrome and compares each readiness
+condition's measured wait with the fixed sleep it replaced.
+"scroll" loads the lazy Troemner fixture with the old sleep-and-requery
+loop and with the MutationObserver loader.
+"dates" normalizes synthetic EOL date strings with the old per-row
+dateutil / strptime code and with dates.py, and checks they agree.
+"rows" builds a large software-EOL result both ways: plain dataclass rows
+through asdict() into a DataFrame, and slotted rows with interned names
+through a ColumnBuffer, and reports time and traced memory for each.
+"tables" parses the software EOL fixture, its tables repeated, with the
+per-table TABLE_SPEC lookups and with EOLsoftwares.parse_source at several
+process-pool sizes, for headings in a header cell and ahead of each table,
+and checks every way gives the same rows.
+"imports" imports each scraper module in a fresh interpreter under
+-X importtime and reports its cumulative import time, its heaviest
+dependency, and whether Selenium, pandas or chromedriver resolution ran.
+"suite" runs every scraper per backend against the replay server (recorded
+pages, or fixtures where nothing is recorded), each in a fresh process, and
+reports wall time, WebDriver round-trips, HTTP requests, peak RSS and
+rows/sec, the best of --rounds runs. Results are compared with
+bench_baseline.json: a job slower than the baseline by more than
+--tolerance (a fraction of its baseline time) and more than the timer noise
+floor (--min-delta, 2 ms) is a regression and exits with status 1.
+"profile" loads each page, weighed down with slow images, stylesheets,
+fonts and analytics scripts, with the full and the lean browser profile.
+"tabs" loads the EOL, Troemner and population fixtures (each --copies
+times) through one tab after another in a pooled Chrome, then as parallel
+tabs of the same Chrome over CDP, against a server with per-request
+latency, and checks both give the same rows.
+"throttle" crawls the books catalogue with details against a server that
+rate-limits like the live sites (429s with Retry-After above --rate
+requests/s, latency growing with concurrency): with no retries, with
+retries alone, and through the adaptive scheduler, and reports the time,
+rows that came back complete, and the 429s the server sent.
+"store" upserts a software EOL table stretched to --n rows into the EOL
+store (a first run, then one with 1% of the rows changed), and times the
+date-range and product queries against loading the CSV to answer them.
+
+These only time things; the checks that every scraper still gets the same
+rows from the fixture pages are pytest tests (python -m pytest tests).
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from fixtures import FixtureServer
+
+
+def _timeit(fn, rounds: int) -> tuple[float, int]:
+    best, n = float("inf"), 0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        n = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, n
+
+
+def _fetch_jobs(url, backend: str, out_dir: str):
+    # `url` maps a fixture name to its URL, e.g. FixtureServer.url
+    from Books import BookScraper
+    from population import PopulationScraper
+    from EOLhardware import scrape as scrape_hardware
+    from EOLsoftwares import PaloAltoSoftwareScraper
+    from Task2 import TroemnerOIMLScraper
+
+    def books():
+        s = BookScraper(url("books"), backend=backend)
+        s.open_page()
+        s.scrape_books()
+        s.close()
+        return len(s.master_list)
+
+    def population():
+        s = PopulationScraper(url("population"), backend=backend)
+        s.scrape_table()
+        s.close()
+        return len(s.master_list)
+
+    def eol_hw():
+        return len(scrape_hardware(url=url("eol-hw"), backend=backend,
+                                   out_csv=os.path.join(out_dir, "hw.csv"),
+                                   store=os.path.join(out_dir, "eol.sqlite")))
+
+    def eol_sw():
+        s = PaloAltoSoftwareScraper(url=url("eol-sw"), backend=backend)
+        s.open_page()
+        s.parse_tables()
+        s.close()
+        return len(s.rows)
+
+    def troemner():
+        # http: the result endpoint; browser: the category page's tiles
+        s = TroemnerOIMLScraper(url=url("troemner"))
+        if backend == "http":
+            s.fetch_listing()
+        else:
+            s.open_category()
+            s.parse_products()
+        s.close()
+        return len(s.rows)
+
+    return {"books": books, "population": population, "eol-hw": eol_hw, "eol-sw": eol_sw,
+            "troemner": troemner}
+
+
+def bench_fetch(args):
+    backends = ["http"] + (["browser"] if args.browser else [])
+    results: dict[str, dict[str, tuple[float, int]]] = {}
+
+    with FixtureServer(repeat=args.repeat) as srv, tempfile.TemporaryDirectory() as out_dir:
+        for backend in backends:
+            for name, job in _fetch_jobs(srv.url, backend, out_dir).items():
+                results.setdefault(name, {})[backend] = _timeit(job, args.rounds)
+
+    print(f"{'job':12s} {'backend':8s} {'rows':>6s} {'seconds':>9s} {'speedup':>8s}")
+    for name, by_backend in results.items():
+        for backend, (secs, rows) in by_backend.items():
+            speedup = ""
+            if backend == "http" and "browser" in by_backend:
+                speedup = f"{by_backend['browser'][0] / secs:7.1f}x"
+            print(f"{name:12s} {backend:8s} {rows:6d} {secs:9.3f} {speedup:>8s}")
+
+
+def bench_crawl(args):
+    from Books import BookScraper
+
+    with FixtureServer(book_pages=args.pages, delay=args.delay) as srv:
+        print(f"{'workers':>7s} {'rows':>6s} {'seconds':>9s} {'rows/s':>8s}")
+        for workers in args.workers:
+            scraper = BookScraper(srv.url("books"))
+
+            def run():
+                return sum(1 for _ in scraper.crawl(max_workers=workers, details=args.details))
+
+            secs, rows = _timeit(run, args.rounds)
+            print(f"{workers:7d} {rows:6d} {secs:9.3f} {rows / secs:8.0f}")
+
+
+def bench_enrich(args):
+    from enrich import DetailCache, enrich
+    from fixtures import eol_resource_pages, troemner_detail_pages
+
+    with FixtureServer(delay=args.delay) as srv, tempfile.TemporaryDirectory() as tmp:
+        # the detail pages live at the live sites' paths on the fixture server
+        paths = [p for p in {**troemner_detail_pages(), **eol_resource_pages()}
+                 if not p.startswith("/medias/")]
+        urls = [srv.base + p for p in paths]
+        print(f"{'workers':>7s} {'links':>6s} {'cold s':>9s} {'cached s':>9s}")
+        for workers in args.workers:
+            cache = DetailCache(os.path.join(tmp, f"details-{workers}.json"))
+            with open(os.devnull, "w") as null, redirect_stdout(null):
+                t0 = time.perf_counter()
+                details = enrich(urls, workers, cache=cache)
+                cold = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                enrich(urls, workers, cache=cache)
+                warm = time.perf_counter() - t0
+            print(f"{workers:7d} {len(details):6d} {cold:9.3f} {warm:9.3f}")
+
+
+def bench_waits(args):
+    from driver_pool import get_pool
+    from Books import BOOK_XPATH
+    from waits import count_stopped_growing, dom_stable, wait_for
+
+    # fixture, fixed sleep the condition replaced, condition factory
+    cases = [
+        ("books", 2.0, lambda: count_stopped_growing(BOOK_XPATH, quiet=0.2)),
+        ("eol-sw", 1.5, lambda: dom_stable(quiet=0.3)),
+        ("troemner", 1.5, lambda: dom_stable(quiet=0.3)),
+    ]
+
+    with FixtureServer() as srv, get_pool().lease() as driver:
+        print(f"{'page':10s} {'sleep':>6s} {'waited':>7s} {'saved':>6s}")
+        total = 0.0
+        for name, fixed, make_condition in cases:
+            waited = float("inf")
+            for _ in range(args.rounds):
+                driver.get(srv.url(name))
+                t0 = time.perf_counter()
+                wait_for(driver, make_condition(), timeout=10)
+                waited = min(waited, time.perf_counter() - t0)
+            total += fixed - waited
+            print(f"{name:10s} {fixed:6.2f} {waited:7.3f} {fixed - waited:6.2f}")
+        print(f"saved {total:.2f}s per run on these pages")
+
+
+def _polling_scroll(driver, item_xpath):
+    # the pre-MutationObserver loader, kept here as the baseline
+    from selenium.webdriver.common.by import By
+
+    seen, stagnant_rounds, calls = 0, 0, 0
+    while True:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(0.8)
+        count = len(driver.find_elements(By.XPATH, item_xpath))
+        calls += 2
+        if count == seen:
+            stagnant_rounds += 1
+            if stagnant_rounds >= 2:
+                return seen, calls
+        else:
+            seen, stagnant_rounds = count, 0
+
+
+def bench_scroll(args):
+    from driver_pool import get_pool
+    from scroll import load_all
+    from Task2 import CARD_XPATH, EXPECTED_MODELS
+
+    with FixtureServer(repeat=args.repeat) as srv, get_pool().lease() as driver:
+        print(f"{'loader':10s} {'items':>6s} {'calls':>6s} {'seconds':>8s}")
+        for name in ("polling", "observer"):
+            driver.get(srv.url("troemner-lazy"))
+            t0 = time.perf_counter()
+            if name == "polling":
+                count, calls = _polling_scroll(driver, CARD_XPATH)
+            else:
+                count, _ = load_all(driver, "ul#resultsList", ":scope > li.product-item",
+                                    expected=EXPECTED_MODELS * args.repeat if args.expected else None)
+                calls = 2
+            print(f"{name:10s} {count:6d} {calls:6d} {time.perf_counter() - t0:8.2f}")
+
+
+def _legacy_fuzzy(s):
+    # EOLhardware's old per-row normalizer, kept here as the baseline
+    from dateutil import parser as dateparser
+
+    s = s.strip()
+    if not s or s.lower() in {"tbd", "n/a", "-"}:
+        return s
+    try:
+        return dateparser.parse(s, dayfirst=False, fuzzy=True).strftime("%Y-%m-%d")
+    except Exception:
+        return s
+
+
+def _legacy_strict(s):
+    # EOLsoftwares' old two-format strptime normalizer
+    from datetime import datetime
+
+    if not s:
+        return ""
+    for fmt in ("%B %d, %Y", "%b %d, %Y"):
+        try:
+            return datetime.strptime(s.strip(), fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return s.strip()
+
+
+def _synthetic_dates(n: int, distinct: int, seed: int = 0) -> list[str]:
+    import random
+    from datetime import date, timedelta
+
+    rnd = random.Random(seed)
+    start = date(2015, 1, 1)
+    days = [start + timedelta(days=rnd.randrange(6000)) for _ in range(distinct)]
+    shapes = [
+        lambda d: d.strftime("%B %d, %Y").replace(" 0", " "),
+        lambda d: d.strftime("%b %d, %Y"),
+        lambda d: d.isoformat(),
+        lambda d: f"{d.month}/{d.day}/{d.year}",
+        lambda d: rnd.choice(["TBD", "Latest", "End-of-Life Date", ""]),
+    ]
+    pool = [rnd.choices(shapes, weights=[60, 20, 5, 5, 10])[0](d) for d in days]
+    return [rnd.choice(pool) for _ in range(n)]
+
+
+def bench_dates(args):
+    import dates
+
+    values = _synthetic_dates(args.n, args.distinct)
+    print(f"{args.n} strings, {len(set(values))} distinct")
+    print(f"{'mode':7s} {'normalizer':22s} {'seconds':>8s} {'speedup':>8s}")
+
+    for fuzzy, legacy in ((True, _legacy_fuzzy), (False, _legacy_strict)):
+        mode = "fuzzy" if fuzzy else "strict"
+        expected = [legacy(v) for v in values]
+
+        def per_row():
+            dates.normalize_date.cache_clear()
+            return [dates.normalize_date(v, fuzzy) for v in values]
+
+        def column():
+            dates.normalize_date.cache_clear()
+            return dates.normalize_column(values, fuzzy)
+
+        base, _ = _timeit(lambda: [legacy(v) for v in values], args.rounds)
+        print(f"{mode:7s} {legacy.__name__:22s} {base:8.3f} {'':>8s}")
+        for fn in (per_row, column):
+            secs, _ = _timeit(fn, args.rounds)
+            if fn() != expected:
+                print(f"[warn] {fn.__name__} disagrees with {legacy.__name__}")
+            print(f"{mode:7s} {'dates.' + fn.__name__:22s} {secs:8.3f} {base / secs:7.1f}x")
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+
+def _suite_child(name: str, backend: str, urls: dict, rounds: int, conn):
+    # runs in a fresh process, so peak RSS is this job's alone
+    import metrics
+
+    metrics.enable(log=None)
+
+    try:
+        with tempfile.TemporaryDirectory() as out_dir, open(os.devnull, "w") as quiet, redirect_stdout(quiet):
+            job = _fetch_jobs(urls.__getitem__, backend, out_dir)[name]
+            best = None
+            for _ in range(rounds):
+                metrics.reset()
+                t0 = time.perf_counter()
+                rows = job()
+                secs = time.perf_counter() - t0
+                if best is None or secs < best["seconds"]:
+                    best = {"rows": rows, "seconds": secs, "webdriver_calls": metrics.webdriver_calls(),
+                            "http_requests": metrics.http_requests()}
+        from driver_pool import get_pool
+        get_pool().close()  # so chromedriver/Chrome count in RUSAGE_CHILDREN
+        # ru_maxrss is in KiB on Linux; the largest single process
+        peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+        best["peak_mb"] = round(peak / 1024, 1)
+        best["rows_per_sec"] = round(best["rows"] / best["seconds"]) if best["seconds"] else 0
+        best["seconds"] = round(best["seconds"], 4)
+        conn.send(best)
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def _regressions(key: str, result: dict, base: dict, tolerance: float, min_delta: float) -> list[str]:
+    found = []
+    if result["seconds"] > base["seconds"] * (1 + tolerance) and result["seconds"] - base["seconds"] > min_delta:
+        found.append(f"{key}: {result['seconds']:.3f}s vs baseline {base['seconds']:.3f}s")
+    if result["peak_mb"] > base["peak_mb"] * (1 + tolerance):
+        found.append(f"{key}: peak RSS {result['peak_mb']:.0f} MB vs baseline {base['peak_mb']:.0f} MB")
+    for metric in ("webdriver_calls", "http_requests"):
+        if result[metric] > base[metric]:
+            found.append(f"{key}: {result[metric]} {metric} vs baseline {base[metric]}")
+    if result["rows"] != base["rows"]:
+        print(f"[note] {key}: {result['rows']} rows vs baseline {base['rows']} (recordings changed?)")
+    return found
+
+
+def _software_rows(n: int) -> list[tuple[str, str, str, str]]:
+    # the committed EOL table stretched to n rows; names are fresh string
+    # objects per row, as parsing produces them
+    from sinks import read_rows
+
+    base = read_rows(os.path.join(os.path.dirname(os.path.abspath(__file__)), "paloalto_software_eol.csv"))
+    out = []
+    for i in range(n):
+        r = base[i % len(base)]
+        out.append(("".join([r["softwareName"], ""]), f"{r['version']}.{i}", r["releaseDate"], r["eolDate"]))
+    return out
+
+
+def bench_rows(args):
+    import sys
+    import tracemalloc
+    from dataclasses import asdict, dataclass
+
+    import pandas as pd
+
+    from columns import ColumnBuffer
+    from EOLsoftwares import FIELDS, SoftwareRow
+
+    @dataclass
+    class PlainRow:
+        softwareName: str
+        version: str
+        releaseDate: str
+        eolDate: str
+
+    def legacy(values):
+        rows = [PlainRow(*v) for v in values]
+        held = tracemalloc.get_traced_memory()[0]
+        return rows, held, pd.DataFrame([asdict(r) for r in rows])
+
+    def compact(values):
+        rows = [SoftwareRow(sys.intern(name), *rest) for name, *rest in values]
+        held = tracemalloc.get_traced_memory()[0]
+        buf = ColumnBuffer(FIELDS)
+        buf.extend(rows)
+        return rows, held, buf.to_pandas()
+
+    print(f"{args.n} rows")
+    print(f"{'rows':22s} {'seconds':>8s} {'rows MB':>8s} {'peak MB':>8s}")
+    frames = []
+    for name, build in (("dataclass + asdict", legacy), ("slotted + columns", compact)):
+        # timed untraced, then run again under tracemalloc for the memory
+        values = _software_rows(args.n)
+        t0 = time.perf_counter()
+        frames.append(build(values)[2])
+        secs = time.perf_counter() - t0
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        rows, held, _ = build(values)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:22s} {secs:8.2f} {(held - base) / 1e6:8.1f} {(peak - base) / 1e6:8.1f}")
+        del rows, values
+    assert frames[0].equals(frames[1]), "the two paths built different frames"
+
+
+def bench_tables(args):
+    from fetch import parse_html
+    from fixtures import eol_software_page
+    import EOLsoftwares
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'headings':9s} {'tables':>6s} {'rows':>6s} {'parse':18s} {'seconds':>8s} {'speedup':>8s}")
+    for headings in ("cell", "before"):
+        tree = parse_html(eol_software_page(args.repeat, headings), EOLsoftwares.URL)
+        tables = len(EOLsoftwares._TABLES(tree))
+        runs = [("per-table lookups", lambda: EOLsoftwares.SITE.records(tree))]
+        runs += [(f"one pass, {w} proc", lambda w=w: EOLsoftwares.parse_source(tree, workers=w))
+                 for w in args.workers]
+        expected = None
+        for name, parse in runs:
+            secs, _ = _timeit(lambda: len(parse()), args.rounds)
+            rows = parse()
+            if expected is None:
+                expected, base = rows, secs
+            assert rows == expected, f"{name} parsed different rows"
+            print(f"{headings:9s} {tables:6d} {len(rows):6d} {name:18s} {secs:8.3f} {base / secs:7.1f}x")
+
+
+_IMPORT_PROBE = """
+import sys
+import {module}
+import chromedriver
+loaded = [m for m in ("selenium", "pandas", "webdriver_manager") if m in sys.modules]
+print("loaded:" + ",".join(loaded) + (",chromedriver" if chromedriver._resolved is not chromedriver._UNSET else ""))
+"""
+
+
+def _import_times(module: str) -> tuple[int, dict[str, int], list[str]]:
+    # the module's cumulative import time and each of its direct imports',
+    # in microseconds, and what the import loaded
+    import subprocess
+    import sys
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_PROBE.format(module=module)],
+        capture_output=True, text=True, cwd=here, check=True,
+    )
+    children: dict[str, int] = {}
+    total, deps = 0, {}
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name, us = parts[2], int(parts[1])
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        # children are listed before the module that imported them
+        if depth == 1:
+            children[name.strip()] = us
+        elif depth == 0:
+            if name.strip() == module:
+                total, deps = us, children
+            children = {}
+    loaded = proc.stdout.strip().partition("loaded:")[2]
+    return total, deps, [m for m in loaded.split(",") if m]
+
+
+def bench_imports(args):
+    print(f"{'module':14s} {'import ms':>9s}  {'heaviest direct import':30s} loaded")
+    for module in args.modules:
+        total, deps, loaded = min((_import_times(module) for _ in range(args.rounds)), key=lambda r: r[0])
+        heaviest = max(deps, key=deps.get) if deps else ""
+        dep = f"{heaviest} ({deps.get(heaviest, 0) / 1000:.1f} ms)" if heaviest else "-"
+        print(f"{module:14s} {total / 1000:9.1f}  {dep:30s} {', '.join(loaded) or '-'}")
+
+
+def bench_suite(args):
+    from replay import ReplayServer
+
+    ctx = mp.get_context("spawn")
+    backends = ["http"] + (["browser"] if args.browser else [])
+    results = {}
+
+    with ReplayServer() as srv:
+        urls = {name: srv.url(name) for name in args.jobs}
+        print(f"pages: recorded {', '.join(srv.recorded) or '-'}; fixtures for the rest")
+        print(f"{'job':12s} {'backend':8s} {'rows':>6s} {'seconds':>8s} {'rows/s':>8s} "
+              f"{'wd calls':>8s} {'http':>5s} {'peak MB':>8s}")
+        for name in args.jobs:
+            for backend in backends:
+                recv, send = ctx.Pipe(duplex=False)
+                proc = ctx.Process(target=_suite_child, args=(name, backend, urls, args.rounds, send))
+                proc.start()
+                send.close()
+                try:
+                    r = recv.recv()
+                except EOFError:
+                    r = {"error": f"process exited with code {proc.exitcode}"}
+                proc.join()
+                if "error" in r:
+                    print(f"{name:12s} {backend:8s} [warn] {r['error']}")
+                    continue
+                results[f"{name}/{backend}"] = r
+                print(f"{name:12s} {backend:8s} {r['rows']:6d} {r['seconds']:8.3f} {r['rows_per_sec']:8.0f} "
+                      f"{r['webdriver_calls']:8d} {r['http_requests']:5d} {r['peak_mb']:8.1f}")
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = {}
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    regressions = [
+        msg
+        for key, r in results.items() if key in baseline
+        for msg in _regressions(key, r, baseline[key], args.tolerance, args.min_delta)
+    ]
+    for msg in regressions:
+        print(f"[regression] {msg}")
+    if regressions:
+        raise SystemExit(1)
+    if baseline:
+        print("no regressions against the baseline")
+
+
+def bench_profile(args):
+    from browser_profile import FULL, LEAN
+    from driver_pool import DriverPool, goto
+    from replay import ReplayServer
+    from waits import dom_stable, wait_for
+
+    names = ["books", "population", "eol-hw", "eol-sw", "troemner"]
+    results: dict[str, dict[str, float]] = {}
+    with ReplayServer(heavy_assets=args.assets) as srv:
+        for label, profile in (("full", FULL), ("lean", LEAN)):
+            with DriverPool(profile=profile) as pool, pool.lease() as driver:
+                for name in names:
+                    best = float("inf")
+                    for _ in range(args.rounds):
+                        driver.get("about:blank")
+                        t0 = time.perf_counter()
+                        goto(driver, srv.url(name))
+                        wait_for(driver, dom_stable(quiet=0.2), timeout=30)
+                        best = min(best, time.perf_counter() - t0)
+                    results.setdefault(name, {})[label] = best
+
+    print(f"{'page':12s} {'full':>7s} {'lean':>7s} {'speedup':>8s}")
+    for name, r in results.items():
+        print(f"{name:12s} {r['full']:7.2f} {r['lean']:7.2f} {r['full'] / r['lean']:7.1f}x")
+
+
+def bench_tabs(args):
+    import EOLhardware
+    import EOLsoftwares
+    import Task2
+    import population
+    from cdp import load_sites
+    from driver_pool import DriverPool
+    from sitespec import SiteScraper
+
+    sites = {"eol-hw": EOLhardware.SITE, "eol-sw": EOLsoftwares.SITE,
+             "troemner": Task2.SITE, "population": population.SITE}
+    with FixtureServer(delay=args.delay) as srv, DriverPool() as pool:
+        jobs = [(site, srv.url(name)) for name, site in sites.items()] * args.copies
+        pool.release(pool.acquire())  # start Chrome outside the timings
+
+        t0 = time.perf_counter()
+        expected = []
+        for site, url in jobs:
+            scraper = SiteScraper(site, url, pool, backend="browser")
+            try:
+                expected.append(scraper.scrape(all_pages=False))
+            finally:
+                scraper.close()
+        serial = time.perf_counter() - t0
+
+        print(f"{len(jobs)} pages, {args.delay:.2f}s latency per request")
+        print(f"{'browser':16s} {'seconds':>8s} {'speedup':>8s}")
+        print(f"{'one tab':16s} {serial:8.2f} {1.0:7.1f}x")
+        for tabs in args.tabs:
+            t0 = time.perf_counter()
+            results = load_sites([s for s, _ in jobs], [u for _, u in jobs], max_tabs=tabs, pool=pool)
+            secs = time.perf_counter() - t0
+            for (site, _), rows, want in zip(jobs, results, expected):
+                if isinstance(rows, BaseException):
+                    raise rows
+                assert rows == want, f"{site.name}: tab rows differ"
+            print(f"{f'{tabs} tabs (cdp)':16s} {secs:8.2f} {serial / secs:7.1f}x")
+
+
+def bench_throttle(args):
+    import scheduler
+    from Books import BookScraper
+    from fixtures import Throttle
+
+    modes = {
+        "no retries": dict(adaptive=False, retries=0),
+        "retries only": dict(adaptive=False),
+        "adaptive": {},
+    }
+    print(f"{args.pages} pages with details, server limit {args.rate:g} req/s, {args.workers} workers")
+    print(f"{'scheduler':14s} {'seconds':>8s} {'rows':>6s} {'complete':>9s} {'429s':>6s} {'requests':>9s} {'final':>16s}")
+    for mode, kwargs in modes.items():
+        throttle = Throttle(rate=args.rate, burst=args.rate / 4, retry_after=args.retry_after,
+                            congestion=args.congestion)
+        with FixtureServer(book_pages=args.pages, delay=args.delay, throttle=throttle) as srv:
+            sched = scheduler.configure(**kwargs)
+            scraper = BookScraper(srv.url("books"))
+            with open(os.devnull, "w") as null, redirect_stdout(null):
+                t0 = time.perf_counter()
+                rows = list(scraper.crawl(max_workers=args.workers, details=True))
+                secs = time.perf_counter() - t0
+            state = next(iter(sched.stats().values()))
+            rate = "-" if state["rate"] is None else f"{state['rate']:g}/s"
+            final = f"{state['concurrency']:g} x {rate}"
+            complete = sum(1 for r in rows if r.UPC)
+            print(f"{mode:14s} {secs:8.2f} {len(rows):6d} {complete:9d} {throttle.rejected:6d} "
+                  f"{state['requests']:9d} {final:>16s}")
+    scheduler.configure()
+
+
+def bench_store(args):
+    from eol_store import EolStore, _eol_date
+    from sinks import open_sink, read_rows
+
+    fields = ["softwareName", "version", "releaseDate", "eolDate"]
+    rows = [dict(zip(fields, r)) for r in _software_rows(args.n)]
+    changed = [dict(r, eolDate="2099-12-31") if i % 100 == 0 else r for i, r in enumerate(rows)]
+    name = rows[0]["softwareName"]
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "software.csv")
+        with open_sink(csv_path, fields) as sink:
+            sink.write_many(rows)
+        with EolStore(os.path.join(tmp, "eol.sqlite")) as store:
+            print(f"{args.n} rows")
+            print(f"{'step':34s} {'ms':>9s} {'result':>10s}")
+            for step, fn in [
+                ("upsert, first run", lambda: store.upsert_software(rows)),
+                ("upsert, 1% changed", lambda: store.upsert_software(changed)),
+            ]:
+                t0 = time.perf_counter()
+                added, modified, removed = fn()
+                print(f"{step:34s} {(time.perf_counter() - t0) * 1000:9.1f} {f'+{added} ~{modified} -{removed}':>10s}")
+
+            def from_csv(pred):
+                return [r for r in read_rows(csv_path) if pred(r)]
+
+            for step, fn in [
+                ("EOL in 2025-12: csv", lambda: from_csv(lambda r: "2025-12" <= (_eol_date(r["eolDate"]) or "") < "2026")),
+                ("EOL in 2025-12: store", lambda: store.software_eol("2025-12-01", "2026-01-01")),
+                (f"{name[:16]} versions: csv", lambda: from_csv(lambda r: r["softwareName"] == name)),
+                (f"{name[:16]} versions: store", lambda: store.software(name)),
+            ]:
+                secs, found = _timeit(lambda: len(fn()), args.rounds)
+                print(f"{step:34s} {secs * 1000:9.1f} {found:10d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("fetch", help="HTTP+lxml backend vs Selenium backend")
+    p.add_argument("--repeat", type=int, default=1, help="multiply fixture rows")
+    p.add_argument("--rounds", type=int, default=3)
+    p.add_argument("--browser", action="store_true", help="also time the Selenium backend (needs Chrome)")
+    p.set_defaults(func=bench_fetch)
+
+    p = sub.add_parser("crawl", help="books catalogue crawl at several concurrency levels")
+    p.add_argument("--pages", type=int, default=50)
+    p.add_argument("--delay", type=float, default=0.05, help="simulated latency per request (s)")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    p.add_argument("--details", action="store_true")
+    p.add_argument("--rounds", type=int, default=1)
+    p.set_defaults(func=bench_crawl)
+
+    p = sub.add_parser("enrich", help="detail-page enrichment at several concurrency levels")
+    p.add_argument("--delay", type=float, default=0.05, help="simulated latency per request (s)")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    p.set_defaults(func=bench_enrich)
+
+    p = sub.add_parser("waits", help="readiness conditions vs the fixed sleeps they replaced")
+    p.add_argument("--rounds", type=int, default=3)
+    p.set_defaults(func=bench_waits)
+
+    p = sub.add_parser("scroll", help="lazy-load loop: polling vs MutationObserver")
+    p.add_argument("--repeat", type=int, default=1, help="multiply fixture rows")
+    p.add_argument("--no-expected", dest="expected", action="store_false",
+                   help="don't stop early at EXPECTED_MODELS; wait for the quiet period")
+    p.set_defaults(func=bench_scroll)
+
+    p = sub.add_parser("dates", help="date normalization: per-row dateutil/strptime vs dates.py")
+    p.add_argument("--n", type=int, default=100_000, help="strings to normalize")
+    p.add_argument("--distinct", type=int, default=2000, help="distinct dates among them")
+    p.add_argument("--rounds", type=int, default=3)
+    p.set_defaults(func=bench_dates)
+
+    p = sub.add_parser("rows", help="row objects and DataFrame building: dataclass+asdict vs slotted+columns")
+    p.add_argument("--n", type=int, default=200_000)
+    p.set_defaults(func=bench_rows)
+
+    p = sub.add_parser("tables", help="software EOL tables: per-table lookups vs one pass + process pool")
+    p.add_argument("--repeat", type=int, default=20, help="multiply fixture tables")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    p.add_argument("--rounds", type=int, default=3)
+    p.set_defaults(func=bench_tables)
+
+    p = sub.add_parser("imports", help="import time of each scraper module (-X importtime)")
+    p.add_argument("--modules", nargs="+",
+                   default=["Books", "population", "EOLhardware", "EOLsoftwares", "Task2", "webscraper"])
+    p.add_argument("--rounds", type=int, default=5)
+    p.set_defaults(func=bench_imports)
+
+    p = sub.add_parser("profile", help="page loads with the full vs the lean browser profile")
+    p.add_argument("--assets", type=int, default=20, help="slow assets of each kind per page")
+    p.add_argument("--rounds", type=int, default=3)
+    p.set_defaults(func=bench_profile)
+
+    p = sub.add_parser("tabs", help="pages one tab at a time vs parallel CDP tabs in one Chrome")
+    p.add_argument("--tabs", type=int, nargs="+", default=[1, 2, 4])
+    p.add_argument("--copies", type=int, default=2, help="times each page is loaded")
+    p.add_argument("--delay", type=float, default=0.2, help="simulated latency per request (s)")
+    p.set_defaults(func=bench_tabs)
+
+    p = sub.add_parser("throttle", help="crawl against a rate-limiting server: no retries, retries, adaptive")
+    p.add_argument("--pages", type=int, default=10)
+    p.add_argument("--rate", type=float, default=40.0, help="requests/sec the server allows")
+    p.add_argument("--retry-after", type=float, default=1.0, help="the 429s' Retry-After (s)")
+    p.add_argument("--congestion", type=float, default=0.005, help="latency added per request in flight (s)")
+    p.add_argument("--delay", type=float, default=0.02, help="simulated latency per request (s)")
+    p.add_argument("--workers", type=int, default=16)
+    p.set_defaults(func=bench_throttle)
+
+    p = sub.add_parser("store", help="EOL store: bulk upserts, and queries vs loading the CSV")
+    p.add_argument("--n", type=int, default=100_000)
+    p.add_argument("--rounds", type=int, default=3)
+    p.set_defaults(func=bench_store)
+
+    p = sub.add_parser("suite", help="every scraper per backend, checked against a stored baseline")
+    p.add_argument("--jobs", nargs="+", default=["books", "population", "eol-hw", "eol-sw", "troemner"])
+    p.add_argument("--browser", action="store_true", help="also run the Selenium backend (needs Chrome)")
+    p.add_argument("--rounds", type=int, default=5, help="best of this many runs per job")
+    p.add_argument("--baseline", default=BASELINE)
+    p.add_argument("--save-baseline", action="store_true", help="record these results as the new baseline")
+    p.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown/RSS growth, as a fraction")
+    p.add_argument("--min-delta", type=float, default=0.002,
+                   help="timer noise floor: ignore slowdowns smaller than this (s)")
+    p.set_defaults(func=bench_suite)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Lean browser profile: the scrapers only read text, so Chrome doesn't need
+# images, fonts, stylesheets, media or analytics/ad scripts.
+#
+# Images are switched off in the Chrome options; everything else is blocked
+# per request by URL pattern through CDP Network.setBlockedURLs, which goto()
+# sets for the site being opened. Network.setBlockedURLs has no exceptions,
+# so a site allowlist simply drops patterns from the block list for that site
+# (e.g. a consent script or stylesheet the page really needs).
+# pageLoadStrategy "eager" returns from driver.get() at DOMContentLoaded; the
+# readiness conditions in waits.py take it from there.
+
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+IMAGE_PATTERNS = ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*")
+FONT_PATTERNS = ("*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*")
+STYLESHEET_PATTERNS = ("*.css*",)
+MEDIA_PATTERNS = ("*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*")
+TRACKER_PATTERNS = (
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*facebook.net*", "*hotjar.com*", "*linkedin.com/px*",
+    "*bat.bing.com*", "*demdex.net*", "*omtrdc.net*", "*/analytics.js*", "*/gtag/js*",
+)
+
+# domain (and its subdomains) -> block patterns that stay allowed there
+SITE_ALLOW = {
+    # OneTrust consent banner, so dismiss_consent() can record consent
+    "paloaltonetworks.com": ("*cookielaw.org*",),
+    # infinite scroll measures the laid-out page height
+    "troemner.com": STYLESHEET_PATTERNS + ("*cookielaw.org*",),
+}
+
+
+@dataclass
+class BrowserProfile:
+    images: bool = False
+    fonts: bool = False
+    stylesheets: bool = False
+    media: bool = False
+    trackers: bool = False
+    page_load_strategy: str = "eager"
+    blocked: tuple[str, ...] = ()  # extra patterns
+    allow: dict[str, tuple[str, ...]] = field(default_factory=lambda: dict(SITE_ALLOW))
+
+    def patterns(self) -> list[str]:
+        out = list(self.blocked)
+        for enabled, group in (
+            (self.images, IMAGE_PATTERNS),
+            (self.fonts, FONT_PATTERNS),
+            (self.stylesheets, STYLESHEET_PATTERNS),
+            (self.media, MEDIA_PATTERNS),
+            (self.trackers, TRACKER_PATTERNS),
+        ):
+            if not enabled:
+                out.extend(group)
+        return out
+
+    def blocked_for(self, url: str) -> list[str]:
+        """The block list to use while on `url`'s site."""
+        host = (urlsplit(url).hostname or "").lower()
+        allowed = {
+            p
+            for domain, patterns in self.allow.items()
+            if host == domain or host.endswith("." + domain)
+            for p in patterns
+        }
+        return [p for p in self.patterns() if p not in allowed]
+
+
+LEAN = BrowserProfile()
+FULL = BrowserProfile(images=True, fonts=True, stylesheets=True, media=True, trackers=True,
+                      page_load_strategy="normal", allow={})
@@ -0,0 +1,422 @@
+# Multi-tab backend: several pages load and extract at once in one Chrome,
+# driven over the DevTools protocol from asyncio.
+#
+#   results = load_sites([EOLhardware.SITE, EOLsoftwares.SITE, Task2.SITE, population.SITE], max_tabs=4)
+#   # one list of rows, or the exception, per site
+#
+#   async with CDPBrowser.attach(driver) as browser:
+#       async with browser.tab() as tab:
+#           await tab.goto(url, timeout=20)
+#           rows = await tab.extract(spec)      # the same rows as extract(driver, spec)
+#
+# The browser is a pooled Chrome from driver_pool: chromedriver always starts
+# Chrome with a debugging port, so the tabs get the pool's profile, saved
+# cookies and per-site block lists, without another browser process. Each
+# tab is a target on one WebSocket connection; a page's readiness is its
+# spec's `ready` XPath, the cookie banner clicked away for specs with
+# `consent`, then the spec's `wait` polled in the tab (it must be a
+# waits.Wait: a plain wait(driver) has no tab form and the site fails), and
+# for specs with `scroll` scroll.py's loader run until the list is complete.
+# Extraction runs extract.py's script, so tab rows go through SiteSpec.build()
+# exactly like rows from extract(). Navigations are paced and retried by the
+# shared scheduler (scheduler.py), like every other request.
+#
+#   python cdp.py [--tabs 4] [--timeout 20]
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import os
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+from driver_pool import NAVIGATION_STATUS_JS, get_pool
+from extract import EXTRACT_JS, RowSpec, spec_json
+from metrics import span
+from scheduler import RETRY_STATUSES, Outcome, shared
+from scroll import SCROLL_JS
+from session_state import CLICK_CONSENT_JS, CONSENT_XPATHS, VISIBLE_JS, get_store
+from waits import COUNT_JS, POLL, ScriptCondition, Wait, any_of
+
+MAX_TABS = 4
+
+
+class CDPError(Exception):
+    pass
+
+
+def _mask(data: bytes, key: bytes) -> bytes:
+    n = len(data)
+    key = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(key, "big")).to_bytes(n, "big")
+
+
+class _WebSocket:
+    """Just enough of an RFC 6455 client for DevTools: text frames, ping, close."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, url: str) -> "_WebSocket":
+        u = urlsplit(url)
+        # page sources and extracted rows come back as single large messages
+        reader, writer = await asyncio.open_connection(u.hostname, u.port or 80, limit=2 ** 26)
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = u.path + (f"?{u.query}" if u.query else "")
+        writer.write((
+            f"GET {path} HTTP/1.1\r\nHost: {u.netloc}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode())
+        head = await reader.readuntil(b"\r\n\r\n")
+        status = head.split(b"\r\n", 1)[0]
+        if b" 101 " not in status:
+            writer.close()
+            raise ConnectionError(f"DevTools handshake failed: {status.decode(errors='replace')}")
+        return cls(reader, writer)
+
+    def _frame(self, opcode: int, payload: bytes) -> bytes:
+        n = len(payload)
+        head = bytearray([0x80 | opcode])
+        if n < 126:
+            head.append(0x80 | n)
+        elif n < 1 << 16:
+            head.append(0x80 | 126)
+            head += n.to_bytes(2, "big")
+        else:
+            head.append(0x80 | 127)
+            head += n.to_bytes(8, "big")
+        key = os.urandom(4)
+        return bytes(head) + key + _mask(payload, key)
+
+    async def send(self, text: str):
+        self.writer.write(self._frame(0x1, text.encode()))
+        await self.writer.drain()
+
+    async def recv(self) -> str | None:
+        """The next text message, or None once the connection closes."""
+        parts = []
+        read = self.reader.readexactly
+        while True:
+            try:
+                b1, b2 = await read(2)
+            except asyncio.IncompleteReadError:
+                return None
+            opcode, n = b1 & 0x0F, b2 & 0x7F
+            if n == 126:
+                n = int.from_bytes(await read(2), "big")
+            elif n == 127:
+                n = int.from_bytes(await read(8), "big")
+            key = await read(4) if b2 & 0x80 else None
+            data = await read(n)
+            if key is not None:
+                data = _mask(data, key)
+            if opcode == 0x8:
+                return None
+            if opcode == 0x9:
+                self.writer.write(self._frame(0xA, data))
+                continue
+            if opcode == 0xA:
+                continue
+            parts.append(data)
+            if b1 & 0x80:
+                return b"".join(parts).decode("utf-8")
+
+    async def close(self):
+        try:
+            self.writer.write(self._frame(0x8, b""))
+            self.writer.close()
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class CDPBrowser:
+    """One DevTools connection to a browser; commands and events for every tab multiplexed on it."""
+
+    def __init__(self, ws: _WebSocket, profile=None, load_event: str = "Page.loadEventFired"):
+        self._ws = ws
+        self.profile = profile
+        self.load_event = load_event
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._waiters: dict[tuple, list[asyncio.Future]] = {}
+        self._reader = asyncio.get_running_loop().create_task(self._read())
+
+    @classmethod
+    async def connect(cls, address: str, profile=None) -> "CDPBrowser":
+        """Connect to the Chrome listening for DevTools on `address` ("host:port")."""
+        loop = asyncio.get_running_loop()
+        with await loop.run_in_executor(None, urlopen, f"http://{address}/json/version") as resp:
+            ws_url = json.load(resp)["webSocketDebuggerUrl"]
+        strategy = getattr(profile, "page_load_strategy", "normal")
+        event = "Page.domContentEventFired" if strategy == "eager" else "Page.loadEventFired"
+        return cls(await _WebSocket.connect(ws_url), profile, event)
+
+    @classmethod
+    @asynccontextmanager
+    async def attach(cls, driver):
+        """The Chrome behind a Selenium driver (e.g. one leased from driver_pool)."""
+        address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        browser = await cls.connect(address, getattr(driver, "_ws_profile", None))
+        try:
+            yield browser
+        finally:
+            await browser.close()
+
+    async def _read(self):
+        try:
+            while (text := await self._ws.recv()) is not None:
+                msg = json.loads(text)
+                if "id" in msg:
+                    fut = self._pending.pop(msg["id"], None)
+                    if fut is None or fut.done():
+                        continue
+                    if "error" in msg:
+                        fut.set_exception(CDPError(msg["error"].get("message", str(msg["error"]))))
+                    else:
+                        fut.set_result(msg.get("result", {}))
+                    continue
+                for fut in self._waiters.pop((msg.get("sessionId"), msg.get("method")), ()):
+                    if not fut.done():
+                        fut.set_result(msg.get("params", {}))
+        finally:
+            closed = ConnectionError("DevTools connection closed")
+            for fut in [*self._pending.values(), *itertools.chain(*self._waiters.values())]:
+                if not fut.done():
+                    fut.set_exception(closed)
+            self._pending.clear()
+            self._waiters.clear()
+
+    async def send(self, method: str, params: dict | None = None, session: str | None = None) -> dict:
+        if self._reader.done():
+            raise ConnectionError("DevTools connection closed")
+        msg_id = next(self._ids)
+        msg = {"id": msg_id, "method": method, "params": params or {}}
+        if session is not None:
+            msg["sessionId"] = session
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[msg_id] = fut
+        try:
+            await self._ws.send(json.dumps(msg))
+            return await fut
+        finally:
+            self._pending.pop(msg_id, None)
+
+    def event(self, method: str, session: str | None = None) -> asyncio.Future:
+        """A future for the next `method` event on `session`; create it before triggering the event."""
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault((session, method), []).append(fut)
+        return fut
+
+    @asynccontextmanager
+    async def tab(self):
+        """A new tab, closed on exit."""
+        target = (await self.send("Target.createTarget", {"url": "about:blank"}))["targetId"]
+        try:
+            session = (await self.send("Target.attachToTarget", {"targetId": target, "flatten": True}))["sessionId"]
+            tab = Tab(self, session)
+            await tab.send("Page.enable")
+            yield tab
+        finally:
+            try:
+                await self.send("Target.closeTarget", {"targetId": target})
+            except (CDPError, ConnectionError):
+                pass
+
+    async def close(self):
+        await self._ws.close()
+        self._reader.cancel()
+
+
+class Tab:
+    def __init__(self, browser: CDPBrowser, session: str):
+        self.browser = browser
+        self.session = session
+        self._blocked = None
+
+    def send(self, method: str, params: dict | None = None):
+        return self.browser.send(method, params, self.session)
+
+    async def goto(self, url: str, timeout: float = 20):
+        """
+        Navigate and wait for the page load (DOMContentLoaded with an eager
+        profile), paced and retried like driver_pool.goto().
+        """
+        profile = self.browser.profile
+        if profile is not None and profile.patterns():
+            patterns = profile.blocked_for(url)
+            if patterns != self._blocked:
+                if self._blocked is None:
+                    await self.send("Network.enable")
+                await self.send("Network.setBlockedURLs", {"urls": patterns})
+                self._blocked = patterns
+
+        async def load():
+            loaded = self.browser.event(self.browser.load_event, self.session)
+            result = await self.send("Page.navigate", {"url": url})
+            if result.get("errorText"):
+                loaded.cancel()
+                raise CDPError(f"{url}: {result['errorText']}")
+            await asyncio.wait_for(loaded, timeout)
+            return Outcome(await self.execute(NAVIGATION_STATUS_JS) or None)
+
+        status = (await shared().call_async(url, load, retry_on=(TimeoutError,))).status_code
+        if status in RETRY_STATUSES:
+            print(f"[warn] {url} still answers HTTP {status} after retries")
+
+    async def execute(self, script: str, *args):
+        """Like WebDriver's execute_script: `script` is a function body, `args` its arguments."""
+        result = await self.send("Runtime.evaluate", {
+            "expression": f"(function(){{{script}\n}}).apply(null, {json.dumps(args)})",
+            "returnByValue": True,
+            "awaitPromise": True,
+        })
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text", "script error"))
+        return result["result"].get("value")
+
+    async def execute_async(self, script: str, *args):
+        """Like execute_async_script: `script` passes its result to its last argument."""
+        return await self.execute(
+            f"return new Promise(done => (function(){{{script}\n}}).apply(null, [...arguments, done]));", *args
+        )
+
+    async def wait_for_xpath(self, xpath: str, timeout: float = 10):
+        """Until `xpath` matches something in the page."""
+        async with asyncio.timeout(timeout):
+            while not await self.execute(COUNT_JS, xpath):
+                await asyncio.sleep(POLL)
+
+    async def until(self, condition, timeout: float = 10, required: bool = True):
+        """
+        waits.wait_for() in a tab, for the conditions in waits.py: their value
+        once truthy. On timeout raise TimeoutError, or return None when
+        required=False.
+        """
+        try:
+            async with asyncio.timeout(timeout):
+                while not (value := await self._check(condition)):
+                    await asyncio.sleep(POLL)
+                return value
+        except TimeoutError:
+            if required:
+                raise
+            return None
+
+    async def _check(self, condition):
+        if isinstance(condition, any_of):
+            for i, cond in enumerate(condition.conditions):
+                if value := await self._check(cond):
+                    return i, value
+            return False
+        if not isinstance(condition, ScriptCondition):
+            raise CDPError(f"{type(condition).__name__} needs a WebDriver; it can't be polled in a tab")
+        return condition.check(await self.execute(condition.script, *condition.args))
+
+    async def dismiss_consent(self, url: str, timeout: float = 2.0) -> bool:
+        """session_state.dismiss_consent() in a tab: True if a banner was clicked."""
+        if get_store().has_consent(url):
+            timeout = 0
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (clicked := await self.execute(CLICK_CONSENT_JS, CONSENT_XPATHS)) < 0:
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(POLL)
+        # the cookies stay in the browser's profile for the other tabs
+        deadline = loop.time() + 2
+        while await self.execute(VISIBLE_JS, CONSENT_XPATHS[clicked]) and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        return True
+
+    async def load_all(self, container: str, item: str, expected: int | None = None,
+                       quiet: float = 1.0, timeout: float = 60) -> tuple[int, str]:
+        """scroll.load_all() in a tab: (item count, why it stopped)."""
+        result = await self.execute_async(SCROLL_JS, container, item, expected or 0,
+                                          int(quiet * 1000), int(timeout * 1000))
+        return int(result["count"]), result["reason"]
+
+    async def extract(self, spec: RowSpec) -> list[dict]:
+        """All rows of `spec` from the page in one round-trip, as extract() returns them."""
+        return await self.execute(EXTRACT_JS, spec_json(spec)) or []
+
+
+async def scrape_site(browser: CDPBrowser, site, url: str | None = None, timeout: float = 20) -> list:
+    """One SiteSpec's rows from a tab of its own, the whole load within `timeout` seconds."""
+    url = url or site.url
+    async with browser.tab() as tab, asyncio.timeout(timeout) as budget:
+        with span(f"{site.metric}.page_load", backend="cdp"):
+            await tab.goto(url, timeout)
+        if site.consent:
+            await tab.dismiss_consent(url)
+        await tab.wait_for_xpath(site.ready, timeout)
+        if site.wait is not None:
+            if not isinstance(site.wait, Wait):
+                raise CDPError(f"{site.name}: its wait takes a WebDriver; give it as a waits.Wait to load it in a tab")
+            await tab.until(site.wait.fresh(), site.wait.timeout, site.wait.required)
+        if site.scroll is not None:
+            # whatever is left of the budget, less a second to extract in
+            left = budget.when() - asyncio.get_running_loop().time() - 1
+            kwargs = {**site.scroll, "timeout": min(site.scroll.get("timeout", 60), max(left, 0.1))}
+            seen, reason = await tab.load_all(**kwargs)
+            if reason in ("timeout", "missing"):
+                print(f"[warn] {site.name}: list incomplete ({reason}) with {seen} items")
+        rows = site.build(await tab.extract(site.rows))
+    return site.finish(rows) if site.finish else rows
+
+
+async def scrape_sites(browser: CDPBrowser, sites, urls=None, max_tabs: int = MAX_TABS,
+                       timeout: float = 20) -> list:
+    """Every site at once, at most `max_tabs` tabs open; rows or the exception per site, in order."""
+    limit = asyncio.Semaphore(max(1, max_tabs))
+    urls = urls or [None] * len(sites)
+
+    async def one(site, url):
+        async with limit:
+            return await scrape_site(browser, site, url, timeout)
+
+    return await asyncio.gather(*(one(s, u) for s, u in zip(sites, urls)), return_exceptions=True)
+
+
+def load_sites(sites, urls=None, max_tabs: int = MAX_TABS, timeout: float = 20, pool=None) -> list:
+    """
+    Blocking form of scrape_sites() on a browser leased from `pool` (default:
+    the shared pool). `urls` overrides each site's URL (None keeps it).
+    """
+    pool = pool or get_pool()
+
+    async def run(driver):
+        async with CDPBrowser.attach(driver) as browser:
+            return await scrape_sites(browser, sites, urls, max_tabs, timeout)
+
+    with pool.lease(pages=len(sites)) as driver:
+        return asyncio.run(run(driver))
+
+
+def main():
+    import EOLhardware
+    import EOLsoftwares
+    import Task2
+    import population
+
+    parser = argparse.ArgumentParser(description="Load the EOL, Troemner and population pages in parallel tabs")
+    parser.add_argument("--tabs", type=int, default=MAX_TABS, help="most tabs open at once")
+    parser.add_argument("--timeout", type=float, default=20, help="per-tab timeout (s)")
+    args = parser.parse_args()
+
+    sites = [EOLhardware.SITE, EOLsoftwares.SITE, Task2.SITE, population.SITE]
+    for site, result in zip(sites, load_sites(sites, max_tabs=args.tabs, timeout=args.timeout)):
+        if isinstance(result, BaseException):
+            print(f"[warn] {site.name}: {type(result).__name__}: {result}")
+        else:
+            print(f"{site.name:12s} {len(result)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Row-level diff between the previous output CSV and a fresh scrape.
+#
+# The full output each scraper writes doubles as the snapshot: before it is
+# overwritten, the new rows are compared against it by key and the
+# added/removed/modified rows go to a "<name>.changes.csv" next to it.
+
+import csv
+import os
+
+from sinks import read_rows
+
+CHANGE_FIELD = "change"
+
+
+def _keyed(rows: list[dict], key) -> dict:
+    # repeated keys (e.g. the same plugin version listed under two tables)
+    # are told apart by their occurrence number
+    seen: dict = {}
+    out = {}
+    for r in rows:
+        k = key(r)
+        n = seen[k] = seen.get(k, -1) + 1
+        out[(k, n)] = r
+    return out
+
+
+def read_snapshot(path: str) -> list[dict] | None:
+    if not os.path.exists(path):
+        return None
+    return read_rows(path)
+
+
+def diff_rows(old: list[dict], new: list[dict], key, compare: list[str] | None = None) -> list[dict]:
+    """
+    `key` maps a row dict to its identity. Returns the changed rows with a
+    "change" column: added, removed or modified (new values). A row counts
+    as modified when one of the `compare` columns (default: all) differs.
+    """
+    old_by_key = _keyed(old, key)
+    new_by_key = _keyed(new, key)
+
+    def same(a: dict, b: dict) -> bool:
+        if compare is None:
+            return a == b
+        return all(a.get(f, "") == b.get(f, "") for f in compare)
+
+    changes = []
+    for k, row in new_by_key.items():
+        before = old_by_key.get(k)
+        if before is None:
+            changes.append({CHANGE_FIELD: "added", **row})
+        elif not same(before, row):
+            changes.append({CHANGE_FIELD: "modified", **row})
+    for k, row in old_by_key.items():
+        if k not in new_by_key:
+            changes.append({CHANGE_FIELD: "removed", **row})
+    return changes
+
+
+def changes_path(path: str) -> str:
+    # always CSV, whatever format the full output is in
+    return os.path.splitext(path)[0] + ".changes.csv"
+
+
+def write_changes(path: str, old: list[dict] | None, new: list[dict], key, fieldnames: list[str]) -> int:
+    """
+    Diff `new` against the `old` snapshot and write the changes CSV; returns
+    the count. When the snapshot has other columns than `fieldnames` (say
+    the last run added --details columns), rows are compared on the columns
+    both have, and removed rows are written with `fieldnames` only.
+    """
+    old = old or []
+    # CSV round-trips everything as text
+    new = [{f: "" if r.get(f) is None else str(r.get(f)) for f in fieldnames} for r in new]
+    shared = [f for f in fieldnames if f in old[0]] if old else fieldnames
+    old = [{f: r.get(f, "") for f in fieldnames} for r in old]
+    changes = diff_rows(old, new, key, shared)
+
+    with open(changes_path(path), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=[CHANGE_FIELD] + fieldnames)
+        writer.writeheader()
+        writer.writerows(changes)
+    return len(changes)
@@ -0,0 +1,139 @@
+# Crawl checkpoints: what a long crawl has finished, kept in a local SQLite
+# file so a rerun with --resume picks up where a crash, timeout or network
+# failure stopped it.
+#
+#   ck = Checkpoint("books", job={"url": url, "details": True}, resume=True)
+#   for url in pages:
+#       if not ck.is_done(url):
+#           ...
+#           ck.complete(url, rows)                # rows emitted by this unit
+#   rows = ck.rows(BookRow)                       # everything emitted so far
+#   ck.close(completed=True)                      # removes the checkpoint
+#
+# A unit is anything with a stable key (a page URL, a result page, a product
+# tile). complete() records its output rows, any follow-up units it queued
+# (e.g. the detail pages a listing page links to, with their partial rows)
+# and marks it done, in one transaction. Commits are batched, at most every
+# `interval` seconds, so a hard kill loses a few seconds of work at most.
+# Free-form state (the page list, a scroll count) goes in get()/set().
+#
+# A fresh run (resume=False), or a resume whose `job` description doesn't
+# match the stored one, starts from an empty checkpoint. close() keeps the
+# file when the crawl didn't complete or any unit failed, so --resume
+# retries exactly those.
+
+import json
+import os
+import sqlite3
+import time
+
+from columns import as_dict, row_columns
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CHECKPOINT_DIR = os.path.join(HERE, ".cache", "checkpoints")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS units (unit TEXT PRIMARY KEY, done INTEGER NOT NULL, payload TEXT);
+CREATE TABLE IF NOT EXISTS rows (seq INTEGER PRIMARY KEY AUTOINCREMENT, unit TEXT NOT NULL, data TEXT NOT NULL);
+"""
+
+
+def checkpoint_path(name: str) -> str:
+    return os.path.join(CHECKPOINT_DIR, f"{name}.sqlite")
+
+
+def load_row(cls, data: dict):
+    """A row dataclass back from its {column: value} form."""
+    cols = row_columns(cls)
+    return cls(**{cols[k]: v for k, v in data.items() if k in cols})
+
+
+class Checkpoint:
+    def __init__(self, name: str, job: dict | None = None, resume: bool = False,
+                 path: str | None = None, interval: float = 2.0):
+        self.path = path or checkpoint_path(name)
+        self.interval = interval
+        self.failed = 0
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+        job_json = json.dumps(job or {}, sort_keys=True)
+        stored = self._db.execute("SELECT value FROM meta WHERE key = 'job'").fetchone()
+        if resume and stored is not None and stored[0] != job_json:
+            print(f"[warn] checkpoint {self.path} is for a different job, starting over")
+        self.resumed = resume and stored is not None and stored[0] == job_json
+        if not self.resumed:
+            self._db.executescript("DELETE FROM meta; DELETE FROM units; DELETE FROM rows;")
+            self._db.execute("INSERT INTO meta VALUES ('job', ?)", (job_json,))
+            self._db.commit()
+        self._done = {u for (u,) in self._db.execute("SELECT unit FROM units WHERE done = 1")}
+        self._committed = time.monotonic()
+        if self.resumed:
+            n = self._db.execute("SELECT count(*) FROM rows").fetchone()[0]
+            print(f"[info] resuming from {self.path}: {len(self._done)} units done, {n} rows")
+
+    def is_done(self, unit: str) -> bool:
+        return unit in self._done
+
+    def complete(self, unit: str, rows=(), follow: dict | None = None):
+        """Record `unit` as done with the rows it emitted and the units it queued (unit -> row)."""
+        self._db.executemany(
+            "INSERT INTO rows (unit, data) VALUES (?, ?)",
+            [(unit, json.dumps(as_dict(r))) for r in rows],
+        )
+        if follow:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO units VALUES (?, 0, ?)",
+                [(u, json.dumps(as_dict(r))) for u, r in follow.items()],
+            )
+        self._db.execute("INSERT OR REPLACE INTO units VALUES (?, 1, NULL)", (unit,))
+        self._done.add(unit)
+        self.commit(force=False)
+
+    def rows(self, cls) -> list:
+        """Every row emitted so far, in the order recorded."""
+        return [load_row(cls, json.loads(d)) for (d,) in self._db.execute("SELECT data FROM rows ORDER BY seq")]
+
+    def rows_by_unit(self, cls) -> dict[str, list]:
+        out: dict[str, list] = {}
+        for unit, d in self._db.execute("SELECT unit, data FROM rows ORDER BY seq"):
+            out.setdefault(unit, []).append(load_row(cls, json.loads(d)))
+        return out
+
+    def queued(self, cls) -> dict:
+        """Units queued by complete(follow=...) and not done yet: unit -> row."""
+        return {u: load_row(cls, json.loads(p))
+                for u, p in self._db.execute("SELECT unit, payload FROM units WHERE done = 0")}
+
+    def get(self, key: str, default=None):
+        found = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if found is None else json.loads(found[0])
+
+    def set(self, key: str, value):
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value)))
+        self.commit(force=False)
+
+    def commit(self, force: bool = True):
+        now = time.monotonic()
+        if force or now - self._committed >= self.interval:
+            self._db.commit()
+            self._committed = now
+
+    def close(self, completed: bool = False):
+        """Keep the checkpoint unless the crawl completed with nothing failed."""
+        self._db.commit()
+        self._db.close()
+        if completed and not self.failed:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except FileNotFoundError:
+                    pass
+            return
+        if self.failed:
+            print(f"[note] {self.failed} units failed; rerun with --resume to retry only those")
+        else:
+            print(f"[info] checkpoint kept in {self.path}; rerun with --resume to continue")
@@ -0,0 +1,139 @@
+# Chromedriver resolution: lazy, once per process, cached on disk.
+#
+#   driver = chromedriver.resolve()   # ChromeDriver(path, version, source), or None
+#
+# Importing this does nothing. The first resolve() in a process picks, in
+# order:
+#   1. WEBSCRAPER_CHROMEDRIVER, a pinned local binary: no network, no cache
+#   2. .cache/chromedriver.json, while younger than `ttl` and the binary exists
+#   3. webdriver_manager's install() (when installed), written to the cache
+#   4. an expired cache entry whose binary still exists (offline, or the
+#      download failed)
+# and every later call returns the same answer. WEBSCRAPER_OFFLINE=1 skips
+# step 3. None means nothing was found: Selenium then looks for a driver
+# itself (Selenium Manager, or chromedriver on PATH).
+#
+#   python chromedriver.py [--refresh]     # show (or re-resolve) the driver
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from metrics import span
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(HERE, ".cache", "chromedriver.json")
+TTL = 24 * 3600
+
+PIN_ENV = "WEBSCRAPER_CHROMEDRIVER"
+OFFLINE_ENV = "WEBSCRAPER_OFFLINE"
+
+
+@dataclass
+class ChromeDriver:
+    path: str
+    version: str = ""
+    source: str = ""  # "pinned", "cache", "download" or "stale"
+
+
+_UNSET = object()
+_resolved = _UNSET
+_lock = threading.Lock()
+
+
+def driver_version(path: str) -> str:
+    """'120.0.6099.109' from `chromedriver --version`, or "" if it won't say."""
+    import subprocess
+
+    try:
+        out = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    m = re.search(r"\d+(?:\.\d+)+", out)
+    return m.group(0) if m else ""
+
+
+def _read_cache(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or not os.path.isfile(entry.get("path") or ""):
+        return None
+    return entry
+
+
+def _write_cache(path: str, driver: ChromeDriver):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"path": driver.path, "version": driver.version, "resolved_at": time.time()}, f)
+    os.replace(tmp, path)
+
+
+def _download() -> str | None:
+    try:
+        # optional: auto-manage chromedriver
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        return None
+    try:
+        with span("driver.resolve"):
+            return ChromeDriverManager().install()
+    except Exception as e:
+        print(f"[warn] chromedriver download failed: {e}")
+        return None
+
+
+def _find(ttl: float, cache_path: str) -> ChromeDriver | None:
+    pinned = os.environ.get(PIN_ENV)
+    if pinned:
+        if os.path.isfile(pinned):
+            return ChromeDriver(pinned, source="pinned")
+        print(f"[warn] {PIN_ENV}={pinned} does not exist, ignoring it")
+
+    entry = _read_cache(cache_path)
+    if entry is not None and time.time() - entry.get("resolved_at", 0) <= ttl:
+        return ChromeDriver(entry["path"], entry.get("version", ""), "cache")
+
+    if os.environ.get(OFFLINE_ENV, "0") != "1":
+        path = _download()
+        if path:
+            driver = ChromeDriver(path, driver_version(path), "download")
+            _write_cache(cache_path, driver)
+            return driver
+
+    if entry is not None:
+        print(f"[info] using chromedriver {entry.get('version') or entry['path']} from an expired cache entry")
+        return ChromeDriver(entry["path"], entry.get("version", ""), "stale")
+    return None
+
+
+def resolve(ttl: float = TTL, cache_path: str = CACHE_PATH, refresh: bool = False) -> ChromeDriver | None:
+    """The chromedriver to use, found on the first call and memoized for the process."""
+    global _resolved
+    with _lock:
+        if _resolved is _UNSET or refresh:
+            _resolved = _find(0 if refresh else ttl, cache_path)
+        return _resolved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve (and cache) the chromedriver binary")
+    parser.add_argument("--refresh", action="store_true", help="ignore the cached entry")
+    args = parser.parse_args()
+
+    driver = resolve(refresh=args.refresh)
+    if driver is None:
+        print("No chromedriver found; Selenium will look for one itself.")
+    else:
+        print(json.dumps(asdict(driver), indent=2))
+
+
+if __name__ == "__main__":
+    main()
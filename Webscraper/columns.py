@@ -0,0 +1,115 @@
+# Compact rows and column buffers for large scrape results.
+#
+# Row types are slotted, frozen dataclasses: no per-instance __dict__, and a
+# row can be shared or cached without being copied. A column name that isn't
+# an identifier maps to its attribute through field metadata:
+#
+#   @dataclass(slots=True, frozen=True)
+#   class CountryRow:
+#       World_Share: str = field(metadata={"column": "World Share"})
+#
+# ColumnBuffer collects rows (row dataclasses, dicts or tuples in field
+# order) straight into one list per column, so nothing builds a dict per row
+# or deep-copies it through asdict(); the columns go to Arrow or pandas as
+# they are. Columns named in `intern` have their strings interned, so a
+# value repeated across 100k rows (a vendor, a product family, a date) is
+# stored once.
+
+import sys
+from dataclasses import fields
+from functools import lru_cache
+from operator import attrgetter
+
+
+@lru_cache(maxsize=None)
+def row_columns(cls) -> dict[str, str]:
+    """Column name -> attribute name for a row dataclass."""
+    return {f.metadata.get("column", f.name): f.name for f in fields(cls)}
+
+
+@lru_cache(maxsize=None)
+def _getter(cls, fieldnames: tuple[str, ...]):
+    # row -> tuple of its values in `fieldnames` order; absent columns are None
+    cols = row_columns(cls)
+    attrs = [cols.get(f) for f in fieldnames]
+    if len(attrs) > 1 and all(attrs):
+        return attrgetter(*attrs)
+    return lambda row: tuple(getattr(row, a) if a else None for a in attrs)
+
+
+def row_values(row, fieldnames: tuple[str, ...]) -> tuple:
+    if isinstance(row, dict):
+        return tuple(map(row.get, fieldnames))
+    if isinstance(row, tuple):
+        return row
+    return _getter(type(row), fieldnames)(row)
+
+
+def as_dict(row, fieldnames=None) -> dict:
+    """A shallow {column: value} for a row dataclass or dict (no deep copy)."""
+    if isinstance(row, dict):
+        return row if fieldnames is None else {f: row.get(f) for f in fieldnames}
+    names = tuple(fieldnames or row_columns(type(row)))
+    return dict(zip(names, row_values(row, names)))
+
+
+def interned(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class ColumnBuffer:
+    def __init__(self, fieldnames, intern=()):
+        self.fieldnames = tuple(fieldnames)
+        self._cols: list[list] = [[] for _ in self.fieldnames]
+        self._intern = [i for i, f in enumerate(self.fieldnames) if f in intern]
+        self._getters: dict[type, object] = {}
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _values(self, row) -> tuple:
+        cls = type(row)
+        if cls is dict:
+            return tuple(map(row.get, self.fieldnames))
+        if cls is tuple:
+            return row
+        get = self._getters.get(cls)
+        if get is None:
+            get = self._getters[cls] = _getter(cls, self.fieldnames)
+        return get(row)
+
+    def append(self, row):
+        values = self._values(row)
+        for col, v in zip(self._cols, values):
+            col.append(v)
+        for i in self._intern:
+            col = self._cols[i]
+            col[-1] = interned(col[-1])
+        self._len += 1
+
+    def extend(self, rows):
+        values = [self._values(r) for r in rows]
+        if not values:
+            return
+        for i, (col, vals) in enumerate(zip(self._cols, zip(*values))):
+            col.extend(map(interned, vals) if i in self._intern else vals)
+        self._len += len(values)
+
+    def columns(self) -> dict[str, list]:
+        return dict(zip(self.fieldnames, self._cols))
+
+    def tuples(self):
+        return zip(*self._cols)
+
+    def clear(self):
+        self._cols = [[] for _ in self.fieldnames]
+        self._len = 0
+
+    def to_arrow(self, schema=None):
+        import pyarrow as pa
+        return pa.table(self.columns(), schema=schema)
+
+    def to_pandas(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns(), columns=list(self.fieldnames))
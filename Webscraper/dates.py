@@ -0,0 +1,84 @@
+# Date normalization shared by the EOL scrapers: "December 31, 2030" ->
+# "2030-12-31", anything unparseable returned stripped but otherwise as-is.
+#
+# The formats the EOL pages actually use are matched by precompiled regexes;
+# only strings none of them fit fall back to dateutil's fuzzy parser (and
+# only with fuzzy=True). Results are memoized, and normalize_column()
+# parses each distinct value of a column once, since EOL tables repeat the
+# same few dates over and over.
+
+import re
+from datetime import date
+from functools import lru_cache
+
+try:
+    from dateutil import parser as dateparser
+except ImportError:
+    dateparser = None
+
+_MONTHS = {
+    name: i
+    for i, full in enumerate(
+        ["january", "february", "march", "april", "may", "june", "july",
+         "august", "september", "october", "november", "december"], start=1)
+    for name in (full, full[:3])
+}
+
+# What "%B %d, %Y" / "%b %d, %Y" accept; ISO dates are already normalized
+_MONTH_DAY_YEAR = re.compile(r"([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4})")
+_ISO = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+# Only tried with fuzzy=True, where dateutil would read them month first
+_US = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+NOT_DATES = {"tbd", "n/a", "-"}
+
+
+def _ymd(y, m, d) -> str | None:
+    try:
+        return date(int(y), int(m), int(d)).isoformat()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=8192)
+def normalize_date(text: str, fuzzy: bool = False) -> str:
+    """
+    yyyy-mm-dd for "Month d, yyyy" / "Mon d, yyyy" (and ISO) dates. With
+    fuzzy=True, "m/d/yyyy" too, and anything else goes through dateutil's
+    fuzzy parser. Otherwise the stripped input comes back unchanged.
+    """
+    text = (text or "").strip()
+    if not text or text.lower() in NOT_DATES:
+        return text
+
+    m = _MONTH_DAY_YEAR.fullmatch(text)
+    if m and (month := _MONTHS.get(m.group(1).lower())):
+        out = _ymd(m.group(3), month, m.group(2))
+        if out or not fuzzy:
+            return out or text
+    elif m := _ISO.fullmatch(text):
+        return _ymd(*m.groups()) or text
+    elif not fuzzy:
+        return text
+    elif m := _US.fullmatch(text):
+        out = _ymd(m.group(3), m.group(1), m.group(2))
+        if out:
+            return out
+
+    if dateparser is None:
+        return text
+    try:
+        return dateparser.parse(text, dayfirst=False, fuzzy=True).strftime("%Y-%m-%d")
+    except (ValueError, OverflowError):
+        return text
+
+
+def normalize_column(values, fuzzy: bool = False):
+    """
+    Normalize a whole column: a list (returns a list) or a pandas Series
+    (returns a Series). Each distinct value is parsed once.
+    """
+    mapping = {v: normalize_date(v if isinstance(v, str) else "", fuzzy) for v in dict.fromkeys(values)}
+    if hasattr(values, "map"):
+        return values.map(mapping)
+    return [mapping[v] for v in values]
@@ -0,0 +1,298 @@
+# Shared headless Chrome pool for the Webscraper jobs.
+# One warm browser (or N of them) serves every scraper in a run instead of
+# each scraper cold-starting its own Chrome.
+#
+# Usage:
+#     pool = get_pool()
+#     with pool.lease() as driver:
+#         goto(driver, url)
+#
+# Drivers use the lean profile from browser_profile.py unless the pool is
+# given another one (WEBSCRAPER_LEAN=0 makes FULL the default); goto()
+# applies the profile's per-site block list before loading a page, and loads
+# it through the shared scheduler (scheduler.py) like any HTTP request.
+#
+# Selenium is imported, and chromedriver resolved (chromedriver.py), only
+# when the first driver starts: importing a scraper costs neither.
+
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+
+from browser_profile import FULL, LEAN, BrowserProfile
+from chromedriver import resolve
+from metrics import instrument, span
+from scheduler import RETRY_STATUSES, Outcome, shared
+from session_state import get_store
+
+
+DEFAULT_PROFILE = FULL if os.environ.get("WEBSCRAPER_LEAN", "1") == "0" else LEAN
+
+# the loaded document's HTTP status (Chrome 109+), 0 when it can't tell
+NAVIGATION_STATUS_JS = (
+    "var e = performance.getEntriesByType('navigation')[0];"
+    "return e && e.responseStatus || 0;"
+)
+
+
+def chrome_options(headless: bool = True, profile: BrowserProfile = FULL):
+    from selenium.webdriver.chrome.options import Options
+
+    opts = Options()
+    if headless:
+        opts.add_argument("--headless=new")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--window-size=1400,900")
+    opts.add_argument("--log-level=3")
+    opts.page_load_strategy = profile.page_load_strategy
+    if not profile.images:
+        opts.add_argument("--blink-settings=imagesEnabled=false")
+        opts.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return opts
+
+
+def make_driver(headless: bool = True, profile: BrowserProfile | None = None):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    profile = profile or DEFAULT_PROFILE
+    opts = chrome_options(headless, profile)
+    chromedriver = resolve()
+    with span("driver.start"):
+        if chromedriver is not None:
+            driver = webdriver.Chrome(service=Service(chromedriver.path), options=opts)
+        else:
+            driver = webdriver.Chrome(options=opts)
+    # counts/times every WebDriver command when metrics are enabled
+    instrument(driver)
+    # saved cookie/consent state, so known banners never appear
+    get_store().seed(driver)
+    if profile.patterns():
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver._ws_profile, driver._ws_blocked = profile, None
+        except Exception as e:
+            print(f"[warn] request blocking unavailable: {e}")
+    return driver
+
+
+def navigation_status(driver) -> int | None:
+    try:
+        return driver.execute_script(NAVIGATION_STATUS_JS) or None
+    except Exception:
+        return None
+
+
+def pages_loaded(driver) -> int:
+    """How many pages goto() has loaded in `driver`."""
+    return getattr(driver, "_ws_pages", 0)
+
+
+def goto(driver, url: str):
+    """
+    driver.get(url), with the profile's block list for url's site set first,
+    paced and retried (a 429/5xx page, a load timeout) by the shared scheduler.
+    """
+    from selenium.common.exceptions import TimeoutException
+
+    profile = getattr(driver, "_ws_profile", None)
+    if profile is not None:
+        patterns = profile.blocked_for(url)
+        if patterns != driver._ws_blocked:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+            driver._ws_blocked = patterns
+
+    def load():
+        driver.get(url)
+        return Outcome(navigation_status(driver))
+
+    status = shared().call(url, load, retry_on=(TimeoutException,)).status_code
+    driver._ws_pages = pages_loaded(driver) + 1
+    if status in RETRY_STATUSES:
+        print(f"[warn] {url} still answers HTTP {status} after retries")
+
+
+def _pages(pages: int | None, driver, before: int) -> int:
+    return pages if pages is not None else pages_loaded(driver) - before
+
+
+@dataclass
+class _Slot:
+    driver: object
+    pages: int = 0
+
+
+class DriverPool:
+    """
+    Lease/return pool of Chrome drivers.
+
+    A driver is handed out by acquire()/lease() and must be given back with
+    release(). Idle drivers are health-checked before reuse, and a driver is
+    recycled once it has served `max_pages` pages.
+    """
+
+    def __init__(self, size: int = 1, max_pages: int = 50, headless: bool = True, factory=None,
+                 profile: BrowserProfile | None = None):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.headless = headless
+        self._factory = factory or partial(make_driver, profile=profile)
+        self._idle: list[_Slot] = []
+        self._leased: dict[int, _Slot] = {}
+        self._starting = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _healthy(self, slot: _Slot) -> bool:
+        try:
+            slot.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, slot: _Slot):
+        try:
+            slot.driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self, timeout: float | None = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("driver pool is closed")
+                    if self._idle:
+                        # leased while it's checked, so it still counts against `size`
+                        slot = self._idle.pop()
+                        self._leased[id(slot.driver)] = slot
+                        break
+                    if len(self._leased) + self._starting < self.size:
+                        self._starting += 1
+                        slot = None
+                        break
+                    left = None if deadline is None else deadline - time.monotonic()
+                    if left is not None and left <= 0:
+                        raise TimeoutError(f"no driver available within {timeout}s")
+                    self._cond.wait(left)
+            if slot is None:
+                break
+
+            # the health check is a browser round-trip: never under the lock
+            if self._healthy(slot):
+                return slot.driver
+            with self._cond:
+                self._leased.pop(id(slot.driver), None)
+                self._cond.notify()
+            self._quit(slot)
+
+        # start Chrome outside the lock so releases are not blocked on it
+        try:
+            driver = self._factory(self.headless)
+        except Exception:
+            with self._cond:
+                self._starting -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._starting -= 1
+            self._leased[id(driver)] = _Slot(driver)
+        return driver
+
+    def release(self, driver, pages: int = 1, discard: bool = False):
+        with self._cond:
+            slot = self._leased.pop(id(driver), None)
+            if slot is None:
+                return
+            slot.pages += pages
+            if not (discard or self._closed or slot.pages >= self.max_pages):
+                self._idle.append(slot)
+                self._cond.notify()
+                return
+        # quitting Chrome can take seconds: not under the lock
+        self._quit(slot)
+        with self._cond:
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: float | None = None, pages: int | None = None):
+        """acquire() and release(); `pages` defaults to the pages goto() loaded meanwhile."""
+        from selenium.common.exceptions import WebDriverException
+
+        driver = self.acquire(timeout)
+        before = pages_loaded(driver)
+        try:
+            yield driver
+        except WebDriverException:
+            # the browser itself misbehaved; don't hand it to the next job
+            self.release(driver, discard=True)
+            raise
+        except BaseException:
+            self.release(driver, _pages(pages, driver, before))
+            raise
+        else:
+            self.release(driver, _pages(pages, driver, before))
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            slots = self._idle + list(self._leased.values())
+            self._idle, self._leased = [], {}
+            self._cond.notify_all()
+        for slot in slots:
+            self._quit(slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PooledScraper:
+    """
+    Mixin for scraper classes: `self.driver` is leased from `self.pool` on
+    first use, so a scraper that never needs a browser never starts one.
+    """
+
+    pool: DriverPool
+    _driver = None
+    _pages_before = 0
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = self.pool.acquire()
+            self._pages_before = pages_loaded(self._driver)
+        return self._driver
+
+    def close(self):
+        if self._driver is not None:
+            # the pages this scraper loaded count towards the driver's max_pages
+            self.pool.release(self._driver, pages=pages_loaded(self._driver) - self._pages_before)
+            self._driver = None
+
+
+_pool: DriverPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(**kwargs) -> DriverPool:
+    """
+    Process-wide shared pool. Keyword arguments only take effect on the call
+    that creates it; the pool is closed automatically at interpreter exit.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = DriverPool(**kwargs)
+            atexit.register(_pool.close)
+        return _pool
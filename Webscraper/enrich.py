@@ -0,0 +1,231 @@
+# Detail-page enrichment: fetch the pages that scraped rows link to (the
+# Troemner productURL, the Palo Alto hardware "resource" links) and pull
+# specs out of HTML pages and metadata out of PDFs.
+#
+#   details = enrich(urls, workers=16)      # url -> Detail
+#
+# Links are deduplicated before fetching, so a page that many rows link to is
+# requested once. Workers are a bounded thread pool sharing fetch.py's
+# per-thread keep-alive sessions and an optional HostRateLimiter. Extracted
+# details are kept in .cache/details.json for `ttl` seconds, so a rerun only
+# fetches links it hasn't seen (failures are never cached).
+
+import json
+import os
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from urllib.parse import urlsplit
+
+from fetch import HostRateLimiter, get, inner_text, parse_html
+from metrics import timed
+
+try:
+    # optional: reads compressed PDF object streams too
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(HERE, ".cache", "details.json")
+TTL = 7 * 24 * 3600
+SAVE_EVERY = 5.0  # seconds between cache saves during a run
+
+# key/value pairs: two-cell table rows and definition lists
+_SPEC_ROWS = "//table//tr[count(th|td) = 2]"
+_SPEC_TERMS = "//dl/dt[following-sibling::*[1][self::dd]]"
+_PDF_LINKS = "//a[contains(translate(@href, 'PDF', 'pdf'), '.pdf')]/@href"
+
+_PDF_INFO_KEYS = {"Title": "Title", "Author": "Author", "Subject": "Subject",
+                  "CreationDate": "Created", "ModDate": "Modified"}
+
+
+@dataclass
+class Detail:
+    url: str
+    kind: str  # "html", "pdf" or "error"
+    title: str = ""
+    specs: dict[str, str] = field(default_factory=dict)
+    documents: list[str] = field(default_factory=list)  # PDF links on an HTML page
+    error: str = ""
+
+    def specs_text(self) -> str:
+        return "; ".join(f"{k}: {v}" for k, v in self.specs.items())
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def parse_detail_html(url: str, text: str) -> Detail:
+    tree = parse_html(text, url)
+    title = tree.xpath("string(//h1)") or tree.xpath("string(//title)")
+    specs = {}
+    for tr in tree.xpath(_SPEC_ROWS):
+        key, value = (_clean(inner_text(c)) for c in tr.xpath("./th|./td"))
+        key = key.rstrip(":")
+        if key and value and key not in specs:
+            specs[key] = value
+    for dt in tree.xpath(_SPEC_TERMS):
+        key, value = _clean(inner_text(dt)).rstrip(":"), _clean(inner_text(dt.getnext()))
+        if key and value and key not in specs:
+            specs[key] = value
+    documents = list(dict.fromkeys(tree.xpath(_PDF_LINKS)))
+    return Detail(url, "html", _clean(title), specs, documents)
+
+
+def _pdf_date(value: str) -> str:
+    # "D:20210304120000Z" -> "2021-03-04"
+    m = re.match(r"(?:D:)?(\d{4})(\d{2})?(\d{2})?", value)
+    if not m:
+        return value
+    return "-".join(p for p in m.groups() if p)
+
+
+def _pdf_string(raw: bytes) -> str:
+    if raw.startswith(b"<"):
+        data = bytes.fromhex(raw[1:-1].decode("ascii", "ignore"))
+    else:
+        data = re.sub(rb"\\([()\\])", rb"\1", raw[1:-1])
+    if data.startswith(b"\xfe\xff"):
+        return data[2:].decode("utf-16-be", "replace")
+    return data.decode("latin-1")
+
+
+def _pdf_info_fallback(data: bytes) -> tuple[dict, int | None]:
+    # Info dictionary and page count from an uncompressed PDF; objects inside
+    # compressed object streams are only searched after inflating them.
+    chunks = [data]
+    for stream in re.findall(rb"/FlateDecode.*?stream\r?\n(.*?)endstream", data, re.S):
+        try:
+            chunks.append(zlib.decompress(stream))
+        except zlib.error:
+            pass
+    body = b"\n".join(chunks)
+    info = {}
+    for key in _PDF_INFO_KEYS:
+        m = re.search(rb"/" + key.encode() + rb"\s*(\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f]*>)", body)
+        if m:
+            info[key] = _pdf_string(m.group(1))
+    counts = [int(n) for n in re.findall(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)", body)]
+    pages = max(counts) if counts else len(re.findall(rb"/Type\s*/Page\b", body)) or None
+    return info, pages
+
+
+def parse_detail_pdf(url: str, data: bytes) -> Detail:
+    if PdfReader is not None:
+        import io
+        reader = PdfReader(io.BytesIO(data))
+        info = {k.lstrip("/"): str(v) for k, v in (reader.metadata or {}).items()}
+        pages = len(reader.pages)
+    else:
+        info, pages = _pdf_info_fallback(data)
+
+    specs = {}
+    if pages:
+        specs["Pages"] = str(pages)
+    for key, label in _PDF_INFO_KEYS.items():
+        value = _clean(info.get(key) or "")
+        if value and key != "Title":
+            specs[label] = _pdf_date(value) if key.endswith("Date") else value
+    title = _clean(info.get("Title") or "") or os.path.basename(urlsplit(url).path)
+    return Detail(url, "pdf", title, specs)
+
+
+def fetch_detail(url: str, limiter: HostRateLimiter | None = None, timeout: int = 20) -> Detail:
+    if limiter is not None:
+        limiter.wait(url)
+    resp = get(url, timeout=timeout)
+    ctype = resp.headers.get("Content-Type", "")
+    try:
+        if "pdf" in ctype or resp.content.startswith(b"%PDF"):
+            return parse_detail_pdf(resp.url, resp.content)
+        return parse_detail_html(resp.url, resp.text)
+    except Exception as e:
+        # a corrupt PDF or an empty body; pypdf and lxml raise all sorts
+        return Detail(resp.url, "error", error=f"{type(e).__name__}: {e}")
+
+
+class DetailCache:
+    """url -> Detail on disk, entries older than `ttl` seconds ignored."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = TTL):
+        self.path = path
+        self.ttl = ttl
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, url: str) -> Detail | None:
+        entry = self._entries.get(url)
+        if entry is None or time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return Detail(**entry["detail"])
+
+    def put(self, detail: Detail):
+        self._entries[detail.url] = {"fetched_at": time.time(), "detail": asdict(detail)}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
+
+
+@timed("enrich.fetch")
+def enrich(urls, workers: int = 16, rate: float | None = None, timeout: int = 20,
+           cache: DetailCache | None = None) -> dict[str, Detail]:
+    """
+    Fetch every distinct URL in `urls` (cached ones excepted) with up to
+    `workers` concurrent requests, `rate` capping requests per second per
+    host. Pass cache=None for the default on-disk cache, or a DetailCache
+    with ttl=0 to refetch everything. Returns url -> Detail; a failed fetch
+    is a Detail of kind "error".
+    """
+    import requests
+
+    cache = cache if cache is not None else DetailCache()
+    details: dict[str, Detail] = {}
+    todo = []
+    for url in dict.fromkeys(u for u in urls if u):
+        hit = cache.get(url)
+        if hit is not None:
+            details[url] = hit
+        else:
+            todo.append(url)
+
+    limiter = HostRateLimiter(rate)
+    failed = 0
+    saved = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="enrich") as ex:
+        futures = {ex.submit(fetch_detail, url, limiter, timeout): url for url in todo}
+        for fut in as_completed(futures):
+            url = futures[fut]
+            try:
+                detail = fut.result()
+            except (requests.RequestException, ValueError) as e:
+                failed += 1
+                details[url] = Detail(url, "error", error=str(e))
+                continue
+            # keyed by the requested URL, not where a redirect ended up
+            detail.url = url
+            details[url] = detail
+            if detail.kind == "error":
+                failed += 1
+                continue
+            cache.put(detail)
+            # saved as it goes, so an interrupted run keeps what it fetched
+            if time.monotonic() - saved >= SAVE_EVERY:
+                cache.save()
+                saved = time.monotonic()
+
+    if todo:
+        cache.save()
+    print(f"Enriched {len(details)} links: {len(todo) - failed} fetched, "
+          f"{len(details) - len(todo)} cached, {failed} failed.")
+    return details
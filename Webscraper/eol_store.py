@@ -0,0 +1,490 @@
+# Persistent EOL store: every hardware and software EOL scrape, upserted into
+# one indexed SQLite database, so "which versions go EOL before 2027-01-01"
+# or "what replaces PA-3020" is an indexed query, not a CSV load.
+#
+#   with EolStore("eol.sqlite") as store:
+#       store.upsert_hardware(rows, source=url)      # one transaction per run
+#       store.software_eol(before="2027-01-01")
+#       store.replacements("PA-3020")
+#
+#   python eol_store.py eol --before 2027-01-01 [--after 2025-01-01] [--kind software]
+#   python eol_store.py product PA-3020              # the product, its replacements
+#   python eol_store.py software "PAN-OS" [--version 10.1]
+#   python eol_store.py history PA-3020              # every change across runs
+#   python eol_store.py import                       # backfill from the CSV outputs
+#
+# Tables: products (one per vendor + productName) with their models and
+# replacements split out, software (one per name) and versions. Both kinds
+# are keyed like their *.changes.csv diff: productName, and softwareName +
+# version + occurrence (a plugin version can be listed under two tables).
+# EOL dates are kept as scraped (eol_text) and, when they read as a date,
+# as yyyy-mm-dd (eol_date, indexed); "Latest" has no eol_date.
+#
+# Each upsert is a run: rows new since the last run, changed, or gone from
+# it are logged in the history tables against that run, gone rows are marked
+# removed (queries skip them) and come back as added if they reappear.
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from columns import as_dict
+from dates import normalize_date
+from sinks import open_sink, read_rows
+
+STORE_PATH = "eol.sqlite"
+# the command-line default: next to the scripts, whatever the working directory
+DEFAULT_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), STORE_PATH)
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_US_DATE = re.compile(r"\d{1,2}/\d{1,2}/\d{4}")
+# "PA-7000 Series | (PAN-PA-7000-100G-NPC-A, | PAN-PA-7000-LFC-A)": one model per piece
+_MODEL_SPLIT = re.compile(r"\s*(?:\||,|\(|\))\s*")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, kind TEXT NOT NULL, source TEXT, at TEXT NOT NULL,
+    rows INTEGER NOT NULL, added INTEGER, modified INTEGER, removed INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    vendor TEXT NOT NULL,
+    name TEXT NOT NULL COLLATE NOCASE,
+    eol_date TEXT, eol_text TEXT, resource TEXT, replacement TEXT,
+    first_run INTEGER NOT NULL, last_run INTEGER NOT NULL, removed_run INTEGER,
+    UNIQUE (vendor, name)
+);
+CREATE INDEX IF NOT EXISTS products_name ON products (name);
+CREATE INDEX IF NOT EXISTS products_eol ON products (eol_date);
+CREATE TABLE IF NOT EXISTS models (
+    product_id INTEGER NOT NULL REFERENCES products (id), model TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS models_model ON models (model);
+CREATE INDEX IF NOT EXISTS models_product ON models (product_id);
+CREATE TABLE IF NOT EXISTS replacements (
+    product_id INTEGER NOT NULL REFERENCES products (id), replacement TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS replacements_replacement ON replacements (replacement);
+CREATE INDEX IF NOT EXISTS replacements_product ON replacements (product_id);
+CREATE TABLE IF NOT EXISTS product_history (
+    run_id INTEGER NOT NULL REFERENCES runs (id), product_id INTEGER NOT NULL REFERENCES products (id),
+    change TEXT NOT NULL, eol_text TEXT, resource TEXT, replacement TEXT
+);
+CREATE INDEX IF NOT EXISTS product_history_product ON product_history (product_id);
+
+CREATE TABLE IF NOT EXISTS software (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    software_id INTEGER NOT NULL REFERENCES software (id),
+    version TEXT NOT NULL, seq INTEGER NOT NULL,
+    release_date TEXT, eol_date TEXT, eol_text TEXT,
+    first_run INTEGER NOT NULL, last_run INTEGER NOT NULL, removed_run INTEGER,
+    UNIQUE (software_id, version, seq)
+);
+CREATE INDEX IF NOT EXISTS versions_eol ON versions (eol_date);
+CREATE TABLE IF NOT EXISTS version_history (
+    run_id INTEGER NOT NULL REFERENCES runs (id), version_id INTEGER NOT NULL REFERENCES versions (id),
+    change TEXT NOT NULL, release_date TEXT, eol_text TEXT
+);
+CREATE INDEX IF NOT EXISTS version_history_version ON version_history (version_id);
+"""
+
+# this run's rows, compared with the stored ones in SQL
+_STAGING = """
+CREATE TEMP TABLE IF NOT EXISTS product_stage (
+    vendor TEXT NOT NULL, name TEXT NOT NULL COLLATE NOCASE,
+    eol_date TEXT, eol_text TEXT, resource TEXT, replacement TEXT, change TEXT,
+    PRIMARY KEY (vendor, name)
+);
+CREATE TEMP TABLE IF NOT EXISTS version_stage (
+    name TEXT NOT NULL COLLATE NOCASE, version TEXT NOT NULL, seq INTEGER NOT NULL,
+    release_date TEXT, eol_date TEXT, eol_text TEXT, change TEXT, software_id INTEGER,
+    PRIMARY KEY (name, version, seq)
+);
+-- for finding the stored versions this run no longer lists
+CREATE INDEX IF NOT EXISTS temp.version_stage_id ON version_stage (software_id, version, seq);
+"""
+
+
+@dataclass(slots=True, frozen=True)
+class HardwareEntry:
+    vendor: str
+    productName: str
+    EOL_Date: str
+    resource: str
+    Recommended_replacement: str
+
+
+@dataclass(slots=True, frozen=True)
+class SoftwareEntry:
+    softwareName: str
+    version: str
+    releaseDate: str
+    eolDate: str
+
+
+@dataclass(slots=True, frozen=True)
+class Change:
+    at: str        # when the run was, UTC
+    change: str    # added, modified or removed
+    name: str      # productName or softwareName
+    version: str   # "" for hardware
+    eol: str
+    detail: str    # the replacement, or the release date
+
+
+def _eol_date(text: str) -> str | None:
+    """The date in an EOL cell as yyyy-mm-dd, or None ("Latest", a stray header row)."""
+    # footnote marks: "December 31, 2026**"
+    text = (text or "").strip().rstrip("*")
+    out = normalize_date(text)
+    if not _ISO_DATE.fullmatch(out) and _US_DATE.fullmatch(text):
+        out = normalize_date(text, fuzzy=True)
+    return out if _ISO_DATE.fullmatch(out) else None
+
+
+def models(name: str) -> list[str]:
+    """The model names in a productName cell."""
+    return [m for m in dict.fromkeys(_MODEL_SPLIT.split(name or "")) if m]
+
+
+def _pieces(value: str) -> list[str]:
+    return [p for p in dict.fromkeys(s.strip() for s in (value or "").split(" | ")) if p]
+
+
+def _like_prefix(value: str) -> str:
+    return re.sub(r"([\\%_])", r"\\\1", value) + "%"
+
+
+class EolStore:
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # the hardware and software jobs may write at the same time
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA + _STAGING)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- runs ---------------------------------------------------------------
+
+    def _start_run(self, kind: str, source: str, rows: int) -> int:
+        at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        cur = self._db.execute("INSERT INTO runs (kind, source, at, rows) VALUES (?, ?, ?, ?)",
+                               (kind, source, at, rows))
+        return cur.lastrowid
+
+    def _finish_run(self, run: int, stage: str, removed: int) -> tuple[int, int, int]:
+        counts = dict(self._db.execute(f"SELECT change, count(*) FROM {stage} GROUP BY change"))
+        added, modified = counts.get("added", 0), counts.get("modified", 0)
+        self._db.execute("UPDATE runs SET added = ?, modified = ?, removed = ? WHERE id = ?",
+                         (added, modified, removed, run))
+        return added, modified, removed
+
+    def upsert_hardware(self, rows, source: str = "") -> tuple[int, int, int]:
+        """
+        Store one hardware scrape (EOLhardware.Row or dicts with its
+        columns) in one transaction; returns (added, modified, removed).
+        """
+        rows = [as_dict(r) for r in rows]
+        db = self._db
+        with db:
+            run = self._start_run("hardware", source, len(rows))
+            db.execute("DELETE FROM product_stage")
+            # a product listed twice keeps its last row
+            db.executemany(
+                "INSERT OR REPLACE INTO product_stage (vendor, name, eol_date, eol_text, resource, replacement) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(r.get("vendor") or "", r["productName"], _eol_date(r["EOL_Date"]), r["EOL_Date"],
+                  r.get("resource") or "", r.get("Recommended_replacement") or "") for r in rows],
+            )
+            db.execute("""
+                UPDATE product_stage SET change = coalesce((
+                    SELECT CASE
+                        WHEN p.removed_run IS NOT NULL THEN 'added'
+                        WHEN p.eol_text IS NOT product_stage.eol_text
+                          OR p.resource IS NOT product_stage.resource
+                          OR p.replacement IS NOT product_stage.replacement THEN 'modified'
+                        ELSE '' END
+                    FROM products p WHERE p.vendor = product_stage.vendor AND p.name = product_stage.name
+                ), 'added')
+            """)
+            gone = """
+                FROM products p WHERE p.removed_run IS NULL AND NOT EXISTS (
+                    SELECT 1 FROM product_stage s WHERE s.vendor = p.vendor AND s.name = p.name)
+            """
+            db.execute(f"INSERT INTO product_history SELECT ?, p.id, 'removed', p.eol_text, p.resource, p.replacement {gone}",
+                       (run,))
+            removed = db.execute(f"UPDATE products SET removed_run = ? WHERE id IN (SELECT p.id {gone})",
+                                 (run,)).rowcount
+            db.execute("""
+                INSERT INTO products (vendor, name, eol_date, eol_text, resource, replacement, first_run, last_run)
+                SELECT vendor, name, eol_date, eol_text, resource, replacement, ?1, ?1 FROM product_stage WHERE true
+                ON CONFLICT (vendor, name) DO UPDATE SET
+                    eol_date = excluded.eol_date, eol_text = excluded.eol_text, resource = excluded.resource,
+                    replacement = excluded.replacement, last_run = excluded.last_run, removed_run = NULL
+            """, (run,))
+            changed = db.execute("""
+                SELECT p.id, p.name, p.replacement FROM product_stage s
+                JOIN products p ON p.vendor = s.vendor AND p.name = s.name WHERE s.change != ''
+            """).fetchall()
+            db.execute("""
+                INSERT INTO product_history
+                SELECT ?, p.id, s.change, s.eol_text, s.resource, s.replacement FROM product_stage s
+                JOIN products p ON p.vendor = s.vendor AND p.name = s.name WHERE s.change != ''
+            """, (run,))
+            # models and replacements of every new or changed product, split once here
+            ids = [(pid,) for pid, _, _ in changed]
+            db.executemany("DELETE FROM models WHERE product_id = ?", ids)
+            db.executemany("DELETE FROM replacements WHERE product_id = ?", ids)
+            db.executemany("INSERT INTO models VALUES (?, ?)",
+                           [(pid, m) for pid, name, _ in changed for m in models(name)])
+            db.executemany("INSERT INTO replacements VALUES (?, ?)",
+                           [(pid, r) for pid, _, repl in changed for r in _pieces(repl)])
+            return self._finish_run(run, "product_stage", removed)
+
+    def upsert_software(self, rows, source: str = "") -> tuple[int, int, int]:
+        """
+        Store one software scrape (EOLsoftwares.SoftwareRow or dicts with its
+        columns) in one transaction; returns (added, modified, removed).
+        """
+        staged, seen = [], {}
+        for r in rows:
+            r = as_dict(r)
+            key = (r["softwareName"], r["version"])
+            # repeated versions are told apart by occurrence, as in changes.py
+            seq = seen[key] = seen.get(key, -1) + 1
+            staged.append((r["softwareName"], r["version"], seq, r.get("releaseDate") or "",
+                           _eol_date(r["eolDate"]), r["eolDate"]))
+        db = self._db
+        with db:
+            run = self._start_run("software", source, len(staged))
+            db.execute("DELETE FROM version_stage")
+            db.executemany(
+                "INSERT OR REPLACE INTO version_stage (name, version, seq, release_date, eol_date, eol_text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                staged,
+            )
+            db.execute("INSERT OR IGNORE INTO software (name) SELECT DISTINCT name FROM version_stage")
+            db.execute("UPDATE version_stage SET software_id = (SELECT id FROM software WHERE name = version_stage.name)")
+            db.execute("""
+                UPDATE version_stage SET change = coalesce((
+                    SELECT CASE
+                        WHEN v.removed_run IS NOT NULL THEN 'added'
+                        WHEN v.release_date IS NOT version_stage.release_date
+                          OR v.eol_text IS NOT version_stage.eol_text THEN 'modified'
+                        ELSE '' END
+                    FROM versions v WHERE v.software_id = version_stage.software_id
+                        AND v.version = version_stage.version AND v.seq = version_stage.seq
+                ), 'added')
+            """)
+            gone = """
+                FROM versions v WHERE v.removed_run IS NULL AND NOT EXISTS (
+                    SELECT 1 FROM version_stage s
+                    WHERE s.software_id = v.software_id AND s.version = v.version AND s.seq = v.seq)
+            """
+            db.execute(f"INSERT INTO version_history SELECT ?, v.id, 'removed', v.release_date, v.eol_text {gone}",
+                       (run,))
+            removed = db.execute(f"UPDATE versions SET removed_run = ? WHERE id IN (SELECT v.id {gone})",
+                                 (run,)).rowcount
+            db.execute("""
+                INSERT INTO versions (software_id, version, seq, release_date, eol_date, eol_text, first_run, last_run)
+                SELECT software_id, version, seq, release_date, eol_date, eol_text, ?1, ?1 FROM version_stage WHERE true
+                ON CONFLICT (software_id, version, seq) DO UPDATE SET
+                    release_date = excluded.release_date, eol_date = excluded.eol_date,
+                    eol_text = excluded.eol_text, last_run = excluded.last_run, removed_run = NULL
+            """, (run,))
+            db.execute("""
+                INSERT INTO version_history
+                SELECT ?, v.id, s.change, s.release_date, s.eol_text FROM version_stage s
+                JOIN versions v ON v.software_id = s.software_id AND v.version = s.version AND v.seq = s.seq
+                WHERE s.change != ''
+            """, (run,))
+            return self._finish_run(run, "version_stage", removed)
+
+    # --- queries ------------------------------------------------------------
+
+    _PRODUCT_COLUMNS = "p.vendor, p.name, p.eol_text, p.resource, p.replacement"
+
+    def hardware_eol(self, after: str | None = None, before: str | None = None) -> list[HardwareEntry]:
+        """Products going EOL on or after `after` and before `before` (ISO dates), soonest first."""
+        sql = (f"SELECT {self._PRODUCT_COLUMNS} FROM products p "
+               "WHERE p.eol_date >= ? AND p.eol_date < ? AND p.removed_run IS NULL ORDER BY p.eol_date, p.name")
+        return [HardwareEntry(*r) for r in self._db.execute(sql, (after or "", before or "9999-99-99"))]
+
+    def software_eol(self, after: str | None = None, before: str | None = None,
+                     name: str | None = None) -> list[SoftwareEntry]:
+        """Software versions going EOL in [after, before), soonest first; `name` narrows to one product."""
+        sql = ("SELECT s.name, v.version, v.release_date, v.eol_text FROM versions v "
+               "JOIN software s ON s.id = v.software_id "
+               "WHERE v.eol_date >= ? AND v.eol_date < ? AND v.removed_run IS NULL")
+        args = [after or "", before or "9999-99-99"]
+        if name:
+            sql += " AND s.name = ?"
+            args.append(name)
+        sql += " ORDER BY v.eol_date, s.name, v.version"
+        return [SoftwareEntry(*r) for r in self._db.execute(sql, args)]
+
+    def _product_ids(self, model: str) -> list[int]:
+        # an exact model first, else every model starting with it
+        for op, value in (("=", model), ("LIKE", _like_prefix(model))):
+            escape = " ESCAPE '\\'" if op == "LIKE" else ""
+            ids = [pid for (pid,) in self._db.execute(
+                f"SELECT DISTINCT m.product_id FROM models m JOIN products p ON p.id = m.product_id "
+                f"WHERE m.model {op} ?{escape} AND p.removed_run IS NULL ORDER BY m.product_id", (value,))]
+            if ids:
+                return ids
+        return []
+
+    def products(self, model: str) -> list[HardwareEntry]:
+        """Products listing `model` (case-insensitive; a prefix when no model matches exactly)."""
+        ids = self._product_ids(model)
+        return [HardwareEntry(*self._db.execute(
+            f"SELECT {self._PRODUCT_COLUMNS} FROM products p WHERE p.id = ?", (pid,)).fetchone()) for pid in ids]
+
+    def replacements(self, model: str) -> list[str]:
+        """What replaces `model`: the recommended replacements of every product listing it."""
+        ids = self._product_ids(model)
+        found = []
+        for pid in ids:
+            found.extend(r for (r,) in self._db.execute(
+                "SELECT replacement FROM replacements WHERE product_id = ? ORDER BY rowid", (pid,)))
+        return list(dict.fromkeys(found))
+
+    def replacing(self, model: str) -> list[HardwareEntry]:
+        """The products `model` (or a replacement starting with it, e.g. "PA-3400 Series") replaces."""
+        sql = (f"SELECT DISTINCT {self._PRODUCT_COLUMNS} FROM replacements r JOIN products p ON p.id = r.product_id "
+               "WHERE r.replacement LIKE ? ESCAPE '\\' AND p.removed_run IS NULL ORDER BY p.eol_date, p.name")
+        return [HardwareEntry(*r) for r in self._db.execute(sql, (_like_prefix(model),))]
+
+    def software(self, name: str, version: str | None = None) -> list[SoftwareEntry]:
+        """Every current version of `name`, or those of one `version` (case-insensitive name)."""
+        sql = ("SELECT s.name, v.version, v.release_date, v.eol_text FROM software s "
+               "JOIN versions v ON v.software_id = s.id WHERE s.name = ? AND v.removed_run IS NULL")
+        args = [name]
+        if version:
+            sql += " AND v.version = ?"
+            args.append(version)
+        sql += " ORDER BY v.id"
+        return [SoftwareEntry(*r) for r in self._db.execute(sql, args)]
+
+    def history(self, name: str, version: str | None = None) -> list[Change]:
+        """Every recorded change to a hardware model, or to a software name (and version), oldest first."""
+        hardware = [] if version else [Change(*r) for r in self._db.execute(f"""
+            SELECT r.at, h.change, p.name, '', h.eol_text, h.replacement FROM product_history h
+            JOIN runs r ON r.id = h.run_id JOIN products p ON p.id = h.product_id
+            WHERE h.product_id IN (SELECT product_id FROM models WHERE model = ?)
+            ORDER BY h.run_id, p.name""", (name,))]
+        sql = """
+            SELECT r.at, h.change, s.name, v.version, h.eol_text, h.release_date FROM version_history h
+            JOIN runs r ON r.id = h.run_id JOIN versions v ON v.id = h.version_id
+            JOIN software s ON s.id = v.software_id WHERE s.name = ?"""
+        args = [name]
+        if version:
+            sql += " AND v.version = ?"
+            args.append(version)
+        software = [Change(*r) for r in self._db.execute(sql + " ORDER BY h.run_id, v.id", args)]
+        return hardware + software
+
+
+def _print(rows: list, fields: list[str], out: str | None, seconds: float):
+    if out:
+        with open_sink(out, fields) as sink:
+            sink.write_many(rows)
+        print(f"{sink.count} rows to {out} ({seconds * 1000:.1f} ms)")
+        return
+    if rows:
+        print("\t".join(fields))
+        for row in rows:
+            print("\t".join(str(v) for v in as_dict(row).values()))
+    print(f"{len(rows)} rows ({seconds * 1000:.1f} ms)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the EOL store the EOL scrapers fill")
+    parser.add_argument("--db", default=DEFAULT_STORE, help="store path")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("eol", help="what goes EOL in a date range")
+    p.add_argument("--after", help="on or after this date (yyyy-mm-dd)")
+    p.add_argument("--before", help="before this date (yyyy-mm-dd)")
+    p.add_argument("--kind", choices=["hardware", "software"], help="only this kind")
+    p.add_argument("--name", help="only this software")
+    p.add_argument("--out", help="write the rows to a .csv/.jsonl/.parquet file")
+
+    p = sub.add_parser("product", help="a hardware model, what replaces it and what it replaces")
+    p.add_argument("model")
+
+    p = sub.add_parser("software", help="the versions of a software product")
+    p.add_argument("name")
+    p.add_argument("--version")
+    p.add_argument("--out", help="write the rows to a .csv/.jsonl/.parquet file")
+
+    p = sub.add_parser("history", help="every change to a hardware model or software product across runs")
+    p.add_argument("name")
+    p.add_argument("--version")
+
+    p = sub.add_parser("import", help="load the EOL CSV outputs into the store as one run each")
+    p.add_argument("--hardware", default="palo_alto_hardware_eol.csv")
+    p.add_argument("--software", default="paloalto_software_eol.csv")
+
+    args = parser.parse_args()
+    if args.cmd == "eol" and args.out and not (args.kind or args.name):
+        # hardware and software rows have different columns
+        parser.error("eol --out needs --kind hardware or --kind software")
+    with EolStore(args.db) as store:
+        t0 = time.perf_counter()
+        if args.cmd == "eol":
+            if args.kind != "software" and not args.name:
+                rows = store.hardware_eol(args.after, args.before)
+                _print(rows, list(HardwareEntry.__dataclass_fields__), args.out, time.perf_counter() - t0)
+            if args.kind != "hardware":
+                t0 = time.perf_counter()
+                rows = store.software_eol(args.after, args.before, args.name)
+                _print(rows, list(SoftwareEntry.__dataclass_fields__), args.out, time.perf_counter() - t0)
+        elif args.cmd == "product":
+            found = store.products(args.model)
+            replacements = store.replacements(args.model)
+            replacing = store.replacing(args.model)
+            seconds = time.perf_counter() - t0
+            for entry in found:
+                print(f"{entry.productName}\n  EOL {entry.EOL_Date}  {entry.resource}")
+            if not found:
+                print(f"No product lists {args.model!r}")
+            print(f"Replaced by: {', '.join(replacements) or '-'}")
+            if replacing:
+                print(f"Replaces: {', '.join(e.productName.split(' | ')[0] for e in replacing)}")
+            print(f"({seconds * 1000:.1f} ms)", file=sys.stderr)
+        elif args.cmd == "software":
+            rows = store.software(args.name, args.version)
+            _print(rows, list(SoftwareEntry.__dataclass_fields__), args.out, time.perf_counter() - t0)
+        elif args.cmd == "history":
+            rows = store.history(args.name, args.version)
+            _print(rows, list(Change.__dataclass_fields__), None, time.perf_counter() - t0)
+        else:
+            for path, upsert in ((args.hardware, store.upsert_hardware), (args.software, store.upsert_software)):
+                if os.path.exists(path):
+                    added, modified, removed = upsert(read_rows(path), source=path)
+                    print(f"{path}: {added} added, {modified} modified, {removed} removed")
+                else:
+                    print(f"[warn] {path} not found, skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Declarative row/column extraction.
+#
+# A RowSpec names an XPath that selects one node per row and a Field per
+# column. The same spec runs either
+#   - in the browser, as ONE execute_script that returns every row as JSON
+#     (instead of a find_element/.text round-trip per cell), or
+#   - on an lxml tree from the HTTP fast path (see fetch.py).
+#
+#   BOOKS = RowSpec(
+#       rows="//article[contains(@class, 'product_pod')]",
+#       fields={"Title": Field(".//h3/a", attr="title"), "Price": Field(".//p")},
+#   )
+#   rows = extract(driver_or_tree, BOOKS)   # -> list[dict]
+#
+# compile_spec() compiles every expression of a spec up front (a typo fails
+# at import rather than mid-run); compiled XPaths and the JSON form handed to
+# the browser are built once per spec and reused on every call.
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from lxml import etree
+
+from fetch import inner_text
+
+try:
+    # optional: CSS selectors in specs, translated to XPath
+    from cssselect import GenericTranslator
+except ImportError:
+    GenericTranslator = None
+
+
+@dataclass(frozen=True)
+class Field:
+    xpath: str | tuple[str, ...] = "."   # relative to the row; a tuple is tried in order
+    attr: str | None = None              # None -> rendered text (innerText)
+    many: bool = False                   # every match instead of the first
+    each: "Field | None" = None          # nested field applied to each match
+
+    @property
+    def xpaths(self) -> tuple[str, ...]:
+        return (self.xpath,) if isinstance(self.xpath, str) else tuple(self.xpath)
+
+    def expressions(self):
+        yield from self.xpaths
+        if self.each is not None:
+            yield from self.each.expressions()
+
+    def to_json(self) -> dict:
+        return {
+            "xpaths": list(self.xpaths),
+            "attr": self.attr,
+            "many": self.many,
+            "each": self.each.to_json() if self.each else None,
+        }
+
+
+# eq=False: specs hash by identity, so per-spec work can be cached
+@dataclass(frozen=True, eq=False)
+class RowSpec:
+    rows: str
+    fields: dict[str, Field] = field(default_factory=dict)
+
+    def expressions(self):
+        yield self.rows
+        for f in self.fields.values():
+            yield from f.expressions()
+
+    def to_json(self) -> dict:
+        return {"rows": self.rows, "fields": {k: f.to_json() for k, f in self.fields.items()}}
+
+
+def has_class(name: str) -> str:
+    """XPath predicate body equivalent to the CSS `.name` selector."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def css(selector: str, relative: bool = True) -> str:
+    """XPath for a CSS selector (needs cssselect); relative to the row unless relative=False."""
+    if GenericTranslator is None:
+        raise ImportError("CSS selectors need cssselect: pip install cssselect")
+    return GenericTranslator().css_to_xpath(selector, prefix=".//" if relative else "//")
+
+
+# Runs inside the page. Mirrors Selenium semantics: text is innerText and
+# attributes prefer the DOM property (so href comes back absolute).
+EXTRACT_JS = r"""
+const spec = arguments[0];
+function nodes(ctx, xp) {
+  const r = document.evaluate(xp, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  const out = [];
+  for (let i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+  return out;
+}
+function value(node, f) {
+  if (f.each) return pick(node, f.each);
+  if (f.attr === null) return node.nodeType === 1 ? node.innerText : node.textContent;
+  const prop = node[f.attr === "class" ? "className" : f.attr];
+  return typeof prop === "string" ? prop : node.getAttribute(f.attr);
+}
+function pick(ctx, f) {
+  for (const xp of f.xpaths) {
+    const found = nodes(ctx, xp);
+    if (found.length) return f.many ? found.map(n => value(n, f)) : value(found[0], f);
+  }
+  return f.many ? [] : null;
+}
+return nodes(document, spec.rows).map(row => {
+  const out = {};
+  for (const [name, f] of Object.entries(spec.fields)) out[name] = pick(row, f);
+  return out;
+});
+"""
+
+
+def extract_js(driver, spec: RowSpec) -> list[dict]:
+    """All rows of `spec` from the live page in a single WebDriver round-trip."""
+    return driver.execute_script(EXTRACT_JS, spec_json(spec)) or []
+
+
+@lru_cache(maxsize=None)
+def _xpath(expr: str) -> etree.XPath:
+    return etree.XPath(expr)
+
+
+@lru_cache(maxsize=None)
+def spec_json(spec: RowSpec) -> dict:
+    """`spec` as the JSON EXTRACT_JS takes (cached per spec)."""
+    return spec.to_json()
+
+
+def compile_spec(spec: RowSpec) -> RowSpec:
+    """Compile every XPath in `spec` now; raises etree.XPathSyntaxError on a bad one."""
+    for expr in spec.expressions():
+        _xpath(expr)
+    spec_json(spec)
+    return spec
+
+
+def _value(node, f: Field):
+    if f.each is not None:
+        return _pick(node, f.each)
+    if not isinstance(node, etree._Element):
+        return str(node)  # attribute/text XPath results
+    if f.attr is None:
+        return inner_text(node)
+    return node.get(f.attr)
+
+
+def _pick(ctx, f: Field):
+    for xp in f.xpaths:
+        found = _xpath(xp)(ctx)
+        if found:
+            return [_value(n, f) for n in found] if f.many else _value(found[0], f)
+    return [] if f.many else None
+
+
+def extract_tree(tree, spec: RowSpec) -> list[dict]:
+    """All rows of `spec` from an lxml tree."""
+    return [
+        {name: _pick(row, f) for name, f in spec.fields.items()}
+        for row in _xpath(spec.rows)(tree)
+    ]
+
+
+def extract(source, spec: RowSpec) -> list[dict]:
+    """Run `spec` against a WebDriver or an lxml tree."""
+    if hasattr(source, "execute_script"):
+        return extract_js(source, spec)
+    return extract_tree(source, spec)
@@ -0,0 +1,192 @@
+# Fetch backends for server-rendered pages.
+#
+#   "http"    plain GET + lxml, no browser at all
+#   "browser" the scraper's Selenium path through the shared Chrome pool
+#   "auto"    try http first, fall back to the browser only when the rows we
+#             need are missing from the raw HTML (i.e. the page needs JS)
+#
+# Scrapers call load_tree(); a None result means "use the browser path".
+# Every request goes through the shared scheduler (scheduler.py): paced per
+# host, slowed down when the host pushes back, and retried.
+
+import re
+import threading
+import time
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from lxml import html as lxml_html
+
+from scheduler import shared
+
+if TYPE_CHECKING:
+    import requests
+
+BACKENDS = ("auto", "http", "browser")
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# elements that start a new line in the rendered text (innerText)
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5",
+    "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "table", "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+}
+_SKIP_TAGS = {"script", "style", "noscript", "template"}
+_SPACES = re.compile(r"[ \t\xa0]+")
+
+_local = threading.local()
+
+# Called with every response from every session (e.g. replay.Recorder)
+RESPONSE_HOOKS: list = []
+
+
+def _run_hooks(resp, *args, **kwargs):
+    for hook in RESPONSE_HOOKS:
+        hook(resp)
+
+
+def session() -> "requests.Session":
+    # one keep-alive session per thread; requests is imported with the first
+    s = getattr(_local, "session", None)
+    if s is None:
+        import requests
+
+        s = requests.Session()
+        s.headers.update(HEADERS)
+        s.hooks["response"].append(_run_hooks)
+        _local.session = s
+    return s
+
+
+def request(url: str, params: dict | None = None, timeout: int = 20, headers: dict | None = None) -> "requests.Response":
+    """GET through the shared scheduler: paced per host, 429/5xx and connection errors retried."""
+    import requests
+
+    return shared().call(
+        url,
+        lambda: session().get(url, params=params, timeout=timeout, headers=headers),
+        retry_on=(requests.ConnectionError, requests.Timeout),
+    )
+
+
+def get(url: str, params: dict | None = None, timeout: int = 20, headers: dict | None = None) -> "requests.Response":
+    resp = request(url, params=params, timeout=timeout, headers=headers)
+    resp.raise_for_status()
+    return resp
+
+
+def fetch_html(url: str, timeout: int = 20) -> str:
+    return get(url, timeout=timeout).text
+
+
+def parse_html(text: str, base_url: str):
+    tree = lxml_html.fromstring(text)
+    # match Selenium's get_attribute("href"), which returns absolute URLs
+    tree.make_links_absolute(base_url, resolve_base_href=True)
+    return tree
+
+
+class HostRateLimiter:
+    """
+    Spaces requests to the same host at least 1/rate seconds apart, shared by
+    every worker thread: a fixed cap (--rate) on top of the shared
+    scheduler's adaptive one. rate=None disables limiting.
+    """
+
+    def __init__(self, rate: float | None = None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def fetch_tree(url: str, limiter: HostRateLimiter | None = None, timeout: int = 20):
+    if limiter is not None:
+        limiter.wait(url)
+    return parse_html(fetch_html(url, timeout), url)
+
+
+def load_tree(url: str, ready_xpath: str, backend: str = "auto", timeout: int = 20, html: str | None = None):
+    """
+    Fetch `url` over HTTP and return its lxml tree, or None when the caller
+    should use the browser instead. `ready_xpath` must match in the raw HTML
+    for the page to count as server-rendered. Pass `html` when the page was
+    already fetched (e.g. through http_cache) to skip the request.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend == "browser":
+        return None
+
+    import requests
+
+    try:
+        tree = parse_html(html if html is not None else fetch_html(url, timeout), url)
+    except requests.RequestException as e:
+        if backend == "http":
+            raise
+        print(f"[warn] http fetch failed, falling back to browser: {e}")
+        return None
+
+    if tree.xpath(ready_xpath):
+        return tree
+    if backend == "http":
+        raise LookupError(f"{ready_xpath!r} not found in {url}; page needs a browser")
+    print(f"[info] {url} needs JS, falling back to browser")
+    return None
+
+
+def inner_text(el) -> str:
+    """Approximate innerText: line breaks at <br> and block elements."""
+    if not len(el) and isinstance(el.tag, str) and el.tag not in _SKIP_TAGS:
+        # a leaf (most table cells): just its own text
+        return _rendered_lines(el.text or "")
+    parts: list[str] = []
+
+    def walk(node):
+        tag = node.tag if isinstance(node.tag, str) else ""
+        if tag in _SKIP_TAGS:
+            return
+        if tag == "br" or tag in _BLOCK_TAGS:
+            parts.append("\n")
+        if tag and node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if tag in _BLOCK_TAGS:
+            parts.append("\n")
+
+    walk(el)
+    return _rendered_lines("".join(parts))
+
+
+def _rendered_lines(text: str) -> str:
+    lines = (_SPACES.sub(" ", ln).strip() for ln in text.split("\n"))
+    return "\n".join(ln for ln in lines if ln)
+
+
+def text(el) -> str:
+    """Rendered text of an element, like WebElement.text."""
+    if el is None:
+        return ""
+    return inner_text(el)
@@ -0,0 +1,512 @@
+# Offline fixture pages for the Webscraper jobs.
+# Rebuilds each target page's markup from the CSVs we already scraped, so the
+# scrapers (and their benchmarks) can run against a local HTTP server with
+# the same selectors as the live sites.
+#
+#   python fixtures.py            # serve all fixture pages until Ctrl+C
+
+import csv
+import html
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# fixture name -> url path on the local server
+PATHS = {
+    "books": "/catalogue/page-1.html",
+    "population": "/wiki/List_of_countries_and_dependencies_by_population",
+    "eol-hw": "/eol/hardware-end-of-life-dates",
+    "eol-sw": "/eol/end-of-life-summary",
+    "troemner": "/c/3944",
+    "troemner-lazy": "/c/3944/lazy",
+}
+
+
+def _read_csv(name: str) -> list[dict]:
+    with open(os.path.join(HERE, name), newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def _esc(s: str) -> str:
+    return html.escape(s or "", quote=True)
+
+
+def _cell(s: str) -> str:
+    # multi-line cell values were rendered from <br>-separated markup
+    return "<br>".join(_esc(ln) for ln in (s or "").split("\n"))
+
+
+def _page(body: str, title: str = "fixture") -> str:
+    return f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{_esc(title)}</title></head><body>{body}</body></html>"
+
+
+def _long_date(iso: str) -> str:
+    try:
+        return datetime.strptime(iso, "%Y-%m-%d").strftime("%B %d, %Y").replace(" 0", " ")
+    except ValueError:
+        return iso
+
+
+def books_page(repeat: int = 1, page: int = 1, pages: int = 1) -> str:
+    cards = []
+    for _ in range(repeat):
+        for b in _read_csv("books.csv"):
+            href = b["Link"].replace("https://books.toscrape.com/", "/")
+            cards.append(
+                "<li><article class='product_pod'>"
+                f"<h3><a href='{_esc(href)}' title='{_esc(b['Title'])}'>{_esc(b['Title'][:20])}...</a></h3>"
+                f"<div class='product_price'><p class='price_color'>{_esc(b['Price'])}</p></div>"
+                f"<p class='star-rating {_esc(b['Rating'])}'></p>"
+                "</article></li>"
+            )
+    pager = f"<ul class='pager'><li class='current'>Page {page} of {pages}</li>"
+    if page < pages:
+        pager += f"<li class='next'><a href='page-{page + 1}.html'>next</a></li>"
+    pager += "</ul>"
+    return _page(f"<ol class='row'>{''.join(cards)}</ol>{pager}", "Books")
+
+
+def book_detail_pages() -> dict[str, str]:
+    pages = {}
+    for i, b in enumerate(_read_csv("books.csv")):
+        body = (
+            "<article class='product_page'>"
+            f"<h1>{_esc(b['Title'])}</h1>"
+            "<div id='product_description' class='sub-header'><h2>Product Description</h2></div>"
+            f"<p>Description of {_esc(b['Title'])}.</p>"
+            "<table class='table table-striped'>"
+            f"<tr><th>UPC</th><td>{i:016x}</td></tr>"
+            "<tr><th>Availability</th><td>In stock (22 available)</td></tr>"
+            "</table></article>"
+        )
+        pages[b["Link"].replace("https://books.toscrape.com", "")] = _page(body, b["Title"])
+    return pages
+
+
+def population_page(repeat: int = 1) -> str:
+    head = "<thead><tr><th>Location</th><th>Population</th><th>% of world</th><th>Date</th><th>Source</th></tr></thead>"
+    rows = []
+    for _ in range(repeat):
+        for r in _read_csv("countries_population.csv"):
+            rows.append(
+                f"<tr><th><a href='/wiki/{_esc(r['Country'])}'>{_esc(r['Country'])}</a></th>"
+                f"<td>{_esc(r['Population'])}</td><td>{_esc(r['World Share'])}</td>"
+                f"<td>{_esc(r['Date'])}</td><td>{_esc(r['Source'])}</td></tr>"
+            )
+    return _page(f"<table class='wikitable sortable'>{head}<tbody>{''.join(rows)}</tbody></table>", "Population")
+
+
+def eol_hardware_page(repeat: int = 1) -> str:
+    rows = []
+    for _ in range(repeat):
+        for r in _read_csv("palo_alto_hardware_eol.csv"):
+            product = "<br>".join(_esc(p) for p in r["productName"].split(" | "))
+            links = "".join(
+                f"<a href='{_esc(u)}'>Details</a> "
+                for u in r["resource"].split(" | ") if u
+            )
+            replacement = "<br>".join(_esc(p) for p in r["Recommended_replacement"].split(" | "))
+            rows.append(
+                f"<tr><td>{product}</td><td>—</td><td>{_esc(_long_date(r['EOL_Date']))}</td>"
+                f"<td>{links}</td><td>—</td><td>{replacement}</td></tr>"
+            )
+    table = (
+        "<table class='table table-striped table-hover'><thead><tr>"
+        "<th>Product</th><th>EOS</th><th>EOL</th><th>Resources</th><th>Notes</th><th>Replacement</th>"
+        f"</tr></thead><tbody>{''.join(rows)}</tbody></table>"
+    )
+    return _page(table, "Hardware End-of-Life Dates")
+
+
+def eol_software_page(repeat: int = 1, headings: str = "cell") -> str:
+    # headings="cell": each product name in a colspan header cell;
+    # "before": in a <p><b> ahead of its table, found through preceding::
+    groups: dict[str, list[dict]] = {}
+    for r in _read_csv("paloalto_software_eol.csv"):
+        groups.setdefault(r["softwareName"], []).append(r)
+
+    tables = []
+    for i in range(repeat):
+        for name, rows in groups.items():
+            body = "".join(
+                f"<tr><td>{_cell(r['version'])}</td><td>{_cell(_long_date(r['releaseDate']))}</td>"
+                f"<td>{_cell(_long_date(r['eolDate']))}</td></tr>"
+                for r in rows
+            )
+            title = name if i == 0 else f"{name} ({i})"
+            head = f"<p><b>{_esc(title)}</b></p>"
+            tables.append(
+                (head if headings == "before" else "")
+                + "<table><tbody>"
+                + (f"<tr><th colspan='3'>{head}</th></tr>" if headings == "cell" else "")
+                + "<tr><td>Version</td><td>Release Date</td><td>End-of-Life Date</td></tr>"
+                f"{body}</tbody></table>"
+            )
+    return _page(f"<div class='oneColumnPlain'>{''.join(tables)}</div>", "End-of-Life Summary")
+
+
+def _troemner_items(repeat: int = 1) -> list[str]:
+    items = []
+    for _ in range(repeat):
+        for r in _read_csv("troemner_oiml_weight_sets.csv"):
+            href = r["productURL"].replace("https://www.troemner.com", "")
+            items.append(
+                f"<li class='product-item' data-code='{_esc(r['model'])}'>"
+                f"<h3 class='title'><a href='{_esc(href)}'>{_esc(r['productName'])}</a></h3>"
+                f"<span class='code'>({_esc(r['model'])})</span>"
+                f"<div class='description product-description'>{_esc(r['description'])}</div>"
+                f"<div class='price'><span class='priceValue'>{_esc(r['cost'])}</span></div>"
+                "</li>"
+            )
+    return items
+
+
+def troemner_page(repeat: int = 1) -> str:
+    items = _troemner_items(repeat)
+    return _page(f"<ul id='resultsList'>{''.join(items)}</ul>", "OIML Calibration Weight Sets")
+
+
+# Appends the next batch from <template id='more'> after a simulated fetch
+# whenever the user scrolls near the bottom, like the live category page.
+_LAZY_JS = """
+const more = Array.from(document.getElementById('more').content.children);
+const list = document.getElementById('resultsList');
+let loading = false;
+window.addEventListener('scroll', () => {
+  if (loading || !more.length) return;
+  if (window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+  loading = true;
+  setTimeout(() => {
+    more.splice(0, BATCH).forEach(li => list.appendChild(li));
+    loading = false;
+  }, DELAY);
+});
+"""
+
+
+def troemner_lazy_page(repeat: int = 1, batch: int = 24, delay_ms: int = 150) -> str:
+    items = _troemner_items(repeat)
+    script = _LAZY_JS.replace("BATCH", str(batch)).replace("DELAY", str(delay_ms))
+    return _page(
+        f"<ul id='resultsList'>{''.join(items[:batch])}</ul>"
+        f"<template id='more'>{''.join(items[batch:])}</template>"
+        f"<script>{script}</script>",
+        "OIML Calibration Weight Sets",
+    )
+
+
+def _pdf(title: str, pages: int = 1, created: str = "20240115") -> bytes:
+    """A minimal uncompressed PDF with an Info dictionary."""
+    objs = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{3 + i} 0 R" for i in range(pages)), pages),
+        *["<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>"] * pages,
+        f"<< /Title ({title}) /Author (Fixture) /CreationDate (D:{created}000000Z) >>",
+    ]
+    out, offsets = b"%PDF-1.4\n", []
+    for n, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R /Info {len(objs)} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def troemner_detail_pages() -> dict:
+    """Product pages behind each tile's productURL: a spec table and a certificate PDF."""
+    pages = {}
+    for r in _read_csv("troemner_oiml_weight_sets.csv"):
+        path = r["productURL"].replace("https://www.troemner.com", "")
+        pdf = f"/medias/{r['model']}-certificate.pdf"
+        cls = r["productName"].split(" CL", 1)[-1].split()[0] if " CL" in r["productName"] else ""
+        body = (
+            f"<h1>{_esc(r['productName'])}</h1>"
+            "<div class='product-classifications'><table><tbody>"
+            f"<tr><td>Item Number</td><td>{_esc(r['model'])}</td></tr>"
+            f"<tr><td>Accuracy Class</td><td>{_esc(cls)}</td></tr>"
+            "<tr><td>Material</td><td>Stainless Steel</td></tr>"
+            "<tr><td>Case</td><td>Wood</td></tr>"
+            "</tbody></table></div>"
+            f"<a href='{pdf}'>Sample certificate (PDF)</a>"
+        )
+        pages[path] = _page(body, r["productName"])
+        pages[pdf] = (_pdf(f"Certificate {r['model']}", 2), "application/pdf")
+    return pages
+
+
+def eol_resource_pages() -> dict:
+    """
+    The hardware table's resource links, by url path: datasheet PDFs and
+    hardware reference pages with a spec list.
+    """
+    pages = {}
+    for r in _read_csv("palo_alto_hardware_eol.csv"):
+        for url in r["resource"].split(" | "):
+            path = urlsplit(url).path
+            if not url or path in pages:
+                continue
+            name = path.rstrip("/").rsplit("/", 1)[-1].removesuffix(".html").removesuffix(".pdf")
+            if path.endswith(".pdf"):
+                pages[path] = (_pdf(f"{name.upper()} Datasheet", 4), "application/pdf")
+                continue
+            body = (
+                f"<h1>{_esc(name)}</h1><dl>"
+                f"<dt>Product</dt><dd>{_esc(name)}</dd>"
+                f"<dt>End-of-Life</dt><dd>{_esc(r['EOL_Date'])}</dd></dl>"
+                f"<a href='/content/dam/{_esc(name)}.pdf'>Datasheet</a>"
+            )
+            pages[path] = _page(body, name)
+    return pages
+
+
+def troemner_results(page_size: int = 24):
+    """
+    Stub of the category's paginated result endpoint: a handler taking the
+    query string and returning one page of products as JSON.
+    """
+    products = [
+        {
+            "code": r["model"],
+            "name": r["productName"],
+            "url": r["productURL"].replace("https://www.troemner.com", ""),
+            "description": r["description"],
+            "price": {"formattedValue": r["cost"]},
+        }
+        for r in _read_csv("troemner_oiml_weight_sets.csv")
+    ]
+    pages = -(-len(products) // page_size)
+
+    def handler(query: dict) -> tuple[bytes, str]:
+        page = int(query.get("page", ["0"])[0])
+        data = {
+            "results": products[page * page_size:(page + 1) * page_size],
+            "pagination": {
+                "currentPage": page,
+                "pageSize": page_size,
+                "numberOfPages": pages,
+                "totalNumberOfResults": len(products),
+            },
+        }
+        return json.dumps(data).encode("utf-8"), "application/json"
+
+    return handler
+
+
+BUILDERS = {
+    "books": books_page,
+    "population": population_page,
+    "eol-hw": eol_hardware_page,
+    "eol-sw": eol_software_page,
+    "troemner": troemner_page,
+    "troemner-lazy": troemner_lazy_page,
+}
+
+
+def build_pages(repeat: int = 1, book_pages: int = 1) -> dict:
+    """
+    url path -> bytes, (bytes, content type) or a handler(query) returning
+    either, for dynamic endpoints.
+    """
+    pages = {PATHS[name]: build(repeat) for name, build in BUILDERS.items()}
+    # the rest of the books catalogue, for crawl mode
+    for n in range(1, book_pages + 1):
+        pages[f"/catalogue/page-{n}.html"] = books_page(repeat, n, book_pages)
+    pages.update(book_detail_pages())
+    pages = {path: body.encode("utf-8") for path, body in pages.items()}
+    pages[PATHS["troemner"] + "/results"] = troemner_results()
+    for path, page in {**troemner_detail_pages(), **eol_resource_pages()}.items():
+        pages[path] = page.encode("utf-8") if isinstance(page, str) else page
+    return pages
+
+
+def _slow_asset(body: bytes, ctype: str, delay: float):
+    def handler(query: dict) -> tuple[bytes, str]:
+        time.sleep(delay)
+        return body, ctype
+    return handler
+
+
+def add_heavy_assets(pages: dict, count: int = 20, delay: float = 0.2, size: int = 50_000) -> dict:
+    """
+    Weigh every HTML page down like the live sites: `count` each of images,
+    stylesheets and fonts plus analytics scripts, served after `delay`
+    seconds. The render-blocking stylesheets and scripts go in <head>.
+    """
+    filler = b"/*" + b"x" * size + b"*/"
+    assets = {}
+    head, body = [], []
+    for i in range(count):
+        assets[f"/assets/style-{i}.css"] = _slow_asset(filler, "text/css", delay)
+        assets[f"/assets/font-{i}.woff2"] = _slow_asset(filler, "font/woff2", delay)
+        assets[f"/assets/img-{i}.png"] = _slow_asset(filler, "image/png", delay)
+        head.append(f"<link rel='stylesheet' href='/assets/style-{i}.css'>"
+                    f"<link rel='preload' as='font' crossorigin href='/assets/font-{i}.woff2'>")
+        body.append(f"<img src='/assets/img-{i}.png' width='10' height='10'>")
+    for i in range(max(1, count // 5)):
+        assets[f"/assets/analytics.js/{i}"] = _slow_asset(b"void 0;", "application/javascript", delay)
+        head.append(f"<script src='/assets/analytics.js/{i}'></script>")
+
+    heavy = {}
+    for path, page in pages.items():
+        # synthesized pages are bytes, recorded ones (bytes, content type)
+        markup, ctype = page if isinstance(page, tuple) else (page, "text/html")
+        if isinstance(markup, bytes) and ctype == "text/html" and b"</head>" in markup:
+            markup = markup.replace(b"</head>", "".join(head).encode() + b"</head>", 1)
+            markup = markup.replace(b"</body>", "".join(body).encode() + b"</body>", 1)
+            page = (markup, ctype) if isinstance(page, tuple) else markup
+        heavy[path] = page
+    return {**heavy, **assets}
+
+
+class Throttle:
+    """
+    A live site's rate limiting, for the fixture server. Requests beyond
+    `rate` per second (a token bucket holding `burst`), or beyond
+    `max_concurrent` at once, get a 429 with Retry-After (none when
+    retry_after is None); the rest are slowed by `congestion` seconds for
+    every request already in flight.
+    """
+
+    def __init__(self, rate: float = 20.0, burst: float = 5.0, max_concurrent: int = 0,
+                 retry_after: float | None = 1.0, congestion: float = 0.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.congestion = congestion
+        self.served = 0
+        self.rejected = 0
+        self._tokens = burst
+        self._filled = time.monotonic()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def admit(self) -> float | None:
+        """The latency to add to an admitted request, or None for a 429."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._filled) * self.rate)
+            self._filled = now
+            if self._tokens < 1 or (self.max_concurrent and self._in_flight >= self.max_concurrent):
+                self.rejected += 1
+                return None
+            self._tokens -= 1
+            self._in_flight += 1
+            self.served += 1
+            return self._in_flight * self.congestion
+
+    def done(self):
+        with self._lock:
+            self._in_flight -= 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    pages: dict = {}
+    delay: float = 0.0
+    throttle: Throttle | None = None
+
+    def do_GET(self):
+        if self.delay:
+            time.sleep(self.delay)  # simulated network latency
+        throttle = self.throttle
+        if throttle is None:
+            self._serve()
+            return
+        extra = throttle.admit()
+        if extra is None:
+            self.send_response(429)
+            if throttle.retry_after is not None:
+                self.send_header("Retry-After", str(int(throttle.retry_after)))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        try:
+            time.sleep(extra)
+            self._serve()
+        finally:
+            throttle.done()
+
+    def _serve(self):
+        url = urlsplit(self.path)
+        body = self.pages.get(url.path)
+        if callable(body):
+            body = body(parse_qs(url.query))
+        if body is None:
+            self.send_error(404)
+            return
+        ctype = "text/html"
+        if isinstance(body, tuple):
+            body, ctype = body
+        self.send_response(200)
+        self.send_header("Content-Type", f"{ctype}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer:
+    """
+    Local HTTP server for fixture pages, running in a background thread.
+
+        with FixtureServer() as srv:
+            BookScraper(srv.url("books"))
+
+    With throttle=Throttle(rate=20) it answers 429s like a rate-limited site.
+    """
+
+    def __init__(
+        self,
+        pages: dict | None = None,
+        repeat: int = 1,
+        port: int = 0,
+        book_pages: int = 1,
+        delay: float = 0.0,
+        heavy_assets: int = 0,
+        throttle: Throttle | None = None,
+    ):
+        pages = pages or build_pages(repeat, book_pages)
+        if heavy_assets:
+            pages = add_heavy_assets(pages, heavy_assets)
+        self.throttle = throttle
+        handler = type("Handler", (_Handler,), {"pages": pages, "delay": delay, "throttle": throttle})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, name: str) -> str:
+        return self.base + PATHS.get(name, name)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    srv = FixtureServer(port=8765)
+    for name in PATHS:
+        print(f"{name:12s} {srv.url(name)}")
+    try:
+        srv.httpd.serve_forever()
+    except KeyboardInterrupt:
+        srv.httpd.server_close()
@@ -0,0 +1,92 @@
+# On-disk HTTP cache for pages that rarely change (the Palo Alto EOL pages).
+#
+# Per URL it keeps the last body plus its ETag, Last-Modified and a SHA-256
+# of the content. fetch() sends a conditional request; a 304, or a 200 whose
+# body hashes the same as last time, comes back with changed=False so the
+# caller can skip parsing and writing altogether. A changed page is only
+# remembered once the caller has saved its output and calls commit(page),
+# so a run that fails halfway is redone in full next time.
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+from fetch import request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(HERE, ".cache", "http")
+
+
+@dataclass
+class CachedPage:
+    url: str
+    text: str
+    changed: bool
+    status: int  # 200, or 304 when served from the cache
+    meta: dict = field(default_factory=dict, repr=False)  # written by commit()
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class HttpCache:
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".json"), os.path.join(self.directory, key + ".body")
+
+    def _load(self, url: str) -> tuple[dict, str | None]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, encoding="utf-8") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return {}, None
+
+    def fetch(self, url: str, timeout: int = 20) -> CachedPage:
+        meta, cached = self._load(url)
+
+        headers = {}
+        if cached is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp = request(url, headers=headers, timeout=timeout)
+        if resp.status_code == 304 and cached is not None:
+            return CachedPage(url, cached, changed=False, status=304)
+        resp.raise_for_status()
+
+        text = resp.text
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        changed = digest != meta.get("sha256")
+
+        meta = {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "sha256": digest,
+            "fetched_at": time.time(),
+        }
+        return CachedPage(url, text, changed=changed, status=resp.status_code, meta=meta)
+
+    def commit(self, page: CachedPage):
+        """Remember `page` as the last seen version; call after its output is saved."""
+        if not page.meta:
+            return
+        meta_path, body_path = self._paths(page.url)
+        if page.changed:
+            _write_atomic(body_path, page.text.encode("utf-8"))
+        _write_atomic(meta_path, json.dumps(page.meta).encode("utf-8"))
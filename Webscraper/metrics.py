@@ -0,0 +1,229 @@
+# Opt-in instrumentation: WebDriver command counters, phase spans and HTTP
+# request counts, exported as JSON log lines and Prometheus text format.
+#
+#   metrics.enable(log="run.jsonl", prom="run.prom")   # or WEBSCRAPER_METRICS=1
+#   with metrics.span("troemner.scroll"):
+#       ...
+#
+# Disabled (the default) every hook is a single flag check: span() hands
+# back a shared no-op context manager and drivers are not wrapped at all.
+# Enabled, each new driver's execute() is wrapped to count and time every
+# command by name, each span end is logged as one JSON object per line, and
+# at exit a summary line is logged and the Prometheus text file written.
+#
+# Environment: WEBSCRAPER_METRICS=1 enables, WEBSCRAPER_METRICS_LOG and
+# WEBSCRAPER_METRICS_PROM give the JSON log and Prometheus file paths.
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from urllib.parse import urlsplit
+
+_enabled = False
+_log = None
+_prom_path = None
+_lock = threading.Lock()
+
+# name -> [count, total seconds, max seconds]
+_commands: dict[str, list] = {}
+_spans: dict[str, list] = {}
+# (host, status) -> [count, total seconds, max seconds]
+_http: dict[tuple[str, int], list] = {}
+
+_NOOP = nullcontext()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _add(table: dict, key, seconds: float):
+    with _lock:
+        entry = table.get(key)
+        if entry is None:
+            table[key] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+
+def _emit(record: dict):
+    if _log is None:
+        return
+    line = json.dumps({"ts": round(time.time(), 3), "pid": os.getpid(), **record}, default=str)
+    with _lock:
+        _log.write(line + "\n")
+        _log.flush()
+
+
+def _on_response(resp):
+    _add(_http, (urlsplit(resp.url).hostname or "", resp.status_code), resp.elapsed.total_seconds())
+
+
+def enable(log: str | None = "-", prom: str | None = None):
+    """
+    Turn instrumentation on for this process. `log` is a file path for the
+    JSON lines ("-" for stderr, None for none); `prom` a path the Prometheus
+    text format is written to at exit.
+    """
+    global _enabled, _log, _prom_path
+    if _enabled:
+        return
+    import fetch
+
+    _log = sys.stderr if log == "-" else open(log, "a", encoding="utf-8") if log else None
+    _prom_path = prom
+    _enabled = True
+    fetch.RESPONSE_HOOKS.append(_on_response)
+    atexit.register(finish)
+
+
+def reset():
+    with _lock:
+        _commands.clear()
+        _spans.clear()
+        _http.clear()
+
+
+@contextmanager
+def _span(name: str, attrs: dict):
+    t0 = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - t0
+        _add(_spans, name, seconds)
+        record = {"event": "span", "name": name, "seconds": round(seconds, 6), **attrs}
+        if error:
+            record["error"] = error
+        _emit(record)
+
+
+def span(name: str, **attrs):
+    """Time a block as the named phase; a no-op unless enabled."""
+    if not _enabled:
+        return _NOOP
+    return _span(name, attrs)
+
+
+def timed(name: str):
+    """Decorator form of span()."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def instrument(driver):
+    """Wrap a driver's execute() to count and time every WebDriver command (when enabled)."""
+    if not _enabled or getattr(driver, "_ws_instrumented", False):
+        return driver
+    execute = driver.execute
+
+    def counted(command, params=None):
+        t0 = time.perf_counter()
+        try:
+            return execute(command, params)
+        finally:
+            _add(_commands, command, time.perf_counter() - t0)
+
+    driver.execute = counted
+    driver._ws_instrumented = True
+    return driver
+
+
+def _rows(table: dict) -> dict:
+    return {
+        key: {"count": c, "seconds": round(total, 6), "max_seconds": round(mx, 6)}
+        for key, (c, total, mx) in sorted(table.items(), key=lambda kv: str(kv[0]))
+    }
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {
+            "webdriver_commands": _rows(_commands),
+            "spans": _rows(_spans),
+            "http": {f"{host} {status}": v for (host, status), v in _rows(_http).items()},
+        }
+
+
+def webdriver_calls() -> int:
+    with _lock:
+        return sum(c for c, _, _ in _commands.values())
+
+
+def http_requests() -> int:
+    with _lock:
+        return sum(c for c, _, _ in _http.values())
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text() -> str:
+    lines = []
+
+    def family(metric: str, help_text: str, table: dict, names: tuple, seconds: bool):
+        # every family is a counter: either the count or the summed seconds
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for key, (count, total, _) in sorted(table.items(), key=lambda kv: str(kv[0])):
+            values = key if isinstance(key, tuple) else (key,)
+            label = ",".join(f'{n}="{_label(v)}"' for n, v in zip(names, values))
+            lines.append(f"{metric}{{{label}}} {total if seconds else count}")
+
+    with _lock:
+        family("webscraper_webdriver_commands_total", "WebDriver commands sent.", _commands, ("command",), False)
+        family("webscraper_webdriver_command_seconds_total", "Time in WebDriver commands.", _commands,
+               ("command",), True)
+        family("webscraper_span_total", "Completed phase spans.", _spans, ("span",), False)
+        family("webscraper_span_seconds_total", "Time spent in each phase.", _spans, ("span",), True)
+        family("webscraper_http_requests_total", "HTTP responses by host and status.", _http, ("host", "status"), False)
+        family("webscraper_http_seconds_total", "HTTP response time by host and status.", _http,
+               ("host", "status"), True)
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+def finish():
+    """Log the summary, write the Prometheus file and stop; runs at exit if not called."""
+    global _enabled, _log
+    if not _enabled:
+        return
+    import fetch
+
+    atexit.unregister(finish)
+    fetch.RESPONSE_HOOKS.remove(_on_response)
+    _emit({"event": "summary", **snapshot()})
+    if _prom_path:
+        write_prometheus(_prom_path)
+    if _log not in (None, sys.stderr):
+        _log.close()
+    _enabled, _log = False, None
+
+
+if os.environ.get("WEBSCRAPER_METRICS", "").lower() in ("1", "true", "yes"):
+    enable(os.environ.get("WEBSCRAPER_METRICS_LOG", "-"), os.environ.get("WEBSCRAPER_METRICS_PROM"))
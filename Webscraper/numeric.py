@@ -0,0 +1,163 @@
+# Typed post-processing for numeric columns.
+#
+# Scrapers keep the page text ("1,417,492,000", "17.3%", "£51.77"); this
+# stage turns the columns named in a spec into numbers, a batch at a time:
+#
+#   POPULATION_TYPES = {"Population": Typed("int"), "World Share": Typed("float")}
+#   with open_typed_sink("countries.parquet", FIELDS, POPULATION_TYPES) as sink: ...
+#
+# ints are int64 (a decimal rounds half to even), floats float64
+# (percentages stay in percent points), and prices Decimal with the currency
+# code moved into a column of its own. Values that are already numbers are
+# parsed from their text like any other cell.
+# Footnote markers like "[4]" and thousands separators are dropped, then the
+# one number left in the cell is taken, so currency symbols and units don't
+# matter; a cell with no number, or more than one ("1,234 (2023 est.)"),
+# becomes None. Parsing uses vectorized pandas string ops when pandas is
+# installed, the same regexes otherwise.
+
+import re
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from sinks import open_sink
+
+CURRENCIES = {"£": "GBP", "$": "USD", "€": "EUR", "¥": "JPY"}
+
+# footnotes and thousands separators; what's left must hold exactly one number
+_JUNK = r"\[[^\]]*\]|(?<=\d),(?=\d{3}\b)"
+_JUNK_RE = re.compile(_JUNK)
+_NUMBER = r"-?\d+(?:\.\d+)?"
+_NUMBER_RE = re.compile(_NUMBER)
+_CURRENCY = r"([£$€¥]|\b[A-Z]{3}\b)"
+_CURRENCY_RE = re.compile(_CURRENCY)
+
+# column kind -> schema type name (see sinks.ParquetSink)
+SCHEMA_TYPES = {"int": "int64", "float": "float64", "price": "decimal"}
+
+
+@dataclass(frozen=True)
+class Typed:
+    kind: str  # "int", "float" or "price"
+    currency: str | None = None  # price only: name of the currency column to add
+
+
+def _text(v) -> str | None:
+    # numbers already parsed (e.g. an int Rank) go through the same rules
+    return None if v is None else v if isinstance(v, str) else str(v)
+
+
+def _one_number(v: str | None) -> str:
+    if v is None:
+        return ""
+    found = _NUMBER_RE.findall(_JUNK_RE.sub("", v))
+    return found[0] if len(found) == 1 else ""
+
+
+def _decimal(s):
+    try:
+        return Decimal(s) if s else None
+    except InvalidOperation:
+        return None
+
+
+def _int(s: str) -> int:
+    # "17.5" in an int column rounds half to even, as pandas' round() does
+    return int(Decimal(s).to_integral_value())
+
+
+def _number(s, cast):
+    try:
+        return cast(s) if s else None
+    except (ValueError, InvalidOperation):
+        return None
+
+
+@lru_cache(maxsize=None)
+def _pandas():
+    # imported on the first typed column, not with the scrapers
+    try:
+        import pandas as pd
+    except ImportError:
+        return None
+    return pd
+
+
+def parse_column(values: list, kind: str) -> list:
+    """Numbers (or None) for a column of strings (or numbers)."""
+    pd = _pandas()
+    values = [_text(v) for v in values]
+    if pd is None:
+        cleaned = [_one_number(v) for v in values]
+        if kind == "price":
+            return [_decimal(s) for s in cleaned]
+        cast = _int if kind == "int" else float
+        return [_number(s, cast) for s in cleaned]
+
+    s = pd.Series(values, dtype="string").str.replace(_JUNK, "", regex=True)
+    s = s.str.extract(f"({_NUMBER})", expand=False).where(s.str.count(_NUMBER) == 1, "")
+    if kind == "price":
+        return [_decimal(v) if isinstance(v, str) else None for v in s.tolist()]
+    num = pd.to_numeric(s.replace("", pd.NA), errors="coerce")
+    num = num.round().astype("Int64") if kind == "int" else num.astype("Float64")
+    return num.astype(object).where(num.notna(), None).tolist()
+
+
+def parse_currency(values: list) -> list:
+    """ISO code for the first currency symbol/code in each string, or None."""
+    pd = _pandas()
+    if pd is None:
+        found = [_CURRENCY_RE.search(v) if isinstance(v, str) else None for v in values]
+        codes = [m.group(1) if m else None for m in found]
+    else:
+        codes = pd.Series(values, dtype="string").str.extract(_CURRENCY, expand=False).tolist()
+        codes = [c if isinstance(c, str) else None for c in codes]
+    return [CURRENCIES.get(c, c) for c in codes]
+
+
+def type_columns(columns: dict[str, list], spec: dict[str, Typed]) -> dict[str, list]:
+    """`columns` with the ones in `spec` parsed (and currency columns filled in)."""
+    out = dict(columns)
+    n = len(next(iter(columns.values()), []))
+    for name, t in spec.items():
+        raw = columns.get(name) or [None] * n
+        out[name] = parse_column(raw, t.kind)
+        if t.kind == "price" and t.currency:
+            out[t.currency] = parse_currency(raw)
+    return out
+
+
+def type_rows(rows: list[dict], spec: dict[str, Typed]) -> list[dict]:
+    """Copies of `rows` with the columns in `spec` parsed."""
+    names = list(dict.fromkeys(k for r in rows for k in r))
+    names += [t.currency for t in spec.values() if t.kind == "price" and t.currency and t.currency not in names]
+    typed = type_columns({k: [r.get(k) for r in rows] for k in names}, spec)
+    return [dict(zip(typed, values)) for values in zip(*typed.values())]
+
+
+def typed_fields(fieldnames: list[str], spec: dict[str, Typed]) -> list[str]:
+    """`fieldnames` with each price column's currency column right after it."""
+    out = []
+    for f in fieldnames:
+        out.append(f)
+        t = spec.get(f)
+        if t and t.kind == "price" and t.currency:
+            out.append(t.currency)
+    return out
+
+
+def schema(fieldnames: list[str], spec: dict[str, Typed]) -> dict[str, str]:
+    """The typed schema, as {column: "int64" | "float64" | "decimal" | "string"}."""
+    return {f: SCHEMA_TYPES[spec[f].kind] if f in spec else "string" for f in typed_fields(fieldnames, spec)}
+
+
+def open_typed_sink(path: str, fieldnames: list[str], spec: dict[str, Typed], **kwargs):
+    """open_sink() that parses each row group with `spec` before writing it."""
+    return open_sink(
+        path,
+        typed_fields(fieldnames, spec),
+        schema=schema(fieldnames, spec),
+        transform=lambda columns: type_columns(columns, spec),
+        **kwargs,
+    )
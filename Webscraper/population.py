@@ -1,70 +1,87 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
-
-class PopulationScraper:
-    def __init__(self, url):
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--window-size=1920,1080")
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
-        self.url = url
-        self.master_list = []
+from dataclasses import dataclass, field
 
-    def scrape_table(self):
-        self.driver.get(self.url)
+from columns import interned
+from extract import Field, RowSpec
+from metrics import timed
+from numeric import Typed
+from sitespec import SiteScraper, SiteSpec
 
-        # Wait until the first table appears
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, '//table[contains(@class,"wikitable")][1]'))
-        )
+URL = "https://en.wikipedia.org/wiki/List_of_countries_and_dependencies_by_population"
 
-        # Locate all rows in the first wikitable
-        rows = self.driver.find_elements(
-            By.XPATH, '//table[contains(@class,"wikitable")][1]//tbody/tr'
-        )
+TABLE_XPATH = '//table[contains(@class,"wikitable")][1]'
+ROW_XPATH = TABLE_XPATH + '//tbody/tr'
 
-        for i, row in enumerate(rows, start=1):
-            cols = row.find_elements(By.XPATH, './/th | .//td')
+ROW_SPEC = RowSpec(rows=ROW_XPATH, fields={"cols": Field('.//th | .//td', many=True)})
 
-            # Skip header/empty rows
-            if len(cols) < 5:
-                continue
+FIELDS = ["Rank", "Country", "Population", "World Share", "Date", "Source"]
 
-            country = cols[0].text.strip()
-            population = cols[1].text.strip()
-            world_share = cols[2].text.strip()
-            date = cols[3].text.strip()
-            source = cols[4].text.strip()
+# Column types for typed output; World Share stays in percent points
+TYPES = {"Rank": Typed("int"), "Population": Typed("int"), "World Share": Typed("float")}
 
-            self.master_list.append({
-                "Rank": len(self.master_list) + 1,  # Auto-generated rank
-                "Country": country,
-                "Population": population,
-                "World Share": world_share,
-                "Date": date,
-                "Source": source
-            })
 
-    def save_to_csv(self, filename="countries_population.csv"):
-        df = pd.DataFrame(self.master_list)
-        df.to_csv(filename, index=False, encoding="utf-8")
-        print(df.head())
+@dataclass(slots=True, frozen=True)
+class CountryRow:
+    Rank: int
+    Country: str
+    Population: str
+    World_Share: str = field(metadata={"column": "World Share"})
+    Date: str = ""
+    Source: str = ""
 
-    def close(self):
-        self.driver.quit()
 
+def _record(row):
+    cols = [c.strip() for c in row["cols"]]
+    # Skip header/empty rows
+    if len(cols) < 5:
+        return None
+    country, population, world_share, date, source = cols[:5]
+    # dates and sources repeat across most rows
+    return country, population, world_share, interned(date), interned(source)
 
-if __name__ == "__main__":
-    url = "https://en.wikipedia.org/wiki/List_of_countries_and_dependencies_by_population"
+
+def _ranked(rows):
+    # Auto-generated rank
+    return [CountryRow(i, *row) for i, row in enumerate(rows, 1)]
+
+
+# Wikipedia tables are server-rendered, so a plain GET usually suffices
+SITE = SiteSpec(
+    name="population",
+    url=URL,
+    rows=ROW_SPEC,
+    fieldnames=FIELDS,
+    record=_record,
+    finish=_ranked,
+    types=TYPES,
+    output="countries_population.csv",
+)
+
+
+class PopulationScraper(SiteScraper):
+    def __init__(self, url=URL, pool=None, backend="auto"):
+        super().__init__(SITE, url, pool, backend)
+        self.master_list = []
+
+    @timed("population.scrape_table")
+    def scrape_table(self):
+        # Every row of the first wikitable in one pass
+        self.master_list = self.scrape()
+
+    @timed("population.save")
+    def save_to_csv(self, filename="countries_population.csv", typed=False):
+        self.save(filename, typed)
+
+
+def run(url=URL, path="countries_population.csv", typed=False):
+    """Scrape into `path`; returns the number of rows."""
     scraper = PopulationScraper(url)
-    scraper.scrape_table()
-    scraper.save_to_csv()
-    scraper.close()
+    try:
+        scraper.scrape_table()
+        scraper.save_to_csv(path, typed=typed)
+    finally:
+        scraper.close()
+    return len(scraper.master_list)
+
+
+if __name__ == "__main__":
+    run()
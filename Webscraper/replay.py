@@ -0,0 +1,226 @@
+# Record/replay of the live target pages, for offline runs and benchmarks.
+#
+#   python replay.py record [books population eol-hw eol-sw troemner] [--crawl]
+#   python replay.py serve                  # recorded pages on :8765
+#
+# Recording runs each scraper over plain HTTP against the live site and
+# captures every response it gets (the catalogue and detail pages with
+# --crawl, the Troemner result endpoint pages, ...) into
+# recordings/<name>.json.gz. ReplayServer serves those responses by path and
+# query string, and falls back to the synthesized pages from fixtures.py for
+# jobs that have no recording yet.
+
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import fetch
+from fixtures import PATHS, FixtureServer, build_pages
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RECORDINGS = os.path.join(HERE, "recordings")
+
+
+def _key(url: str) -> tuple[str, str]:
+    parts = urlsplit(url)
+    return parts.path or "/", urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+
+class Recorder:
+    """Collects every 200 response seen by fetch.session() while active."""
+
+    def __init__(self):
+        self.responses: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, resp):
+        if resp.status_code != 200:
+            return
+        entry = {
+            "type": resp.headers.get("Content-Type", "text/html").split(";")[0],
+            "body": resp.content.decode(resp.encoding or "utf-8", errors="replace"),
+        }
+        with self._lock:
+            # after a redirect, the requested URL serves the final page too
+            for url in {resp.url, *(r.url for r in resp.history)}:
+                path, query = _key(url)
+                self.responses[f"{path}?{query}"] = entry
+
+    def __enter__(self):
+        fetch.RESPONSE_HOOKS.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        fetch.RESPONSE_HOOKS.remove(self)
+
+
+def _record_books(url, out_dir, crawl):
+    from Books import BookScraper
+
+    scraper = BookScraper(url, backend="http")
+    if crawl:
+        scraper.crawl_to_csv(os.path.join(out_dir, "books.csv"), details=True)
+    else:
+        scraper.open_page()
+
+
+def _record_population(url, out_dir, crawl):
+    from population import PopulationScraper
+
+    PopulationScraper(url, backend="http").scrape_table()
+
+
+def _record_eol_hw(url, out_dir, crawl):
+    from EOLhardware import scrape
+
+    scrape(url=url, backend="http", out_csv=os.path.join(out_dir, "hw.csv"), store=None)
+
+
+def _record_eol_sw(url, out_dir, crawl):
+    from EOLsoftwares import PaloAltoSoftwareScraper
+
+    PaloAltoSoftwareScraper(url=url, backend="http").open_page()
+
+
+def _record_troemner(url, out_dir, crawl):
+    from Task2 import TroemnerOIMLScraper
+
+    fetch.get(url)  # the category page itself, for the browser backend
+    TroemnerOIMLScraper(url=url).fetch_listing()
+
+
+def _live_urls() -> dict[str, str]:
+    import Books
+    import EOLhardware
+    import EOLsoftwares
+    import population
+    import Task2
+
+    return {
+        "books": Books.URL,
+        "population": population.URL,
+        "eol-hw": EOLhardware.TARGET_URL,
+        "eol-sw": EOLsoftwares.URL,
+        "troemner": Task2.CATEGORY_URL,
+    }
+
+
+TARGETS = {
+    "books": _record_books,
+    "population": _record_population,
+    "eol-hw": _record_eol_hw,
+    "eol-sw": _record_eol_sw,
+    "troemner": _record_troemner,
+}
+
+
+def recording_path(name: str, directory: str = RECORDINGS) -> str:
+    return os.path.join(directory, f"{name}.json.gz")
+
+
+def record(name: str, url: str | None = None, crawl: bool = False, directory: str = RECORDINGS) -> int:
+    """Record one job's responses; returns how many were captured."""
+    url = url or _live_urls()[name]
+    with Recorder() as rec, tempfile.TemporaryDirectory() as out_dir:
+        TARGETS[name](url, out_dir, crawl)
+
+    os.makedirs(directory, exist_ok=True)
+    path, query = _key(url)
+    data = {"name": name, "start": f"{path}?{query}" if query else path,
+            "recorded_at": time.time(), "responses": rec.responses}
+    with gzip.open(recording_path(name, directory), "wt", encoding="utf-8") as f:
+        json.dump(data, f)
+    return len(rec.responses)
+
+
+def load_recording(name: str, directory: str = RECORDINGS) -> dict | None:
+    try:
+        with gzip.open(recording_path(name, directory), "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def replay_pages(recording: dict) -> dict:
+    """url path -> page body, or a handler(query) for paths recorded with several queries."""
+    by_path: dict[str, dict[str, tuple[bytes, str]]] = {}
+    for key, entry in recording["responses"].items():
+        path, _, query = key.partition("?")
+        by_path.setdefault(path, {})[query] = (entry["body"].encode("utf-8"), entry["type"])
+
+    def handler(variants):
+        def serve(query: dict):
+            flat = urlencode(sorted((k, v) for k, vs in query.items() for v in vs))
+            return variants.get(flat) or variants.get("")
+        return serve
+
+    return {
+        path: next(iter(variants.values())) if len(variants) == 1 else handler(variants)
+        for path, variants in by_path.items()
+    }
+
+
+class ReplayServer(FixtureServer):
+    """
+    FixtureServer serving recorded pages for every job that has a recording
+    and synthesized fixture pages for the rest. url(name) points at the page
+    the job starts from either way.
+    """
+
+    def __init__(self, names=tuple(TARGETS), directory: str = RECORDINGS, **kwargs):
+        pages = build_pages(kwargs.pop("repeat", 1), kwargs.pop("book_pages", 1))
+        self.paths = dict(PATHS)
+        self.recorded = []
+        for name in names:
+            recording = load_recording(name, directory)
+            if recording is None:
+                continue
+            pages.update(replay_pages(recording))
+            self.paths[name] = recording["start"]
+            self.recorded.append(name)
+        super().__init__(pages=pages, **kwargs)
+
+    def url(self, name: str) -> str:
+        return self.base + self.paths.get(name, name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record live pages or replay them locally")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("record", help="capture the live pages each job fetches")
+    p.add_argument("jobs", nargs="*", help=f"any of {', '.join(TARGETS)} (default: all)")
+    p.add_argument("--crawl", action="store_true", help="books: every catalogue and detail page")
+    p = sub.add_parser("serve", help="serve recordings (and fixtures) on a local port")
+    p.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        unknown = set(args.jobs) - set(TARGETS)
+        if unknown:
+            parser.error(f"unknown jobs: {', '.join(sorted(unknown))}")
+        for name in args.jobs or TARGETS:
+            try:
+                n = record(name, crawl=args.crawl)
+            except Exception as e:
+                print(f"[warn] {name}: recording failed: {e}")
+            else:
+                print(f"{name:12s} {n} responses -> {recording_path(name)}")
+        return
+
+    srv = ReplayServer(port=args.port)
+    for name in PATHS:
+        source = "recorded" if name in srv.recorded else "fixture"
+        print(f"{name:14s} {source:9s} {srv.url(name)}")
+    try:
+        srv.httpd.serve_forever()
+    except KeyboardInterrupt:
+        srv.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
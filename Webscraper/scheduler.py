@@ -0,0 +1,376 @@
+# Adaptive per-host request scheduling, shared by every fetch path: HTTP
+# (fetch.request/get, http_cache) and Chrome (driver_pool.goto, cdp.Tab.goto).
+#
+#   resp = shared().call(url, lambda: session().get(url), retry_on=(ConnectionError,))
+#
+# Per host it keeps
+#   - a concurrency limit, AIMD: +1/limit for every good response, halved
+#     (from what was in flight) on a 503, another 5xx or a connection error,
+#     and cut by a tenth when latency climbs well past the host's best.
+#   - a token bucket, off until the host first sends a 429/503 (or max_rate
+#     is set). Each one sets the rate to RATE_BETA of what the host served
+#     in the second before; while the bucket is what holds requests back,
+#     clean responses win that back within a second, then probe past it:
+#     RATE_STEP requests/s over at first, the margin doubling every second
+#     the host keeps up. A 429 is about rate, so it leaves concurrency be.
+#   - Retry-After: nothing more goes to the host until it has passed.
+# Responses to requests sent before a cut don't cut again, so a burst of
+# 429s from requests that were all in flight together counts once.
+# call() retries 429/5xx responses and `retry_on` errors up to `retries`
+# times, after Retry-After when the host sent one (plus a little jitter),
+# else after full-jitter exponential backoff: uniform(0, backoff * 2**n).
+#
+# A host that never throttles or slows down is never held back: the limits
+# start wide open and each request costs one lock round.
+#
+#   python scheduler.py URL [URL ...] [--workers 16]   # fetch and show the per-host state
+
+import argparse
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+# the host asking us to slow down: cuts the rate as well as the concurrency
+THROTTLE_STATUSES = {429, 503}
+# worth another try
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+BETA = 0.5              # multiplicative decrease of concurrency
+RATE_BETA = 0.7         # and of the rate, on throttling
+LATENCY_BETA = 0.9      # the gentler one when latency climbs
+LATENCY_FACTOR = 3.0    # smoothed latency this many times the best seen...
+LATENCY_SLACK = 0.5     # ...and this many seconds above it is congestion
+RATE_STEP = 1.0         # requests/s gained per second of clean responses
+MIN_RATE = 0.2
+MIN_WINDOW = 0.25       # shortest span a served rate is measured over
+POLL = 0.05             # async waiters re-check a full host this often
+
+
+@dataclass
+class Outcome:
+    """A browser navigation's result for call(): its HTTP status, when known."""
+    status_code: int | None = None
+    headers: dict = field(default_factory=dict)
+
+
+def retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or an HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    from email.utils import parsedate_to_datetime
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+@dataclass
+class HostState:
+    name: str
+    limit: float                    # concurrent requests allowed
+    rate: float | None = None       # requests/s, once the token bucket is on
+    tokens: float = 1.0
+    filled: float = 0.0             # when tokens was last topped up
+    in_flight: int = 0
+    blocked_until: float = 0.0      # Retry-After
+    best: float | None = None       # lowest latency seen
+    srtt: float | None = None       # smoothed latency
+    ceiling: float = 0.0            # requests/s served before the last 429/503
+    cut_at: float = -1e9            # last decrease
+    starved_at: float = -1e9        # last time a request waited for a token
+    first_at: float | None = None   # the first request
+    served: deque = field(default_factory=deque)  # good responses in the last second
+    requests: int = 0
+    throttled: int = 0
+    retried: int = 0
+
+
+class Scheduler:
+    """
+    Per-host AIMD concurrency, token buckets and Retry-After, with retries.
+    `max_rate` caps every host's requests/s from the start; adaptive=False
+    keeps the limits wide open whatever the host says (retries still run).
+    """
+
+    def __init__(self, max_concurrency: int = 32, max_rate: float | None = None, retries: int = 4,
+                 backoff: float = 0.5, max_backoff: float = 30.0, max_retry_after: float = 120.0,
+                 adaptive: bool = True):
+        self.max_concurrency = max_concurrency
+        self.max_rate = max_rate
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.adaptive = adaptive
+        self._hosts: dict[str, HostState] = {}
+        self._cond = threading.Condition()
+
+    def host(self, url: str) -> HostState:
+        name = urlsplit(url).netloc
+        host = self._hosts.get(name)
+        if host is None:
+            host = self._hosts[name] = HostState(name, float(self.max_concurrency), self.max_rate)
+        return host
+
+    # --- slots ----------------------------------------------------------------
+
+    def _take(self, host: HostState, now: float) -> float | None:
+        """Take a slot on `host` and return 0, or the seconds to wait first (None: until a release)."""
+        if host.blocked_until > now:
+            return host.blocked_until - now
+        if host.in_flight >= max(1, int(host.limit)):
+            return None
+        if host.rate is not None:
+            host.tokens = min(1.0, host.tokens + (now - host.filled) * host.rate)
+            host.filled = now
+            if host.tokens < 1.0:
+                host.starved_at = now
+                return (1.0 - host.tokens) / host.rate
+            host.tokens -= 1.0
+        host.in_flight += 1
+        host.requests += 1
+        if host.first_at is None:
+            host.first_at = now
+        return 0
+
+    def acquire(self, url: str) -> HostState:
+        """Block until the host of `url` may take another request; pair with release()."""
+        with self._cond:
+            host = self.host(url)
+            while True:
+                wait = self._take(host, time.monotonic())
+                if wait == 0:
+                    return host
+                self._cond.wait(wait)
+
+    async def acquire_async(self, url: str) -> HostState:
+        import asyncio
+
+        while True:
+            with self._cond:
+                host = self.host(url)
+                wait = self._take(host, time.monotonic())
+            if wait == 0:
+                return host
+            await asyncio.sleep(POLL if wait is None else wait)
+
+    def release(self, host: HostState, status: int | None = None, latency: float | None = None,
+                wait: float | None = None, error: bool = False):
+        """
+        Give the slot back with what came of it: the HTTP status (None when
+        unknown), the request's latency, a Retry-After in seconds, or
+        error=True for a connection failure or timeout.
+        """
+        with self._cond:
+            now = time.monotonic()
+            # when the request went out, for _decrease
+            sent = now - latency if latency is not None else None
+            host.in_flight -= 1
+            if wait and self.adaptive:
+                host.blocked_until = max(host.blocked_until, now + min(wait, self.max_retry_after))
+            if latency is not None:
+                host.srtt = latency if host.srtt is None else 0.875 * host.srtt + 0.125 * latency
+            if status in THROTTLE_STATUSES:
+                host.throttled += 1
+            if self.adaptive:
+                if status == 429:
+                    self._decrease(host, now, sent, rate=True, limit=False)
+                elif status in THROTTLE_STATUSES:
+                    self._decrease(host, now, sent, rate=True)
+                elif error or (status is not None and status >= 500):
+                    self._decrease(host, now, sent)
+                elif status is not None and latency is not None:
+                    self._observe(host, latency, now, sent)
+            self._cond.notify_all()
+
+    def _decrease(self, host: HostState, now: float, sent: float | None, beta: float = BETA,
+                  rate: bool = False, limit: bool = True):
+        # a request sent before the last cut reports on the old limits
+        if (sent if sent is not None else now) <= host.cut_at:
+            return
+        host.cut_at = now
+        if limit:
+            # from what was actually in flight, not a limit never reached
+            host.limit = max(1.0, min(host.limit, host.in_flight + 1) * beta)
+        if rate:
+            while host.served and host.served[0] < now - 1.0:
+                host.served.popleft()
+            # per second; a host throttled within its first second is
+            # measured over what time there was (at least MIN_WINDOW)
+            window = min(1.0, max(MIN_WINDOW, now - host.first_at))
+            host.ceiling = len(host.served) / window
+            if host.rate is not None:
+                host.ceiling = min(host.ceiling, host.rate)
+            host.rate = max(MIN_RATE, host.ceiling * RATE_BETA)
+            if window < 1.0:
+                # too short a sample to hold at: probe up from the new rate at once
+                host.ceiling = 0.0
+            host.tokens = 0.0
+            host.filled = now
+
+    def _observe(self, host: HostState, latency: float, now: float, sent: float):
+        host.served.append(now)
+        while host.served[0] < now - 1.0:
+            host.served.popleft()
+        host.best = latency if host.best is None else min(host.best, latency)
+        if host.srtt > host.best * LATENCY_FACTOR and host.srtt - host.best > LATENCY_SLACK:
+            self._decrease(host, now, sent, LATENCY_BETA)
+            return
+        host.limit = min(float(self.max_concurrency), host.limit + 1.0 / host.limit)
+        # the rate only grows while it's what holds requests back
+        if host.rate is not None and now - host.starved_at < 1.0:
+            # per second: the gap back to the served rate, then past it by
+            # RATE_STEP, doubling the margin every second the host keeps up
+            gain = max(RATE_STEP, abs(host.ceiling - host.rate))
+            host.rate += gain / host.rate
+            if self.max_rate is not None:
+                host.rate = min(host.rate, self.max_rate)
+
+    # --- retries --------------------------------------------------------------
+
+    def backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _settle(self, host: HostState, attempt: int, t0: float, resp=None, error: bool = False) -> float | None:
+        """Release the slot for one attempt; the seconds until the next, or None for no retry."""
+        latency = time.monotonic() - t0
+        if error:
+            self.release(host, error=True)
+            status, wait = None, None
+        else:
+            status = resp.status_code
+            wait = retry_after(resp.headers.get("Retry-After")) if status in RETRY_STATUSES else None
+            self.release(host, status, latency, wait)
+            if status not in RETRY_STATUSES:
+                return None
+        if attempt >= self.retries or (wait or 0) > self.max_retry_after:
+            return None
+        with self._cond:
+            host.retried += 1
+        if wait is not None:
+            return wait + random.uniform(0, min(1.0, 0.1 * wait + 0.1))
+        return self.backoff_delay(attempt)
+
+    def call(self, url: str, send, retry_on: tuple = ()):
+        """
+        send() under a slot on url's host, retried on 429/5xx responses and
+        `retry_on` exceptions. Returns the last response, whatever its
+        status; raises the last error once retries run out.
+        """
+        attempt = 0
+        while True:
+            host = self.acquire(url)
+            t0 = time.monotonic()
+            try:
+                resp = send()
+            except retry_on as e:
+                delay = self._settle(host, attempt, t0, error=True)
+                if delay is None:
+                    raise
+                reason = type(e).__name__
+            except BaseException:
+                self.release(host)
+                raise
+            else:
+                delay = self._settle(host, attempt, t0, resp)
+                if delay is None:
+                    return resp
+                reason = f"HTTP {resp.status_code}"
+            attempt += 1
+            print(f"[info] {reason} from {host.name}, retry {attempt}/{self.retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    async def call_async(self, url: str, send, retry_on: tuple = ()):
+        """call() for a coroutine function `send`."""
+        import asyncio
+
+        attempt = 0
+        while True:
+            host = await self.acquire_async(url)
+            t0 = time.monotonic()
+            try:
+                resp = await send()
+            except retry_on as e:
+                delay = self._settle(host, attempt, t0, error=True)
+                if delay is None:
+                    raise
+                reason = type(e).__name__
+            except BaseException:
+                self.release(host)
+                raise
+            else:
+                delay = self._settle(host, attempt, t0, resp)
+                if delay is None:
+                    return resp
+                reason = f"HTTP {resp.status_code}"
+            attempt += 1
+            print(f"[info] {reason} from {host.name}, retry {attempt}/{self.retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict[str, dict]:
+        """host -> its current limits and counters."""
+        with self._cond:
+            return {
+                name: {
+                    "requests": h.requests,
+                    "throttled": h.throttled,
+                    "retried": h.retried,
+                    "concurrency": round(h.limit, 2),
+                    "rate": None if h.rate is None else round(h.rate, 2),
+                    "srtt": None if h.srtt is None else round(h.srtt, 4),
+                }
+                for name, h in self._hosts.items()
+            }
+
+
+_shared: Scheduler | None = None
+_shared_lock = threading.Lock()
+
+
+def shared() -> Scheduler:
+    """The process-wide scheduler every fetch path goes through."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = Scheduler()
+    return _shared
+
+
+def configure(**kwargs) -> Scheduler:
+    """Replace the shared scheduler with Scheduler(**kwargs), e.g. max_rate=2 for a fragile site."""
+    global _shared
+    with _shared_lock:
+        _shared = Scheduler(**kwargs)
+    return _shared
+
+
+def main():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from fetch import request
+
+    parser = argparse.ArgumentParser(description="Fetch URLs through the shared scheduler and show its state")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--max-rate", type=float, default=None, help="requests/sec per host ceiling")
+    args = parser.parse_args()
+
+    scheduler = configure(max_rate=args.max_rate)
+    with ThreadPoolExecutor(max_workers=args.workers) as ex:
+        for url, resp in zip(args.urls, ex.map(request, args.urls)):
+            print(f"{resp.status_code} {url}")
+    for name, state in scheduler.stats().items():
+        print(name, state)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Infinite-scroll loader driven by a MutationObserver.
+#
+# One execute_async_script scrolls the page, watches the list container for
+# new children and keeps scrolling after each batch. It resolves when the
+# expected item count is reached, when no new items arrive for `quiet`
+# seconds, or on `timeout`. Only the final count comes back to Python, so
+# the whole load is a single WebDriver round-trip.
+
+SCROLL_JS = r"""
+const [containerSel, itemSel, target, quietMs, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const list = document.querySelector(containerSel);
+if (!list) { done({count: 0, reason: "missing"}); return; }
+
+const count = () => list.querySelectorAll(itemSel).length;
+const toBottom = () => window.scrollTo(0, document.body.scrollHeight);
+let quietTimer = null, hardTimer = null, finished = false, observer = null;
+
+function finish(reason) {
+  if (finished) return;
+  finished = true;
+  if (observer) observer.disconnect();
+  clearTimeout(quietTimer);
+  clearTimeout(hardTimer);
+  done({count: count(), reason: reason});
+}
+function armQuiet() {
+  clearTimeout(quietTimer);
+  quietTimer = setTimeout(() => finish("quiet"), quietMs);
+}
+
+observer = new MutationObserver(() => {
+  if (target && count() >= target) { finish("target"); return; }
+  toBottom();
+  armQuiet();
+});
+observer.observe(list, {childList: true});
+
+if (target && count() >= target) { finish("target"); return; }
+toBottom();
+armQuiet();
+hardTimer = setTimeout(() => finish("timeout"), timeoutMs);
+"""
+
+
+def load_all(
+    driver,
+    container: str,
+    item: str,
+    expected: int | None = None,
+    quiet: float = 1.0,
+    timeout: float = 60,
+) -> tuple[int, str]:
+    """
+    Scroll until every lazy-loaded item is in the DOM.
+
+    `container` is a CSS selector for the list and `item` a CSS selector for
+    its items, relative to it (e.g. ":scope > li.product-item"). Returns
+    (item count, why it stopped: "target", "quiet", "timeout" or "missing").
+    """
+    # the driver is shared: put its script timeout back afterwards
+    before = driver.timeouts.script
+    driver.set_script_timeout(timeout + 5)
+    try:
+        result = driver.execute_async_script(
+            SCROLL_JS, container, item, expected or 0, int(quiet * 1000), int(timeout * 1000)
+        )
+    finally:
+        driver.set_script_timeout(before)
+    return int(result["count"]), result["reason"]
@@ -0,0 +1,148 @@
+# Persistent cookie/consent state per domain.
+#
+# Once a cookie banner has been accepted, the resulting cookies are saved to
+# disk and pre-seeded into every new driver (via CDP, before the first page
+# load), so later runs never see the banner. Banner handling itself is one
+# combined, short-timeout probe over every known "accept" button.
+
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from metrics import timed
+from waits import wait_for
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SESSION_FILE = os.path.join(HERE, ".cache", "sessions.json")
+
+# "accept cookies" buttons seen on the target sites, tried in order
+CONSENT_XPATHS = [
+    "//button[@id='onetrust-accept-btn-handler']",
+    "//button[@aria-label='Accept cookies']",
+    "//button[contains(., 'Accept') or contains(., 'I Agree')]",
+]
+
+# CookieParam fields accepted by Network.setCookies
+_COOKIE_KEYS = {"name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires"}
+
+# Clicks the first visible consent button; returns its index or -1
+CLICK_CONSENT_JS = r"""
+const xpaths = arguments[0];
+for (let i = 0; i < xpaths.length; i++) {
+  const el = document.evaluate(xpaths[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  if (el && el.getClientRects().length && !el.disabled) { el.click(); return i; }
+}
+return -1;
+"""
+
+VISIBLE_JS = r"""
+const el = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return !!(el && el.getClientRects().length);
+"""
+
+
+def _domain(host_or_url: str) -> str:
+    host = urlsplit(host_or_url).hostname if "//" in host_or_url else host_or_url
+    host = (host or "").lstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+class SessionStore:
+    def __init__(self, path: str = SESSION_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.domains: dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self.domains = {}
+
+    def _flush(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.domains, f)
+        os.replace(tmp, self.path)
+
+    def has_consent(self, url: str) -> bool:
+        return bool(self.domains.get(_domain(url), {}).get("consent"))
+
+    def seed(self, driver):
+        """Pre-load every saved, unexpired cookie into a fresh driver."""
+        now = time.time()
+        cookies = [
+            # expires <= 0 marks a session cookie; CDP wants it omitted
+            {k: v for k, v in c.items() if k in _COOKIE_KEYS and not (k == "expires" and v <= 0)}
+            for state in self.domains.values()
+            for c in state.get("cookies", [])
+            if not c.get("expires") or c["expires"] < 0 or c["expires"] > now
+        ]
+        if not cookies:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        except Exception as e:
+            # non-Chromium driver; banners will simply be probed again
+            print(f"[warn] could not pre-seed cookies: {e}")
+
+    def save(self, driver, consent: bool = False):
+        """Persist the driver's cookies, grouped by domain."""
+        try:
+            cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        except Exception:
+            cookies = driver.get_cookies()
+
+        grouped: dict[str, list[dict]] = {}
+        for c in cookies:
+            grouped.setdefault(_domain(c.get("domain", "")), []).append(c)
+
+        current = _domain(driver.current_url)
+        with self._lock:
+            for domain, items in grouped.items():
+                state = self.domains.setdefault(domain, {})
+                state["cookies"] = items
+                state["saved_at"] = time.time()
+            if consent and current:
+                self.domains.setdefault(current, {})["consent"] = True
+            self._flush()
+
+
+_store: SessionStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SessionStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore()
+        return _store
+
+
+@timed("consent.dismiss")
+def dismiss_consent(driver, timeout: float = 2.0, store: SessionStore | None = None) -> bool:
+    """
+    Accept the cookie banner if one shows up within `timeout` seconds. When
+    consent for this domain is already on record (the cookies were seeded)
+    it's a single check instead of a wait. Returns True if a banner was
+    clicked, and saves the resulting cookies.
+    """
+    store = store or get_store()
+    if store.has_consent(driver.current_url):
+        timeout = 0
+
+    def click(d):
+        i = d.execute_script(CLICK_CONSENT_JS, CONSENT_XPATHS)
+        return i + 1  # truthy once a button was clicked
+
+    clicked = wait_for(driver, click, timeout=timeout, required=False)
+    if not clicked:
+        return False
+
+    # continue as soon as the banner is gone
+    xpath = CONSENT_XPATHS[clicked - 1]
+    wait_for(driver, lambda d: not d.execute_script(VISIBLE_JS, xpath), timeout=2, poll=0.05, required=False)
+    store.save(driver, consent=True)
+    return True
@@ -0,0 +1,219 @@
+# Streaming output sinks: rows are written as they are produced instead of
+# collected into a DataFrame and dumped at the end.
+#
+#   with open_sink("books.jsonl", ["Title", "Price"]) as sink:
+#       for row in rows:
+#           sink.write(row)
+#
+# The format follows the file extension (.csv, .jsonl/.ndjson, .parquet).
+# Rows are buffered and flushed in row groups of `batch`, so memory stays
+# bounded by one group. CSV and JSONL files are readable up to the last
+# flushed group if the process dies mid-run; a Parquet file only becomes
+# readable once the sink is closed (the footer is written last), which the
+# context manager does on exceptions too. pandas is never needed and pyarrow
+# only for Parquet.
+#
+# Rows (row dataclasses or dicts) are buffered column-wise in a
+# columns.ColumnBuffer, so a row group never becomes a list of dicts.
+# `transform` is applied to every row group's columns before they are written
+# (see numeric.open_typed_sink), and `schema` gives column types as
+# {name: "string" | "int64" | "float64" | "decimal"}; only Parquet uses it.
+
+import csv
+import json
+import os
+
+from columns import ColumnBuffer, as_dict
+
+BATCH = 500
+# Parquet decimals: prices with more places than this are rounded to it
+DECIMAL_SCALE = 6
+
+
+class Sink:
+    """Base class: buffers rows and hands them to _flush() a group at a time."""
+
+    def __init__(self, path: str, fieldnames: list[str], batch: int = BATCH, schema=None, transform=None):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.batch = max(1, batch)
+        self.schema = schema
+        self.transform = transform
+        self.count = 0
+        self._buffer = ColumnBuffer(self.fieldnames)
+
+    def write(self, row):
+        self._buffer.append(row)
+        self.count += 1
+        if len(self._buffer) >= self.batch:
+            self.flush()
+
+    def write_many(self, rows):
+        if not isinstance(rows, list):
+            for row in rows:
+                self.write(row)
+            return
+        # a list goes in a row group at a time
+        i = 0
+        while i < len(rows):
+            chunk = rows[i:i + self.batch - len(self._buffer)]
+            self._buffer.extend(chunk)
+            self.count += len(chunk)
+            i += len(chunk)
+            if len(self._buffer) >= self.batch:
+                self.flush()
+
+    def flush(self):
+        if len(self._buffer):
+            columns = self._buffer.columns()
+            self._flush(self.transform(columns) if self.transform else columns)
+            self._buffer.clear()
+
+    def _flush(self, columns: dict[str, list]):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvSink(Sink):
+    def __init__(self, path: str, fieldnames: list[str], **kwargs):
+        super().__init__(path, fieldnames, **kwargs)
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        # "\n" line endings, as the pandas-written CSVs had
+        self._writer = csv.writer(self._file, lineterminator="\n")
+        self._writer.writerow(self.fieldnames)
+        self._file.flush()
+
+    def _flush(self, columns):
+        self._writer.writerows(zip(*(columns[f] for f in self.fieldnames)))
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class JsonlSink(Sink):
+    def __init__(self, path: str, fieldnames: list[str], **kwargs):
+        super().__init__(path, fieldnames, **kwargs)
+        self._file = open(path, "w", encoding="utf-8")
+
+    def _flush(self, columns):
+        names = self.fieldnames
+        self._file.writelines(
+            json.dumps(dict(zip(names, values)), ensure_ascii=False, default=str) + "\n"
+            for values in zip(*(columns[f] for f in names))
+        )
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class ParquetSink(Sink):
+    """
+    One Parquet row group per flushed batch. Without a `schema` (a type
+    dict, or a pyarrow schema), column types are inferred from the first
+    batch (all-null columns become strings) and later batches are cast to it.
+    """
+
+    def __init__(self, path: str, fieldnames: list[str], batch: int = 10_000, **kwargs):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)") from e
+        super().__init__(path, fieldnames, batch, **kwargs)
+        self._pa, self._pq = pa, pq
+        if isinstance(self.schema, dict):
+            types = {"string": pa.string(), "int64": pa.int64(), "float64": pa.float64(),
+                     "decimal": pa.decimal128(38, DECIMAL_SCALE)}
+            self.schema = pa.schema([(f, types[self.schema.get(f, "string")]) for f in self.fieldnames])
+        self._writer = None
+
+    def _flush(self, columns):
+        pa = self._pa
+        columns = {f: columns[f] for f in self.fieldnames}
+        if self.schema is not None:
+            for f in self.schema:
+                if pa.types.is_decimal(f.type):
+                    columns[f.name] = _quantize(columns[f.name], f.type.scale)
+        if self.schema is None:
+            table = pa.table(columns)
+            self.schema = pa.schema(
+                pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema
+            )
+        table = pa.table(columns, schema=self.schema)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, self.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        super().close()
+        if self._writer is None:
+            # no rows at all: still leave a valid, empty file behind
+            schema = self.schema or self._pa.schema([(f, self._pa.string()) for f in self.fieldnames])
+            self._writer = self._pq.ParquetWriter(self.path, schema)
+        self._writer.close()
+
+
+def _quantize(values: list, scale: int) -> list:
+    # Arrow refuses to round a Decimal with more places than the column's scale
+    from decimal import Decimal
+
+    exp = Decimal(1).scaleb(-scale)
+    return [v.quantize(exp) if isinstance(v, Decimal) and v.as_tuple().exponent < -scale else v
+            for v in values]
+
+
+SINKS = {
+    ".csv": CsvSink,
+    ".jsonl": JsonlSink,
+    ".ndjson": JsonlSink,
+    ".parquet": ParquetSink,
+}
+
+
+def open_sink(path: str, fieldnames: list[str], **kwargs) -> Sink:
+    """A sink for `path`, picked by its extension."""
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        cls = SINKS[ext]
+    except KeyError:
+        raise ValueError(f"unsupported output format {ext!r} (use {', '.join(SINKS)})") from None
+    return cls(path, fieldnames, **kwargs)
+
+
+def read_rows(path: str) -> list[dict]:
+    """Read back a file written by any sink, with every value as text (like CSV)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        import pyarrow.parquet as pq
+        rows = pq.read_table(path).to_pylist()
+    elif ext in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    return [{k: "" if v is None else str(v) for k, v in r.items()} for r in rows]
+
+
+def preview(rows: list, n: int = 5):
+    """Print the first rows (dicts or row dataclasses), as a DataFrame when pandas is around."""
+    head = [as_dict(r) for r in rows[:n]]
+    try:
+        import pandas as pd
+    except ImportError:
+        for r in head:
+            print(r)
+        return
+    print(pd.DataFrame(head))
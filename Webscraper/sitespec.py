@@ -0,0 +1,336 @@
+# Declarative site specs: one object holds a site's URL, row selector,
+# fields, normalizers, readiness and pagination, and one engine runs it on
+# any backend.
+#
+#   BOOKS = SiteSpec(
+#       name="books",
+#       url="https://books.toscrape.com/",
+#       rows=RowSpec(rows="//article[...]", fields={"Title": Field(".//h3/a", attr="title"), ...}),
+#       normalize={"Price": "strip"},
+#   )
+#   rows = SiteScraper(BOOKS).scrape()       # HTTP + lxml, or the browser
+#   run_site(BOOKS, path="books.csv")
+#
+# The engine: load_tree() over HTTP (unless the spec is browser-only), else
+# goto() in a pooled Chrome, consent, wait for `ready`, then the spec's own
+# `wait`, and for a spec with `scroll` its infinite-scroll list loaded to
+# the end (scroll.load_all); one extract() pass (a single execute_script in the browser); each
+# field through its normalizers; `record` maps a row to 0..n output rows and
+# `finish` post-processes the full list. Pagination is followed over HTTP.
+#
+# Specs compile when created: every XPath is compiled and every normalizer
+# resolved once, so a bad spec fails at import and runs share the same hot
+# path. A spec can also be data (python sitespec.py sites/quotes.yaml):
+# load_site() reads JSON, or YAML when PyYAML is installed, with normalizers
+# named from NORMALIZERS and "css" selectors when cssselect is installed.
+
+import argparse
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable
+from urllib.parse import urljoin
+
+from lxml import etree
+
+from columns import interned
+from dates import normalize_date
+from driver_pool import PooledScraper, get_pool, goto
+from extract import Field, RowSpec, compile_spec, css, extract
+from fetch import HostRateLimiter, fetch_tree, load_tree
+from metrics import span
+from numeric import Typed, open_typed_sink
+from scroll import load_all
+from session_state import dismiss_consent
+from sinks import open_sink, preview
+
+
+def _lines(value) -> str:
+    return " | ".join(ln.strip() for ln in re.split(r"[\r\n]+", value or "") if ln.strip())
+
+
+# name -> value -> value; chained in order when a field lists several
+NORMALIZERS: dict[str, Callable] = {
+    "strip": lambda v: (v or "").strip(),
+    "collapse": lambda v: " ".join((v or "").split()),
+    "lines": _lines,
+    "join": lambda v: " | ".join(x for x in (v or ()) if x),
+    # values repeated across many rows share one string object
+    "intern": interned,
+    "date": lambda v: normalize_date(v or ""),
+    "fuzzy_date": lambda v: normalize_date(v or "", fuzzy=True),
+}
+
+
+def _resolve(norm) -> Callable:
+    if callable(norm):
+        return norm
+    if isinstance(norm, str):
+        try:
+            return NORMALIZERS[norm]
+        except KeyError:
+            raise ValueError(f"unknown normalizer {norm!r}, expected one of {sorted(NORMALIZERS)}") from None
+    fns = [_resolve(n) for n in norm]
+
+    def chain(value):
+        for fn in fns:
+            value = fn(value)
+        return value
+    return chain
+
+
+@dataclass(eq=False)
+class SiteSpec:
+    name: str
+    url: str
+    rows: RowSpec
+    fieldnames: list[str] = field(default_factory=list)  # default: the RowSpec's fields
+    normalize: dict = field(default_factory=dict)        # field -> normalizer name, callable or list
+    record: Callable | None = None    # normalized row -> output row(s) (a row dataclass or dict), None to skip
+    finish: Callable | None = None    # all output rows -> final rows
+    ready: str | None = None          # XPath present once the rows are (default: rows.rows)
+    wait: Callable | None = None      # browser only: wait(driver) after `ready`; a waits.Wait also works in cdp tabs
+    consent: bool = False             # dismiss the cookie banner after loading
+    scroll: dict | None = None        # browser only: scroll.load_all() keywords, to load a lazy list in full
+    http: bool = True                 # False: the rows need JS, always use the browser
+    pages: Callable | None = None     # pages(first tree, url) -> every page URL, in order
+    next_page: str | None = None      # or: XPath of the next page's href on each page
+    types: dict = field(default_factory=dict)
+    output: str = ""
+
+    def __post_init__(self):
+        self.fieldnames = list(self.fieldnames or self.rows.fields)
+        self.ready = self.ready or self.rows.rows
+        compile_spec(self.rows)
+        compile_spec(RowSpec(rows=self.ready))
+        self._next = etree.XPath(f"string({self.next_page})") if self.next_page else None
+        self._normalizers = {name: _resolve(n) for name, n in self.normalize.items()}
+
+    @property
+    def metric(self) -> str:
+        return self.name.replace("-", "_")
+
+    def records(self, source) -> list:
+        """Every output row on one page: `source` is an lxml tree or a driver."""
+        return self.build(extract(source, self.rows))
+
+    def build(self, rows: list[dict]) -> list:
+        """Output rows from extracted ones (extract()'s dicts, from any backend)."""
+        out = []
+        norms = self._normalizers
+        for row in rows:
+            for name, fn in norms.items():
+                row[name] = fn(row[name])
+            if self.record is None:
+                out.append({k: row.get(k) for k in self.fieldnames})
+                continue
+            rec = self.record(row)
+            if rec is None:
+                continue
+            if isinstance(rec, list):
+                out.extend(rec)
+            else:
+                out.append(rec)
+        return out
+
+
+class SiteScraper(PooledScraper):
+    """Runs a SiteSpec; Chrome is leased only when HTTP isn't enough."""
+
+    def __init__(self, site: SiteSpec, url: str | None = None, pool=None, backend: str = "auto",
+                 timeout: int = 20, headless: bool = True):
+        self.site = site
+        self.url = url or site.url
+        self.pool = pool or get_pool(headless=headless)
+        self.backend = backend if site.http else "browser"
+        self.timeout = timeout
+        self.source = None
+        self.rows: list = []
+
+    def open(self, html: str | None = None, on_scroll=None):
+        """
+        Load the first page; `html` when it was already fetched (e.g. through
+        http_cache). `on_scroll` is passed to scroll() for specs with `scroll`.
+        """
+        site = self.site
+        self.source = load_tree(self.url, site.ready, self.backend, self.timeout, html=html)
+        if self.source is not None:
+            return
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver = self.driver  # leased (and possibly started) outside the page_load span
+        with span(f"{site.metric}.page_load"):
+            goto(driver, self.url)
+        if site.consent:
+            dismiss_consent(driver)
+        WebDriverWait(driver, self.timeout).until(EC.presence_of_element_located((By.XPATH, site.ready)))
+        if site.wait is not None:
+            site.wait(driver)
+        if site.scroll is not None:
+            self.scroll(on_step=on_scroll)
+        self.source = driver
+
+    def scroll(self, on_step=None, step: float = 15) -> int:
+        """
+        Scroll the spec's infinite-scroll list until every item is loaded;
+        returns the item count. With `on_step` it scrolls `step` seconds at a
+        time and calls on_step(count) in between, e.g. to checkpoint.
+        """
+        site = self.site
+        kwargs = dict(site.scroll)
+        timeout = kwargs.pop("timeout", 60)
+        deadline = time.monotonic() + timeout
+        with span(f"{site.metric}.scroll"):
+            while True:
+                left = deadline - time.monotonic()
+                seen, reason = load_all(self.driver, **kwargs,
+                                        timeout=min(step, left) if on_step is not None else timeout)
+                if on_step is None or reason != "timeout" or left <= step:
+                    break
+                on_step(seen)
+        if reason == "timeout":
+            print(f"[warn] {site.name}: list still growing after {timeout}s")
+        print(f"[info] {site.name}: {seen} items loaded by scrolling")
+        return seen
+
+    def _page_urls(self, tree) -> list[str]:
+        if self.site.pages is not None:
+            return self.site.pages(tree, self.url)[1:]
+        return []
+
+    def scrape(self, all_pages: bool = True, workers: int = 8, rate: float | None = None) -> list:
+        """
+        Rows from the page, and with all_pages from every page after it: the
+        `pages` list fetched `workers` at a time, or `next_page` links in
+        turn. Pagination is HTTP only; in the browser it's the one page.
+        """
+        site = self.site
+        if self.source is None:
+            self.open()
+        rows = site.records(self.source)
+
+        tree = None if hasattr(self.source, "execute_script") else self.source
+        if all_pages and tree is not None:
+            limiter = HostRateLimiter(rate)
+            urls = self._page_urls(tree)
+            if urls:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=site.metric) as ex:
+                    for page in ex.map(partial(fetch_tree, limiter=limiter, timeout=self.timeout), urls):
+                        rows.extend(site.records(page))
+            elif site._next is not None:
+                seen = {self.url}
+                while True:
+                    href = site._next(tree)
+                    url = urljoin(tree.base_url or self.url, href) if href else None
+                    if not url or url in seen:
+                        break
+                    seen.add(url)
+                    tree = fetch_tree(url, limiter, self.timeout)
+                    rows.extend(site.records(tree))
+
+        self.rows = site.finish(rows) if site.finish else rows
+        return self.rows
+
+    def save(self, path: str | None = None, typed: bool = False, fieldnames: list[str] | None = None):
+        site = self.site
+        path = path or site.output or f"{site.name}.csv"
+        fields = fieldnames or site.fieldnames
+        with (open_typed_sink(path, fields, site.types) if typed else open_sink(path, fields)) as sink:
+            sink.write_many(self.rows)
+        preview(self.rows)
+        print(f" Saved {sink.count} rows to {path}")
+        return sink.count
+
+
+def run_site(site: SiteSpec, url: str | None = None, path: str | None = None, typed: bool = False,
+             backend: str = "auto", all_pages: bool = True) -> int:
+    """Scrape `site` into `path` (default: the spec's output); returns the number of rows."""
+    scraper = SiteScraper(site, url, backend=backend)
+    try:
+        scraper.scrape(all_pages)
+        scraper.save(path, typed)
+    finally:
+        scraper.close()
+    return len(scraper.rows)
+
+
+# --- specs as data ---------------------------------------------------------
+
+def _field(value) -> Field:
+    if isinstance(value, str):
+        return Field(value)
+    value = dict(value)
+    if "css" in value:
+        value["xpath"] = css(value.pop("css"))
+    if isinstance(value.get("xpath"), list):
+        value["xpath"] = tuple(value["xpath"])
+    if "each" in value:
+        value["each"] = _field(value["each"])
+    value.pop("normalize", None)
+    return Field(**value)
+
+
+def site_from_dict(data: dict) -> SiteSpec:
+    """
+    A SiteSpec from plain data:
+
+        name: quotes
+        url: https://quotes.toscrape.com/
+        rows: //div[@class='quote']          # or {css: div.quote}
+        fields:
+          text: .//span[@class='text']
+          tags: {xpath: ".//a[@class='tag']", many: true, normalize: join}
+        next_page: //li[@class='next']/a/@href
+        types: {price: price}
+    """
+    data = dict(data)
+    rows = data.pop("rows")
+    rows = css(rows["css"], relative=False) if isinstance(rows, dict) else rows
+    fields = data.pop("fields")
+    normalize = {
+        name: f["normalize"] for name, f in fields.items() if isinstance(f, dict) and "normalize" in f
+    }
+    types = {name: Typed(kind) if isinstance(kind, str) else Typed(**kind)
+             for name, kind in data.pop("types", {}).items()}
+    return SiteSpec(
+        rows=RowSpec(rows=rows, fields={name: _field(f) for name, f in fields.items()}),
+        normalize=normalize,
+        types=types,
+        **data,
+    )
+
+
+def load_site(path: str) -> SiteSpec:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                # optional: YAML site files
+                import yaml
+            except ImportError:
+                raise ImportError("YAML site files need PyYAML: pip install pyyaml") from None
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    return site_from_dict(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape a site from a spec file")
+    parser.add_argument("spec", help="site spec (.json, or .yaml with PyYAML)")
+    parser.add_argument("--url", help="override the spec's URL")
+    parser.add_argument("--out", help="output file (.csv, .jsonl or .parquet)")
+    parser.add_argument("--backend", choices=["auto", "http", "browser"], default="auto")
+    parser.add_argument("--first-page", action="store_true", help="don't follow pagination")
+    parser.add_argument("--typed", action="store_true", help="parse the spec's typed columns")
+    args = parser.parse_args()
+
+    run_site(load_site(args.spec), args.url, args.out, args.typed, args.backend, not args.first_page)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# The scrapers are flat modules in Webscraper/, imported as `import Books`.
+#
+#   cd Webscraper && python -m pytest tests
+
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+
+@pytest.fixture(scope="session")
+def fixture_server():
+    from fixtures import FixtureServer
+
+    with FixtureServer() as srv:
+        yield srv
+
+
+@pytest.fixture(autouse=True)
+def _scratch_dir(tmp_path, monkeypatch):
+    # scrapers write CSVs, caches and stores relative to the working directory
+    monkeypatch.chdir(tmp_path)
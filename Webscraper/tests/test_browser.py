@@ -0,0 +1,38 @@
+# The Selenium paths against the fixture pages; skipped without Chrome.
+
+import shutil
+
+import pytest
+
+if not any(shutil.which(b) for b in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")):
+    pytest.skip("needs Chrome", allow_module_level=True)
+
+
+@pytest.fixture(scope="module")
+def driver():
+    from driver_pool import get_pool
+
+    with get_pool().lease() as driver:
+        yield driver
+
+
+def test_scroll_loads_every_tile(fixture_server, driver):
+    from scroll import load_all
+    from Task2 import EXPECTED_MODELS, SITE
+
+    driver.get(fixture_server.url("troemner-lazy"))
+    count, reason = load_all(driver, **SITE.scroll)
+    assert (count, reason) == (EXPECTED_MODELS, "target")
+
+
+def test_books_browser_matches_http(fixture_server):
+    from Books import BookScraper
+
+    rows = {}
+    for backend in ("http", "browser"):
+        s = BookScraper(fixture_server.url("books"), backend=backend)
+        s.open_page()
+        s.scrape_books()
+        s.close()
+        rows[backend] = s.master_list
+    assert rows["browser"] == rows["http"]
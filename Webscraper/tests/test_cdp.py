@@ -0,0 +1,185 @@
+# The DevTools WebSocket client against a local echo server, and a SiteSpec's
+# wait polled in a tab.
+
+import asyncio
+import base64
+import hashlib
+import json
+
+import pytest
+
+from cdp import CDPError, Tab, _mask, _WebSocket
+from waits import COUNT_JS, MUTATION_AGE_JS, Wait, any_of, dom_stable, row_count_reached
+
+GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC175B11"
+
+
+def test_mask_matches_rfc_6455():
+    # the masked "Hello" example of RFC 6455, section 5.7
+    key = bytes.fromhex("37fa213d")
+    assert _mask(b"Hello", key) == bytes.fromhex("7f9f4d5158")
+    for n in range(10):
+        data = bytes(range(n))
+        assert _mask(_mask(data, key), key) == data
+
+
+def frame(opcode: int, payload: bytes, fin: bool = True) -> bytes:
+    # server frames are not masked
+    n = len(payload)
+    head = bytes([(0x80 if fin else 0) | opcode])
+    if n < 126:
+        head += bytes([n])
+    elif n < 1 << 16:
+        head += bytes([126]) + n.to_bytes(2, "big")
+    else:
+        head += bytes([127]) + n.to_bytes(8, "big")
+    return head + payload
+
+
+async def read_frame(reader) -> tuple[int, bytes]:
+    b1, b2 = await reader.readexactly(2)
+    assert b2 & 0x80, "client frames must be masked"
+    n = b2 & 0x7F
+    if n == 126:
+        n = int.from_bytes(await reader.readexactly(2), "big")
+    elif n == 127:
+        n = int.from_bytes(await reader.readexactly(8), "big")
+    key = await reader.readexactly(4)
+    data = await reader.readexactly(n)
+    return b1 & 0x0F, bytes(b ^ key[i % 4] for i, b in enumerate(data))
+
+
+class EchoServer:
+    """
+    Echoes each text message. "frag:..." comes back in three fragments with
+    a ping between them, "close" gets a close frame.
+    """
+
+    def __init__(self):
+        self.received = []  # (opcode, payload) of every client frame
+
+    async def handle(self, reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        key = next(line.split(b":", 1)[1].strip() for line in head.split(b"\r\n")
+                   if line.lower().startswith(b"sec-websocket-key:"))
+        accept = base64.b64encode(hashlib.sha1(key + GUID).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        try:
+            while True:
+                opcode, data = await read_frame(reader)
+                self.received.append((opcode, data))
+                if opcode == 0x8:
+                    break
+                if opcode != 0x1:
+                    continue
+                if data == b"close":
+                    writer.write(frame(0x8, b""))
+                elif data.startswith(b"frag:"):
+                    third = len(data) // 3
+                    writer.write(frame(0x1, data[:third], fin=False))
+                    writer.write(frame(0x9, b"are you there"))
+                    writer.write(frame(0x0, data[third:2 * third], fin=False))
+                    writer.write(frame(0x0, data[2 * third:]))
+                else:
+                    writer.write(frame(0x1, data))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        writer.close()
+
+
+def with_echo(test):
+    async def run():
+        echo = EchoServer()
+        server = await asyncio.start_server(echo.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            ws = await _WebSocket.connect(f"ws://127.0.0.1:{port}/devtools/browser/x")
+            try:
+                await test(ws, echo)
+            finally:
+                await ws.close()
+
+    asyncio.run(asyncio.wait_for(run(), 10))
+
+
+def test_echo_small_and_16_bit_lengths():
+    async def test(ws, echo):
+        for text in ["", "hi", "é" * 100, "x" * 40_000]:
+            await ws.send(text)
+            assert await ws.recv() == text
+
+    with_echo(test)
+
+
+def test_echo_64_bit_length():
+    big = json.dumps({"rows": ["row %d" % i for i in range(20_000)]})
+    assert len(big) >= 1 << 16
+
+    async def test(ws, echo):
+        await ws.send(big)
+        assert await ws.recv() == big
+        assert echo.received[-1] == (0x1, big.encode())
+
+    with_echo(test)
+
+
+def test_fragmented_message_with_a_ping_between():
+    text = "frag:" + "ü" * 70_000
+
+    async def test(ws, echo):
+        await ws.send(text)
+        assert await ws.recv() == text
+        # the ping in the middle was answered
+        await ws.send("after")
+        assert await ws.recv() == "after"
+        assert (0xA, b"are you there") in echo.received
+
+    with_echo(test)
+
+
+def test_close_frame_ends_recv():
+    async def test(ws, echo):
+        await ws.send("close")
+        assert await ws.recv() is None
+
+    with_echo(test)
+
+
+class FakeBrowser:
+    """Answers Runtime.evaluate from `answers`: script -> list of values, one per call."""
+
+    def __init__(self, answers):
+        self.answers = answers
+
+    async def send(self, method, params, session):
+        for script, values in self.answers.items():
+            if script in params["expression"]:
+                return {"result": {"value": values.pop(0) if len(values) > 1 else values[0]}}
+        raise AssertionError(params["expression"])
+
+
+def test_tab_polls_the_spec_wait():
+    tab = Tab(FakeBrowser({MUTATION_AGE_JS: [[10, "loading"], [50, "complete"], [400, "complete"]]}), "s")
+    wait = Wait(dom_stable(quiet=0.3), timeout=5)
+    assert asyncio.run(tab.until(wait.fresh(), wait.timeout, wait.required)) is True
+
+
+def test_tab_wait_timeout():
+    tab = Tab(FakeBrowser({COUNT_JS: [3]}), "s")
+    assert asyncio.run(tab.until(row_count_reached("//li", 5), 0.3, required=False)) is None
+    with pytest.raises(TimeoutError):
+        asyncio.run(tab.until(row_count_reached("//li", 5), 0.3))
+
+
+def test_tab_any_of():
+    tab = Tab(FakeBrowser({MUTATION_AGE_JS: [[0, "loading"]], COUNT_JS: [7]}), "s")
+    cond = any_of(dom_stable(), row_count_reached("//li", 5))
+    assert asyncio.run(tab.until(cond, 1)) == (1, 7)
+
+
+def test_tab_rejects_a_driver_only_wait():
+    tab = Tab(FakeBrowser({}), "s")
+    with pytest.raises(CDPError):
+        asyncio.run(tab.until(lambda driver: True, 1))
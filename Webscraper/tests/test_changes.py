@@ -0,0 +1,40 @@
+# The *.changes.csv diff, including a snapshot written with other columns.
+
+import csv
+
+from changes import changes_path, write_changes
+
+FIELDS = ["productName", "EOL_Date"]
+DETAILS = ["detail_title"]
+
+
+def key(r):
+    return r["productName"]
+
+
+def read_changes(path):
+    with open(changes_path(path), newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_added_removed_modified():
+    old = [{"productName": "PA-220", "EOL_Date": "2025-01-01"}, {"productName": "PA-500", "EOL_Date": "2024-01-01"}]
+    new = [{"productName": "PA-220", "EOL_Date": "2026-01-01"}, {"productName": "PA-400", "EOL_Date": ""}]
+    assert write_changes("hw.csv", old, new, key, FIELDS) == 3
+    assert {(r["change"], r["productName"]) for r in read_changes("hw.csv")} == {
+        ("modified", "PA-220"), ("added", "PA-400"), ("removed", "PA-500")}
+
+
+def test_details_switched_off():
+    # the last run wrote detail columns, this one doesn't
+    old = [{"productName": "PA-220", "EOL_Date": "2025-01-01", "detail_title": "PA-220 datasheet"},
+           {"productName": "PA-500", "EOL_Date": "2024-01-01", "detail_title": ""}]
+    new = [{"productName": "PA-220", "EOL_Date": "2025-01-01"}]
+    assert write_changes("hw.csv", old, new, key, FIELDS) == 1
+    assert read_changes("hw.csv") == [{"change": "removed", "productName": "PA-500", "EOL_Date": "2024-01-01"}]
+
+
+def test_details_switched_on():
+    old = [{"productName": "PA-220", "EOL_Date": "2025-01-01"}]
+    new = [{"productName": "PA-220", "EOL_Date": "2025-01-01", "detail_title": "PA-220 datasheet"}]
+    assert write_changes("hw.csv", old, new, key, FIELDS + DETAILS) == 0
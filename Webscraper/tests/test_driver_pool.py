@@ -0,0 +1,65 @@
+# Lease/return bookkeeping of the driver pool, on fake drivers.
+
+import threading
+
+from driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self, pool_ref):
+        self.pool_ref = pool_ref
+        self.quit_with_lock_free = None
+
+    def execute_script(self, script):
+        return 1
+
+    def quit(self):
+        # another thread must be able to take the pool lock meanwhile
+        got = []
+
+        def probe():
+            lock = self.pool_ref[0]._cond
+            got.append(lock.acquire(timeout=1))
+            if got[0]:
+                lock.release()
+
+        t = threading.Thread(target=probe)
+        t.start()
+        t.join()
+        self.quit_with_lock_free = got[0]
+
+
+def make_pool(**kwargs):
+    ref = []
+    pool = DriverPool(factory=lambda headless: FakeDriver(ref), **kwargs)
+    ref.append(pool)
+    return pool
+
+
+def test_reuses_a_driver_until_max_pages():
+    pool = make_pool(max_pages=3)
+    first = pool.acquire()
+    pool.release(first, pages=2)
+    assert pool.acquire() is first
+    pool.release(first, pages=1)
+    assert first.quit_with_lock_free is True
+    assert pool.acquire() is not first
+
+
+def test_discarded_driver_quits_outside_the_lock():
+    pool = make_pool()
+    driver = pool.acquire()
+    pool.release(driver, discard=True)
+    assert driver.quit_with_lock_free is True
+    assert not pool._leased and not pool._idle
+
+
+def test_waiter_gets_a_driver_after_a_recycle():
+    pool = make_pool(max_pages=1)
+    driver = pool.acquire()
+    got = []
+    t = threading.Thread(target=lambda: got.append(pool.acquire(timeout=5)))
+    t.start()
+    pool.release(driver)
+    t.join()
+    assert got and got[0] is not driver
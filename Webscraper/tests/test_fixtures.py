@@ -0,0 +1,128 @@
+# Every scraper against the fixture pages, which fixtures.py builds from the
+# committed CSVs: the HTTP fast path, the Troemner result endpoint, the
+# one-pass software table parser and the scheduler under rate limiting must
+# all give back exactly the committed rows.
+
+import csv
+import os
+from urllib.parse import urlsplit
+
+import pytest
+
+from columns import as_dict
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def committed(name: str) -> list[dict]:
+    with open(os.path.join(HERE, name), newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def as_text(rows, links=(), fields=None) -> list[dict]:
+    # the committed columns as text; the fixture server lives on 127.0.0.1,
+    # so links compare by path
+    out = []
+    for r in rows:
+        r = as_dict(r)
+        r = {k: "" if r[k] is None else str(r[k]) for k in fields or r}
+        for k in links:
+            u = urlsplit(r[k])
+            r[k] = u.path + (f"?{u.query}" if u.query else "")
+        out.append(r)
+    return out
+
+
+def assert_committed(rows, name: str, links=()):
+    expected = committed(name)
+    assert as_text(rows, links, list(expected[0])) == as_text(expected, links)
+
+
+def test_books_http(fixture_server):
+    from Books import BookScraper
+
+    s = BookScraper(fixture_server.url("books"), backend="http")
+    s.open_page()
+    s.scrape_books()
+    assert_committed(s.master_list, "books.csv", ["Link"])
+
+
+def test_population_http(fixture_server):
+    from population import PopulationScraper
+
+    s = PopulationScraper(fixture_server.url("population"), backend="http")
+    s.scrape_table()
+    assert_committed(s.master_list, "countries_population.csv")
+
+
+def test_eol_hardware_http(fixture_server):
+    from EOLhardware import scrape
+
+    rows = scrape(url=fixture_server.url("eol-hw"), backend="http", out_csv="hw.csv", store=None)
+    assert_committed(rows, "palo_alto_hardware_eol.csv")
+    with open("hw.csv", newline="", encoding="utf-8") as f:
+        assert_committed(list(csv.DictReader(f)), "palo_alto_hardware_eol.csv")
+
+
+def test_eol_software_http(fixture_server):
+    from EOLsoftwares import PaloAltoSoftwareScraper
+
+    s = PaloAltoSoftwareScraper(url=fixture_server.url("eol-sw"), backend="http")
+    s.open_page()
+    s.parse_tables()
+    assert_committed(s.rows, "paloalto_software_eol.csv")
+
+
+@pytest.mark.parametrize("headings", ["cell", "before"])
+def test_software_tables_one_pass(headings):
+    import EOLsoftwares
+    from fetch import parse_html
+    from fixtures import eol_software_page
+
+    tree = parse_html(eol_software_page(3, headings), EOLsoftwares.URL)
+    expected = EOLsoftwares.SITE.records(tree)
+    assert len(expected) == 3 * len(committed("paloalto_software_eol.csv"))
+    assert EOLsoftwares.parse_source(tree, workers=1) == expected
+    assert EOLsoftwares.parse_source(tree, workers=2) == expected
+
+
+def test_troemner_result_endpoint(fixture_server):
+    from Task2 import TroemnerOIMLScraper
+
+    s = TroemnerOIMLScraper(url=fixture_server.url("troemner"))
+    assert s.fetch_listing()
+    assert_committed(s.rows, "troemner_oiml_weight_sets.csv", ["productURL"])
+
+
+def test_books_crawl_under_rate_limit():
+    import scheduler
+    from Books import BookScraper
+    from fixtures import FixtureServer, Throttle
+
+    # a server that answers 429s above 40 requests/s, like the live sites
+    throttle = Throttle(rate=40, burst=10, retry_after=0.2)
+    with FixtureServer(book_pages=3, throttle=throttle) as srv:
+        scheduler.configure()
+        try:
+            rows = list(BookScraper(srv.url("books")).crawl(max_workers=8, details=True))
+        finally:
+            scheduler.configure()
+    assert len(rows) == 3 * len(committed("books.csv"))
+    # every detail page came through in the end, despite the 429s
+    assert throttle.rejected
+    assert all(r.UPC for r in rows)
+
+
+@pytest.mark.parametrize("job", ["books", "population", "eol-hw", "eol-sw", "troemner"])
+def test_replay_rows_match_baseline(job, tmp_path):
+    # the benchmark suite's jobs on the replay server (recordings where there
+    # are any), against the row counts in its baseline
+    import json
+
+    from bench import BASELINE, _fetch_jobs
+    from replay import ReplayServer
+
+    with open(BASELINE, encoding="utf-8") as f:
+        expected = json.load(f)[f"{job}/http"]["rows"]
+    with ReplayServer() as srv:
+        assert _fetch_jobs(srv.url, "http", str(tmp_path))[job]() == expected
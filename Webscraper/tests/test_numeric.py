@@ -0,0 +1,51 @@
+# numeric.py's pandas and plain-regex paths must type every column alike.
+
+from decimal import Decimal
+
+import pytest
+
+import numeric
+from numeric import Typed, parse_column, type_columns
+
+CELLS = ["1,234", "1,417,492,000", "17.3%", "17.5", "18.5", "-0.5 %", "12[4]", "£51.77", "$1.234",
+         "$3,150.00", "1,234 (2023 est.)", "2020-2021", "N.A.", "", None, 7, 2.5]
+
+
+@pytest.fixture
+def no_pandas(monkeypatch):
+    monkeypatch.setattr(numeric, "_pandas", lambda: None)
+
+
+def both(fn):
+    pytest.importorskip("pandas")
+    with_pandas = fn()
+    with pytest.MonkeyPatch.context() as m:
+        m.setattr(numeric, "_pandas", lambda: None)
+        without = fn()
+    return with_pandas, without
+
+
+@pytest.mark.parametrize("kind", ["int", "float", "price"])
+def test_paths_agree(kind):
+    with_pandas, without = both(lambda: parse_column(CELLS, kind))
+    assert with_pandas == without
+
+
+def test_type_columns_paths_agree():
+    from population import TYPES
+
+    columns = {"Rank": [1, 2, 3], "Country": ["World", "India", "China"],
+               "Population": ["8,232,000,000", "1,417,492,000", "1,407,181,209 (2024 est.)"],
+               "World Share": ["100%", "17.3%", "17.1%"], "Date": ["", "", ""], "Source": ["", "", ""]}
+    with_pandas, without = both(lambda: type_columns(columns, TYPES))
+    assert with_pandas == without
+    assert without["Rank"] == [1, 2, 3]
+    assert without["Population"] == [8232000000, 1417492000, None]
+
+
+def test_one_number_per_cell(no_pandas):
+    assert parse_column(["1,234 (2023 est.)", "2020-2021", "N.A."], "int") == [None, None, None]
+    assert parse_column(["17.5", "18.5", 7, 2.5], "int") == [18, 18, 7, 2]
+    assert parse_column(["$1.234", "£51.77"], "price") == [Decimal("1.234"), Decimal("51.77")]
+    assert type_columns({"p": ["$3,150.00"]}, {"p": Typed("price", currency="c")}) == \
+        {"p": [Decimal("3150.00")], "c": ["USD"]}
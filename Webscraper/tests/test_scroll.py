@@ -0,0 +1,63 @@
+# The infinite-scroll loader and the engine's use of it, on a fake driver
+# that answers the loader's script the way a page that keeps growing would.
+
+from types import SimpleNamespace
+
+import pytest
+
+from Task2 import SITE
+from sitespec import SiteScraper
+
+
+class FakeDriver:
+    def __init__(self, counts):
+        # one (count, reason) per execute_async_script call
+        self.answers = list(counts)
+        self.calls = []
+        self.timeouts = SimpleNamespace(script=30)
+        self.timeouts_seen = []
+
+    def set_script_timeout(self, seconds):
+        self.timeouts.script = seconds
+        self.timeouts_seen.append(seconds)
+
+    def execute_async_script(self, script, *args):
+        self.calls.append(args)
+        count, reason = self.answers.pop(0)
+        return {"count": count, "reason": reason}
+
+
+def scraper(driver) -> SiteScraper:
+    s = SiteScraper(SITE, pool=object())
+    s._driver = driver
+    return s
+
+
+def test_engine_scrolls_the_spec_list():
+    driver = FakeDriver([(162, "target")])
+    assert scraper(driver).scroll() == 162
+    container, item, expected, quiet_ms, timeout_ms = driver.calls[0]
+    assert (container, item, expected) == (SITE.scroll["container"], SITE.scroll["item"], 162)
+    assert timeout_ms == SITE.scroll["timeout"] * 1000
+
+
+def test_engine_scrolls_in_steps_with_a_callback():
+    driver = FakeDriver([(40, "timeout"), (90, "timeout"), (162, "target")])
+    steps = []
+    assert scraper(driver).scroll(on_step=steps.append, step=15) == 162
+    assert steps == [40, 90]
+    assert all(args[4] == 15_000 for args in driver.calls)
+
+
+def test_loader_restores_the_script_timeout():
+    driver = FakeDriver([(162, "target")])
+    scraper(driver).scroll()
+    assert driver.timeouts_seen == [SITE.scroll["timeout"] + 5, 30]
+    assert driver.timeouts.script == 30
+
+
+def test_loader_restores_the_script_timeout_on_error():
+    driver = FakeDriver([])  # the script call raises
+    with pytest.raises(IndexError):
+        scraper(driver).scroll()
+    assert driver.timeouts.script == 30
@@ -0,0 +1,182 @@
+# Event-driven readiness conditions, replacing fixed time.sleep() waits.
+#
+# Every condition is a callable for WebDriverWait.until(): it returns a truthy
+# value once the page is ready. Each poll is a single execute_script, of the
+# condition's `script` with its `args`, whose result `check` turns into the
+# answer; cdp.py polls the same conditions in a tab that way.
+#
+#   wait_for(driver, dom_stable(quiet=0.3), timeout=5)
+#   wait_for(driver, row_count_reached("//li", 20))
+#   SiteSpec(..., wait=Wait(dom_stable(quiet=0.3), timeout=5, required=False))
+
+import copy
+import time
+from dataclasses import dataclass
+
+POLL = 0.1
+
+# Installs a MutationObserver once per document and reports how long ago
+# the DOM last changed, in ms.
+MUTATION_AGE_JS = r"""
+if (!window.__wsMutations) {
+  window.__wsMutations = {last: performance.now()};
+  new MutationObserver(() => { window.__wsMutations.last = performance.now(); })
+    .observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return [performance.now() - window.__wsMutations.last, document.readyState];
+"""
+
+# ms since the last resource finished loading, and how many are in flight
+# (started but without a responseEnd yet).
+_NETWORK_AGE_JS = r"""
+const entries = performance.getEntriesByType("resource");
+let last = 0, inflight = 0;
+for (const e of entries) {
+  if (e.responseEnd === 0) inflight++;
+  else if (e.responseEnd > last) last = e.responseEnd;
+}
+return [performance.now() - last, inflight, document.readyState];
+"""
+
+COUNT_JS = r"""
+return document.evaluate("count(" + arguments[0] + ")", document, null, XPathResult.NUMBER_TYPE, null).numberValue;
+"""
+
+
+class ScriptCondition:
+    """A condition answered by one script: check(execute_script(script, *args))."""
+
+    script = ""
+    args = ()
+
+    def check(self, value):
+        raise NotImplementedError
+
+    def __call__(self, driver):
+        return self.check(driver.execute_script(self.script, *self.args))
+
+
+class dom_stable(ScriptCondition):
+    """The document has loaded and the DOM has not changed for `quiet` seconds."""
+
+    script = MUTATION_AGE_JS
+
+    def __init__(self, quiet: float = 0.3):
+        self.quiet_ms = quiet * 1000
+
+    def check(self, value):
+        age, state = value
+        return state == "complete" and age >= self.quiet_ms
+
+
+class network_idle(ScriptCondition):
+    """
+    No resource request in flight and none finished for `quiet` seconds,
+    counted from the first poll so a request about to start still counts.
+    """
+
+    script = _NETWORK_AGE_JS
+
+    def __init__(self, quiet: float = 0.5):
+        self.quiet = quiet
+        self._started = None
+
+    def check(self, value):
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        age_ms, inflight, state = value
+        idle_for = min(age_ms / 1000, now - self._started)
+        return state == "complete" and inflight == 0 and idle_for >= self.quiet
+
+
+class row_count_reached(ScriptCondition):
+    """At least `n` nodes match `xpath`; returns the count."""
+
+    script = COUNT_JS
+
+    def __init__(self, xpath: str, n: int = 1):
+        self.xpath = xpath
+        self.args = (xpath,)
+        self.n = n
+
+    def check(self, value):
+        count = int(value)
+        return count if count >= self.n else False
+
+
+class count_stopped_growing(ScriptCondition):
+    """
+    At least `minimum` nodes match `xpath` and the count has not changed for
+    `quiet` seconds; returns the count.
+    """
+
+    script = COUNT_JS
+
+    def __init__(self, xpath: str, quiet: float = 0.3, minimum: int = 1):
+        self.xpath = xpath
+        self.args = (xpath,)
+        self.quiet = quiet
+        self.minimum = minimum
+        self._count = None
+        self._since = 0.0
+
+    def check(self, value):
+        count = int(value)
+        now = time.monotonic()
+        if count != self._count:
+            self._count, self._since = count, now
+            return False
+        if count >= self.minimum and now - self._since >= self.quiet:
+            return count
+        return False
+
+
+class any_of:
+    """First truthy result of several conditions, as (index, value)."""
+
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+    def __call__(self, driver):
+        for i, cond in enumerate(self.conditions):
+            value = cond(driver)
+            if value:
+                return i, value
+        return False
+
+
+def wait_for(driver, condition, timeout: float = 10, poll: float = POLL, required: bool = True):
+    """
+    Poll `condition` every `poll` seconds until it is truthy and return its
+    value. On timeout raise TimeoutException, or return None when
+    required=False.
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        if required:
+            raise
+        return None
+
+
+@dataclass
+class Wait:
+    """
+    A condition with its wait_for() settings, for SiteSpec.wait: call it
+    with a driver to wait. Every wait polls a fresh copy of `condition`, so
+    the stateful ones start over.
+    """
+
+    condition: object
+    timeout: float = 10
+    required: bool = True
+
+    def fresh(self):
+        return copy.deepcopy(self.condition)
+
+    def __call__(self, driver):
+        return wait_for(driver, self.fresh(), self.timeout, required=self.required)
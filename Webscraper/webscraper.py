@@ -0,0 +1,255 @@
+# Run several Webscraper jobs in parallel, one process per job.
+# The jobs import the scrapers as top-level modules, so run it from inside
+# Webscraper/ (or as `python Webscraper/webscraper.py ...` from the repo root).
+#
+#   python -m webscraper run all
+#   python -m webscraper run books eol-sw --workers 2 --timeout 300 --retries 2
+#   python -m webscraper run all --fixtures      (recorded or fixture pages, see replay.py)
+#   python -m webscraper run books population --typed
+#   python -m webscraper run all --metrics metrics/  (per-job JSON log + .prom)
+#
+# Each attempt runs in its own spawned process, so a hung browser or a job
+# past its --timeout is killed without affecting the others. Failed attempts
+# are retried with exponential backoff plus jitter; a retry resumes from the
+# checkpoint the failed attempt left (see checkpoint.py) where the job keeps
+# one. A summary table of rows, duration and attempts is printed at the end;
+# the exit status is 1 if any job ultimately failed.
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# Jobs return the number of rows written, or None when the source was unchanged.
+# `typed` parses numeric columns (see numeric.py); the EOL tables have none.
+# `resume` is set on retries; single-page jobs have nothing to resume.
+
+def _books(url=None, typed=False, resume=False):
+    import Books
+    return Books.run(url or Books.URL, crawl=True, typed=typed, resume=resume)
+
+
+def _population(url=None, typed=False, resume=False):
+    import population
+    return population.run(url or population.URL, typed=typed)
+
+
+def _eol_hw(url=None, typed=False, resume=False):
+    import EOLhardware
+    rows = EOLhardware.scrape(url=url or EOLhardware.TARGET_URL, incremental=True)
+    return None if rows is None else len(rows)
+
+
+def _eol_sw(url=None, typed=False, resume=False):
+    import EOLsoftwares
+    return EOLsoftwares.run(url or EOLsoftwares.URL)
+
+
+def _troemner(url=None, typed=False, resume=False):
+    import Task2
+    return Task2.run(url=url or Task2.CATEGORY_URL, typed=typed, resume=resume)
+
+
+JOBS = {
+    "books": _books,
+    "population": _population,
+    "eol-hw": _eol_hw,
+    "eol-sw": _eol_sw,
+    "troemner": _troemner,
+}
+
+
+@dataclass
+class JobResult:
+    name: str
+    status: str = "pending"  # ok, unchanged or failed
+    rows: int | None = None
+    seconds: float = 0.0
+    attempts: int = 0
+    error: str = ""
+
+
+def _child(name: str, url: str | None, out_dir: str, typed: bool, metrics_dir: str | None, resume: bool, conn):
+    os.chdir(out_dir)
+    if metrics_dir:
+        import metrics
+        metrics.enable(log=os.path.join(metrics_dir, f"{name}.jsonl"),
+                       prom=os.path.join(metrics_dir, f"{name}.prom"))
+    try:
+        conn.send(("ok", JOBS[name](url, typed, resume)))
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+        if metrics_dir:
+            metrics.finish()
+
+
+class _Attempt:
+    def __init__(self, ctx, name: str, url: str | None, out_dir: str, timeout: float,
+                 typed: bool = False, metrics_dir: str | None = None, resume: bool = False):
+        self.name = name
+        self.conn, child_conn = ctx.Pipe(duplex=False)
+        self.proc = ctx.Process(target=_child,
+                                args=(name, url, out_dir, typed, metrics_dir, resume, child_conn),
+                                daemon=True)
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout
+        self.proc.start()
+        child_conn.close()
+
+    def outcome(self, now: float) -> tuple[str, object] | None:
+        """("ok", rows) or ("error", message) once finished, else None."""
+        message = self._receive()
+        if message is not None:
+            return message
+        if not self.proc.is_alive():
+            # the child may have sent its result and exited since the poll above
+            message = self._receive()
+            if message is not None:
+                return message
+            self.proc.join()
+            if self.proc.exitcode == 0:
+                return "error", "process exited without sending a result"
+            return "error", f"process exited with code {self.proc.exitcode}"
+        if now >= self.deadline:
+            self.kill()
+            return "error", f"timed out after {now - self.started:.1f}s"
+        return None
+
+    def _receive(self) -> tuple[str, object] | None:
+        if self.conn.poll():
+            try:
+                return self.conn.recv()
+            except EOFError:
+                pass
+        return None
+
+    def kill(self):
+        self.proc.terminate()
+        self.proc.join(5)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join()
+
+    def close(self):
+        self.proc.join(5)
+        self.conn.close()
+
+
+def run_jobs(
+    names: list[str],
+    workers: int = 3,
+    timeout: float = 600,
+    retries: int = 1,
+    backoff: float = 5.0,
+    out_dir: str = HERE,
+    urls: dict[str, str] | None = None,
+    typed: bool = False,
+    metrics_dir: str | None = None,
+) -> list[JobResult]:
+    ctx = mp.get_context("spawn")
+    urls = urls or {}
+    results = {name: JobResult(name) for name in names}
+    queue = [(0.0, name) for name in names]  # (not before, job name)
+    running: list[_Attempt] = []
+
+    while queue or running:
+        now = time.monotonic()
+        for item in sorted(queue):
+            not_before, name = item
+            if len(running) >= workers or not_before > now:
+                continue
+            queue.remove(item)
+            results[name].attempts += 1
+            running.append(_Attempt(ctx, name, urls.get(name), out_dir, timeout, typed, metrics_dir,
+                                    resume=results[name].attempts > 1))
+
+        for attempt in list(running):
+            outcome = attempt.outcome(time.monotonic())
+            if outcome is None:
+                continue
+            running.remove(attempt)
+            attempt.close()
+
+            res = results[attempt.name]
+            res.seconds += time.monotonic() - attempt.started
+            kind, value = outcome
+            if kind == "ok":
+                res.status, res.rows, res.error = ("unchanged" if value is None else "ok"), value, ""
+                print(f"[info] {res.name}: {res.status} ({value if value is not None else '-'} rows)")
+                continue
+
+            res.status, res.error = "failed", value
+            if res.attempts <= retries:
+                delay = backoff * 2 ** (res.attempts - 1) * random.uniform(1.0, 1.5)
+                print(f"[warn] {res.name} attempt {res.attempts} failed ({value}); retrying in {delay:.1f}s")
+                queue.append((time.monotonic() + delay, res.name))
+            else:
+                print(f"[warn] {res.name} failed after {res.attempts} attempts: {value}")
+
+        # sleep until something finishes, a deadline passes or a retry is due
+        if running or queue:
+            now = time.monotonic()
+            wake = [a.deadline for a in running] + [t for t, _ in queue if len(running) < workers]
+            delay = max(0.0, min(wake, default=now + 1) - now)
+            handles = [a.conn for a in running] + [a.proc.sentinel for a in running]
+            if handles:
+                wait(handles, timeout=min(delay, 1.0))
+            else:
+                time.sleep(min(delay, 1.0))
+
+    return [results[name] for name in names]
+
+
+def print_summary(results: list[JobResult]):
+    print(f"\n{'job':12s} {'status':10s} {'rows':>7s} {'seconds':>9s} {'attempts':>9s}  error")
+    for r in results:
+        rows = "-" if r.rows is None else str(r.rows)
+        print(f"{r.name:12s} {r.status:10s} {rows:>7s} {r.seconds:9.2f} {r.attempts:9d}  {r.error}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m webscraper")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="run scraping jobs in parallel")
+    p.add_argument("jobs", nargs="+", choices=["all", *JOBS], help="jobs to run")
+    p.add_argument("--workers", type=int, default=3, help="jobs running at once")
+    p.add_argument("--timeout", type=float, default=600, help="seconds per attempt before it is killed")
+    p.add_argument("--retries", type=int, default=1, help="extra attempts for a failed job")
+    p.add_argument("--backoff", type=float, default=5.0, help="delay before the first retry, doubled each time")
+    p.add_argument("--out-dir", default=HERE, help="directory the CSVs are written to")
+    p.add_argument("--fixtures", action="store_true", help="scrape recorded/fixture pages from a local server instead of the live sites")
+    p.add_argument("--typed", action="store_true", help="write numeric columns as numbers (see numeric.py)")
+    p.add_argument("--metrics", metavar="DIR", help="write each job's JSON span log and Prometheus metrics here")
+    args = parser.parse_args(argv)
+
+    names = list(JOBS) if "all" in args.jobs else list(dict.fromkeys(args.jobs))
+    os.makedirs(args.out_dir, exist_ok=True)
+    out_dir = os.path.abspath(args.out_dir)
+    kwargs = dict(workers=max(1, args.workers), timeout=args.timeout, retries=args.retries,
+                  backoff=args.backoff, out_dir=out_dir, typed=args.typed,
+                  metrics_dir=args.metrics and os.path.abspath(args.metrics))
+    if args.metrics:
+        os.makedirs(args.metrics, exist_ok=True)
+
+    if args.fixtures:
+        from replay import ReplayServer
+
+        with ReplayServer() as srv:
+            results = run_jobs(names, urls={name: srv.url(name) for name in names}, **kwargs)
+    else:
+        results = run_jobs(names, **kwargs)
+
+    print_summary(results)
+    return 1 if any(r.status == "failed" for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())